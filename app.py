@@ -1,8 +1,58 @@
+import os
+import threading
 import streamlit as st
 import pandas as pd
 from tradingview_analyzer import TradingViewScraper
 from datetime import datetime, timedelta
 from config import settings
+from database.summary import SUMMARY_COLUMNS, IndicatorSummary
+
+# Rows per page of the details table
+PAGE_SIZE = 50
+
+@st.cache_resource
+def get_scraper():
+    """One scraper (and DB connection/HTTP pool) shared across reruns"""
+    return TradingViewScraper()
+
+@st.cache_resource
+def get_run_lock():
+    """Held while an analysis run uses the shared scraper, so sessions never run two at once"""
+    return threading.Lock()
+
+@st.cache_resource
+def get_summary():
+    """Narrow, targeted reads of the indicators table for the dashboard"""
+    return IndicatorSummary(get_scraper().db_path)
+
+@st.cache_data(show_spinner=False)
+def load_statistics(version):
+    """Totals and averages from the trigger-maintained stats table"""
+    return get_summary().statistics()
+
+@st.cache_data(show_spinner=False)
+def load_rating_distribution(version):
+    """Indicators per rating value, counted in the database"""
+    return get_summary().rating_distribution()
+
+@st.cache_data(show_spinner=False)
+def load_details(url, version):
+    return get_summary().details(url)
+
+@st.cache_data(show_spinner=False)
+def search_indicators(text, version):
+    """Summary rows of the full-text matches, best first"""
+    return get_summary().rows(get_summary().search(text))
+
+@st.cache_data(show_spinner=False)
+def load_page(cursor, version):
+    page = get_summary().page(cursor, PAGE_SIZE)
+    return pd.DataFrame(page.items, columns=SUMMARY_COLUMNS), page.next_cursor
+
+def current_version():
+    """Cache key for everything read from the indicators table, and whether it has rows"""
+    version = get_summary().version()
+    return version, version[0] > 0
 
 def main():
     st.title("TradingView Indicator Analyzer")
@@ -20,8 +70,7 @@ def main():
         new_url = st.text_input("TradingView Indicator URL", placeholder="https://www.tradingview.com/script/...")
         submitted = st.form_submit_button("Add URL")
         if submitted and new_url:
-            scraper = TradingViewScraper()
-            success, message = scraper.add_url_to_csv(new_url)
+            success, message = get_scraper().add_url(new_url)
             if success:
                 st.sidebar.success(message)
             else:
@@ -30,17 +79,27 @@ def main():
     # View URLs button
     if st.sidebar.button("View All URLs"):
         try:
-            import pandas as pd
-            urls_df = pd.read_csv('tradingview_urls.csv')
+            urls_df = get_scraper().frontier.to_df()
             st.sidebar.dataframe(urls_df, hide_index=True)
         except Exception as e:
             st.sidebar.error(f"Error loading URLs: {str(e)}")
 
     # Run analysis button
     if st.sidebar.button("Run New Analysis"):
-        with st.spinner("Analyzing indicators..."):
-            scraper = TradingViewScraper()
-            scraper.process_urls_from_csv('tradingview_urls.csv')
+        run_lock = get_run_lock()
+        # The scraper and its crawl job state are shared by every session
+        if not run_lock.acquire(blocking=False):
+            st.sidebar.info("An analysis is already running; its results will show up when it finishes.")
+        else:
+            try:
+                with st.spinner("Analyzing indicators..."):
+                    scraper = get_scraper()
+                    if os.path.exists('tradingview_urls.csv'):
+                        scraper.process_urls_from_csv('tradingview_urls.csv')
+                    else:
+                        scraper.crawl()
+            finally:
+                run_lock.release()
 
     # Main content
     tab1, tab2 = st.tabs(["Dashboard", "Details"])
@@ -54,36 +113,37 @@ def main():
 def show_dashboard():
     st.header("Analysis Dashboard")
 
-    # Get data from database
-    with TradingViewScraper() as scraper:
-        df = scraper.get_all_indicators_df()
+    version, has_rows = current_version()
 
-    # Check if dataframe is empty
-    if df.empty:
+    # Check if the table is empty
+    if not has_rows:
         st.info("No indicators have been analyzed yet. Click 'Run New Analysis' in the sidebar to get started.")
         return
 
     # Summary metrics
+    stats = load_statistics(version)
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Indicators", len(df))
+        st.metric("Total Indicators", stats['total_indicators'], delta=f"{stats['recent_additions']} this week")
     with col2:
-        st.metric("Avg Profitability", f"{df['profitability_rating'].mean():.1f}/10")
+        st.metric("Avg Profitability", f"{stats['avg_profitability'] or 0:.1f}/10")
     with col3:
-        st.metric("Avg Reliability", f"{df['reliability_rating'].mean():.1f}/10")
+        st.metric("Avg Reliability", f"{stats['avg_reliability'] or 0:.1f}/10")
 
     # Charts
-    if len(df) > 0:  # Additional check before creating chart
-        st.bar_chart(df[['profitability_rating', 'reliability_rating']])
+    st.subheader("Indicators per rating")
+    st.bar_chart(load_rating_distribution(version))
+    if stats['daily']:
+        st.subheader("Indicators analyzed per day")
+        st.bar_chart(pd.Series(stats['daily'], name="indicators").sort_index())
 
 def show_details():
     st.header("Detailed Analysis")
 
-    with TradingViewScraper() as scraper:
-        df = scraper.get_all_indicators_df()
+    version, has_rows = current_version()
 
-    # Check if dataframe is empty
-    if df.empty:
+    # Check if the table is empty
+    if not has_rows:
         st.info("No indicators have been analyzed yet. Click 'Run New Analysis' in the sidebar to get started.")
         return
 
@@ -91,32 +151,70 @@ def show_details():
     col1, _ = st.columns([1, 5])  # Using _ for unused variable
     with col1:
         if st.button("Export to CSV"):
-            with TradingViewScraper() as scraper:
-                success, message = scraper.export_to_csv()
-                if success:
-                    st.success(message)
-                    # Create a download button for the exported file
-                    with open("indicators_export.csv", "rb") as file:
-                        st.download_button(
-                            label="Download CSV",
-                            data=file,
-                            file_name="indicators_export.csv",
-                            mime="text/csv"
-                        )
-                else:
-                    st.error(message)
+            success, message = get_scraper().export_to_csv()
+            if success:
+                st.success(message)
+                # Create a download button for the exported file
+                with open("indicators_export.csv", "rb") as file:
+                    st.download_button(
+                        label="Download CSV",
+                        data=file,
+                        file_name="indicators_export.csv",
+                        mime="text/csv"
+                    )
+            else:
+                st.error(message)
 
     # Searchable table
     search = st.text_input("Search indicators")
+    shown_df = None
     if search:
-        filtered_df = df[df['name'].str.contains(search, case=False)]
+        filtered_df = search_indicators(search, version)
         if filtered_df.empty:
             st.warning(f"No indicators found matching '{search}'")
-            st.dataframe(df)  # Show all results instead
         else:
-            st.dataframe(filtered_df)
-    else:
-        st.dataframe(df)
+            shown_df = filtered_df
+            st.dataframe(shown_df.drop(columns=['updated_at']), hide_index=True)
+    if shown_df is None:
+        shown_df = show_table_page(version)
+
+    # Text fields are loaded for the opened indicator only
+    selected = st.selectbox("Show analysis for", shown_df['url'],
+                            format_func=dict(zip(shown_df['url'], shown_df['name'])).get)
+    if selected:
+        details = load_details(selected, version)
+        for field, value in (details or {}).items():
+            if value:
+                st.subheader(field.replace('_', ' ').capitalize())
+                st.write(value)
+
+        indicator_id = int(shown_df.loc[shown_df['url'] == selected, 'id'].iloc[0])
+        similar = get_summary().similar(indicator_id)
+        if similar:
+            st.subheader("Similar indicators")
+            names = get_summary().names([similar_id for similar_id, _ in similar])
+            for similar_id, score in similar:
+                if similar_id in names:
+                    st.write(f"{names[similar_id]} ({score:.2f})")
+
+def show_table_page(version):
+    """One page of the indicators table with Previous/Next; returns the rows shown.
+
+    Pages are keyset reads (see IndicatorSummary.page); the cursors of the
+    pages visited so far are kept in the session so Previous can go back.
+    """
+    cursors = st.session_state.setdefault('page_cursors', [None])
+    page_df, next_cursor = load_page(cursors[-1], version)
+    st.dataframe(page_df.drop(columns=['updated_at']), hide_index=True)
+
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        st.button("Previous", disabled=len(cursors) == 1, on_click=cursors.pop)
+    with col2:
+        st.button("Next", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+    with col3:
+        st.caption(f"Page {len(cursors)}")
+    return page_df
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
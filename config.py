@@ -1,4 +1,6 @@
 import os
+from typing import Dict, List
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -25,8 +27,58 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = 'sk-dummy-key-for-testing'
 
+    # LLM analysis batches
+    ANALYSIS_CONCURRENCY: int = 8
+    ANALYSIS_MAX_RETRIES: int = 5
+    ANALYSIS_RETRY_BASE_DELAY: float = 1.0
+    ANALYSIS_TIMEOUT_SECONDS: float = 120.0
+    ANALYSIS_STREAMING: bool = True
+
+    # Prompt budgeting: description and comment tokens sent per indicator
+    PROMPT_TOKEN_BUDGET: int = 1500
+    PROMPT_TOKEN_BUDGETS: Dict[str, int] = {'gpt-3.5-turbo': 1500, 'gpt-3.5-turbo-16k': 4000, 'gpt-4': 3000}
+    PROMPT_DESCRIPTION_SHARE: float = 0.5
+    PROMPT_MAX_COMMENT_TOKENS: int = 150
+    PROMPT_MAX_COMMENT_CANDIDATES: int = 200
+
+    # Prompt packing: several short indicators per LLM request
+    ANALYSIS_PACKING: bool = False
+    ANALYSIS_PACK_MAX_ITEMS: int = 8
+    ANALYSIS_PACK_TOKEN_BUDGET: int = 6000
+    ANALYSIS_PACK_MAX_ITEM_TOKENS: int = 800
+
+    # LLM response cache: sqlite (DATA_DIR/llm_cache.db), memory or none
+    LLM_CACHE_BACKEND: str = 'sqlite'
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+
     # Rate Limiting
     REQUESTS_PER_MINUTE: int = 20
+    RATE_LIMIT_BURST: int = 3
+    OPENAI_REQUESTS_PER_MINUTE: int = 60
+    OPENAI_RATE_LIMIT_BURST: int = 5
+
+    # HTTP session pool
+    HTTP_POOL_SIZE: int = 10
+    HTTP_TIMEOUT: int = 10
+
+    # Raw HTML cache (stored under DATA_DIR/html_cache)
+    HTML_CACHE_ENABLED: bool = True
+    HTML_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    HTML_CACHE_MAX_MB: int = 512
+    HTML_CACHE_OFFLINE: bool = False  # Replay pages from the cache only, never hit the network
+
+    # HTML extraction backend: auto, selectolax, lxml, bs4 or bs4-strainer
+    EXTRACTOR_BACKEND: str = 'auto'
+
+    # Scrape pipeline (workers per stage and queue size between stages)
+    PIPELINE_FETCH_WORKERS: int = 4
+    PIPELINE_PARSE_WORKERS: int = 2
+    PIPELINE_ANALYZE_WORKERS: int = 4
+    PIPELINE_SAVE_WORKERS: int = 1
+    PIPELINE_QUEUE_SIZE: int = 100
+    PIPELINE_PARSE_PROCESSES: int = 0  # 0 parses in threads, otherwise the process pool size
+    PIPELINE_PARSE_CHUNK_SIZE: int = 8  # Pages sent to a parse process per task
 
     # Environment
     ENVIRONMENT: str = 'development'
@@ -42,11 +94,54 @@ class Settings(BaseSettings):
     DB_HOST: str = 'localhost'
     DB_PORT: str = '5432'
 
+    # URL frontier
+    FRONTIER_BATCH_SIZE: int = 500
+    FRONTIER_STALE_AFTER_HOURS: float = 7 * 24
+    FRONTIER_MAX_FAILURES: int = 3
+
+    # Adaptive recrawl: fetch budget per run, spent on URLs most likely to have changed
+    RECRAWL_ADAPTIVE: bool = True
+    RECRAWL_BUDGET: int = 500
+    RECRAWL_MIN_EXPECTED_CHANGES: float = 0.05
+    RECRAWL_PRIOR_CHANGES: float = 1.0
+    RECRAWL_PRIOR_HOURS: float = 7 * 24
+
+    # Discovery: listing/tag/author pages crawled for new script URLs
+    DISCOVERY_SEEDS: List[str] = ['https://www.tradingview.com/scripts/']
+    DISCOVERY_MAX_PAGES: int = 50
+    DISCOVERY_MAX_DEPTH: int = 2
+    DISCOVERY_INITIAL_INTERVAL_HOURS: float = 24
+    DISCOVERY_MIN_INTERVAL_HOURS: float = 1
+    DISCOVERY_MAX_INTERVAL_HOURS: float = 7 * 24
+
+    # Crawl jobs: per-URL state is checkpointed every N changes or T seconds
+    JOB_CHECKPOINT_EVERY: int = 50
+    JOB_CHECKPOINT_SECONDS: float = 5.0
+
+    # Full-text search: rank only this many of the newest matches (0 ranks every match)
+    SEARCH_MAX_CANDIDATES: int = 0
+
+    # Similarity index: hashed text vector size (bytes per indicator)
+    SIMILARITY_DIMENSIONS: int = 512
+
+    # SQLite writes
+    SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    DB_BATCH_SIZE: int = 100
+    DB_BATCH_FLUSH_SECONDS: float = 2.0
+
     # Paths (not from env)
     BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
     LOGS_DIR: str = os.path.join(BASE_DIR, 'logs')
     DATA_DIR: str = os.path.join(BASE_DIR, 'data')
 
+    @property
+    def DATABASE_URL(self) -> str:
+        """Postgres when DB_NAME is set, otherwise a local SQLite file for the ORM models"""
+        if self.DB_NAME:
+            return (f"postgresql://{quote_plus(self.DB_USER)}:{quote_plus(self.DB_PASSWORD)}@{self.DB_HOST}:{self.DB_PORT}/"
+                    f"{self.DB_NAME}")
+        return f"sqlite:///{os.path.join(self.DATA_DIR, 'analysis.db')}"
+
     @property
     def is_openai_key_valid(self) -> bool:
         """Check if the OpenAI API key is valid (not the dummy key)"""
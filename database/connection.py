@@ -0,0 +1,125 @@
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Sequence
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """WAL lets dashboard reads run alongside a writer; NORMAL sync avoids an fsync per commit"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    return conn
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """Long-lived connection for the calling thread, opened once per database file"""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = configure_connection(sqlite3.connect(db_path, timeout=30))
+    return conn
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]):
+    """Bring tables created by older versions up to the current schema"""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+class BatchWriter:
+    """Buffer rows and write them with one transaction per batch.
+
+    Rows are flushed when `batch_size` are waiting or, from a background
+    thread, `flush_interval` seconds after the last flush. `write_batch`
+    receives the writer's own connection and the list of buffered rows; if
+    it returns a dict of counts they are added up in `totals`. `on_flushed`,
+    if given, is called with the rows once their transaction has committed.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        write_batch: Callable[[sqlite3.Connection, List], None],
+        batch_size: int = None,
+        flush_interval: float = None,
+        on_flushed: Callable[[List], None] = None
+    ):
+        self.write_batch = write_batch
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size or settings.DB_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.DB_BATCH_FLUSH_SECONDS
+        self.conn = configure_connection(sqlite3.connect(db_path, timeout=30, check_same_thread=False))
+        self.totals = Counter()
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, row):
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def add_many(self, rows: Sequence):
+        with self._buffer_lock:
+            self._buffer.extend(rows)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def pending(self) -> int:
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def flush(self):
+        with self._write_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            try:
+                with self.conn:
+                    counts = self.write_batch(self.conn, rows)
+            except Exception:
+                # Put the rows back so a later flush can retry them
+                with self._buffer_lock:
+                    self._buffer = rows + self._buffer
+                raise
+            if counts:
+                self.totals.update(counts)
+            if self.on_flushed:
+                self.on_flushed(rows)
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Background flush failed: {str(e)}")
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flusher.join()
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
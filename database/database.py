@@ -4,6 +4,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
 import logging
 from config import settings
+from .models import Indicator, AnalysisLog
+from .similarity import SimilarityIndex, indicator_text
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +13,13 @@ class Database:
     def __init__(self):
         self.engine = create_engine(settings.DATABASE_URL)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self._similarity = None
+
+    @property
+    def similarity(self):
+        if self._similarity is None:
+            self._similarity = SimilarityIndex()
+        return self._similarity
 
     @contextmanager
     def get_session(self):
@@ -29,7 +38,12 @@ class Database:
         with self.get_session() as session:
             indicator = Indicator(**indicator_data)
             session.add(indicator)
-            return indicator
+            session.flush()
+            indicator_id = indicator.id
+        self.similarity.add(indicator_id, indicator_text(
+            indicator_data.get('name'), indicator_data.get('description'), indicator_data.get('functionality')
+        ))
+        return indicator
 
     def get_indicator(self, url):
         with self.get_session() as session:
@@ -39,6 +53,11 @@ class Database:
         with self.get_session() as session:
             return session.query(Indicator).all()
 
+    def iter_indicators(self, batch_size=1000):
+        """Every indicator, fetched batch_size rows at a time instead of all at once"""
+        with self.get_session() as session:
+            yield from session.query(Indicator).order_by(Indicator.id).yield_per(batch_size)
+
     def log_analysis(self, indicator_id, status, error_message=None, execution_time=0):
         with self.get_session() as session:
             log = AnalysisLog(
@@ -0,0 +1,361 @@
+import csv
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from config import settings
+from database.connection import add_missing_columns, get_connection
+from scraper.urls import normalize_url
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+def _timestamp(moment: datetime = None) -> str:
+    # ISO text sorts chronologically, so SQLite can compare it directly
+    return (moment or datetime.now()).isoformat(sep=' ')
+
+class UrlFrontier:
+    """The set of script URLs to crawl, kept in the indicators database.
+
+    Each URL is stored once in normalized form (a unique index makes the
+    duplicate check a single lookup) with a priority, a status and the time
+    it was last fetched. A crawl asks for the next batch of pending, retryable
+    or stale URLs, so an interrupted crawl resumes where it stopped.
+
+    For adaptive recrawls every parsed page is also recorded: when its
+    content last changed, how many changes were seen over how long, and how
+    fast its comment count grows. Those give each URL a change rate, and
+    rate x hours since the last fetch is the number of changes expected to
+    be waiting, which orders the recrawl.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "indicators.db")
+        self.setup()
+
+    @property
+    def conn(self):
+        return get_connection(self.db_path)
+
+    def setup(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS frontier (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    added_at TIMESTAMP,
+                    last_attempt TIMESTAMP,
+                    last_fetched TIMESTAMP,
+                    fail_count INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT
+                )
+            """)
+            # Change tracking for adaptive recrawls
+            add_missing_columns(self.conn, 'frontier', {
+                'first_fetched': 'TIMESTAMP',
+                'content_hash': 'TEXT',
+                'comment_count': 'INTEGER',
+                'last_observed': 'TIMESTAMP',
+                'last_changed': 'TIMESTAMP',
+                'change_count': 'INTEGER NOT NULL DEFAULT 0',
+                'comment_rate': 'REAL',
+            })
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_frontier_status_priority ON frontier (status, priority DESC, id)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_last_fetched ON frontier (last_fetched)")
+
+    def add(self, url: str, priority: int = 0) -> bool:
+        """Queue one URL; False if it is already in the frontier"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO frontier (url, priority, added_at) VALUES (?, ?, ?)",
+                (normalize_url(url), priority, _timestamp())
+            )
+        return cursor.rowcount == 1
+
+    def add_many(self, urls: Iterable[str], priority: int = 0, batch_size: int = 1000) -> int:
+        """Queue many URLs in batched transactions; returns how many were new"""
+        added = 0
+        batch = []
+        for url in urls:
+            batch.append((normalize_url(url), priority, _timestamp()))
+            if len(batch) >= batch_size:
+                added += self._insert(batch)
+                batch = []
+        if batch:
+            added += self._insert(batch)
+        return added
+
+    def _insert(self, rows: List[Tuple]) -> int:
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, priority, added_at) VALUES (?, ?, ?)", rows
+            )
+            return self.conn.total_changes - before
+
+    def import_csv(self, csv_path: str, priority: int = 0) -> int:
+        """Queue the URLs in the first column of a CSV file (with a header row)"""
+        with open(csv_path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)  # Skip header
+            return self.add_many((row[0] for row in reader if row and row[0].strip()), priority)
+
+    def __contains__(self, url: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM frontier WHERE url = ?", (normalize_url(url),)
+        ).fetchone() is not None
+
+    # Changes per hour: observed changes plus a prior of RECRAWL_PRIOR_CHANGES
+    # per RECRAWL_PRIOR_HOURS, or the comment growth rate if that is higher
+    _CHANGE_RATE = """
+        MAX(
+            (change_count + :prior_changes)
+            / ((julianday(last_fetched) - julianday(COALESCE(first_fetched, last_fetched))) * 24 + :prior_hours),
+            COALESCE(comment_rate, 0) / 24.0
+        )
+    """
+    _EXPECTED_CHANGES = f"({_CHANGE_RATE}) * (julianday(:now) - julianday(last_fetched)) * 24"
+
+    @staticmethod
+    def _rate_params(now: datetime = None) -> Dict:
+        return {
+            'now': _timestamp(now),
+            'prior_changes': settings.RECRAWL_PRIOR_CHANGES,
+            'prior_hours': settings.RECRAWL_PRIOR_HOURS,
+        }
+
+    def next_batch(self, limit: int = None, stale_after: timedelta = None,
+                   not_attempted_since: datetime = None, adaptive: bool = None,
+                   include_fetched: bool = True) -> List[str]:
+        """Highest-priority URLs due for a fetch.
+
+        Due means pending, failed fewer than FRONTIER_MAX_FAILURES times, or
+        fetched and due again. With a fixed stale_after (or RECRAWL_ADAPTIVE
+        off) a fetched URL is due once it is older than that. Adaptively it
+        is due once RECRAWL_MIN_EXPECTED_CHANGES changes are expected since
+        its last fetch, and the URLs expected to have changed most come
+        first. URLs attempted at or after not_attempted_since are left out so
+        one crawl visits each URL once. include_fetched=False leaves out
+        recrawls altogether.
+        """
+        limit = limit or settings.FRONTIER_BATCH_SIZE
+        if adaptive is None:
+            adaptive = settings.RECRAWL_ADAPTIVE and stale_after is None
+        if stale_after is None:
+            stale_after = timedelta(hours=settings.FRONTIER_STALE_AFTER_HOURS)
+        params = {
+            **self._rate_params(),
+            'pending': PENDING, 'failed': FAILED, 'done': DONE,
+            'max_failures': settings.FRONTIER_MAX_FAILURES, 'limit': limit,
+            'stale_before': _timestamp(datetime.now() - stale_after),
+            'min_expected': settings.RECRAWL_MIN_EXPECTED_CHANGES,
+        }
+        if adaptive:
+            fetched_due = f"{self._EXPECTED_CHANGES} >= :min_expected"
+            order = f"priority DESC, status = :done, {self._EXPECTED_CHANGES} DESC, id"
+        else:
+            fetched_due = "last_fetched < :stale_before"
+            order = "priority DESC, id"
+        if not include_fetched:
+            fetched_due = "0"
+        query = f"""
+            SELECT url FROM frontier
+            WHERE (status = :pending
+                   OR (status = :failed AND fail_count < :max_failures)
+                   OR (status = :done AND {fetched_due}))
+        """
+        if not_attempted_since is not None:
+            query += " AND (last_attempt IS NULL OR last_attempt < :since)"
+            params['since'] = _timestamp(not_attempted_since)
+        query += f" ORDER BY {order} LIMIT :limit"
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def expected_changes(self, url: str, now: datetime = None) -> Optional[float]:
+        """Changes expected since the URL's last fetch; None if it was never fetched"""
+        row = self.conn.execute(
+            f"SELECT {self._EXPECTED_CHANGES} FROM frontier WHERE url = :url",
+            {**self._rate_params(now), 'url': normalize_url(url)}
+        ).fetchone()
+        return row[0] if row else None
+
+    def claim(self, urls: List[str]):
+        """Record that a crawl is about to attempt these URLs"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE frontier SET last_attempt = ? WHERE url = ?",
+                [(_timestamp(), normalize_url(url)) for url in urls]
+            )
+
+    def mark_fetched(self, url: str):
+        now = _timestamp()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET status = ?, last_fetched = ?, last_attempt = ?, fail_count = 0, "
+                "last_error = NULL, first_fetched = COALESCE(first_fetched, ?) WHERE url = ?",
+                (DONE, now, now, now, normalize_url(url))
+            )
+
+    def record_content(self, url: str, content_hash: str, comment_count: int, now: datetime = None) -> bool:
+        """Note what a fetched page contained; returns whether it changed since last seen.
+
+        The comment growth rate (comments per day) is averaged with the
+        previous estimate so one burst does not dominate.
+        """
+        url = normalize_url(url)
+        now = now or datetime.now()
+        row = self.conn.execute(
+            "SELECT content_hash, comment_count, last_observed, comment_rate FROM frontier WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return False
+        stored_hash, stored_comments, last_observed, comment_rate = row
+        changed = stored_hash is not None and stored_hash != content_hash
+
+        if stored_comments is not None and last_observed is not None:
+            days = max((now - datetime.fromisoformat(last_observed)).total_seconds() / 86400, 1 / 24)
+            observed_rate = max(comment_count - stored_comments, 0) / days
+            comment_rate = observed_rate if comment_rate is None else (comment_rate + observed_rate) / 2
+
+        with self.conn:
+            self.conn.execute("""
+                UPDATE frontier
+                SET content_hash = ?, comment_count = ?, last_observed = ?, comment_rate = ?,
+                    change_count = change_count + ?, last_changed = CASE WHEN ? THEN ? ELSE last_changed END
+                WHERE url = ?
+            """, (content_hash, comment_count, _timestamp(now), comment_rate,
+                  int(changed), changed, _timestamp(now), url))
+        return changed
+
+    def mark_failed(self, url: str, error: str = None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET status = ?, last_attempt = ?, fail_count = fail_count + 1, "
+                "last_error = ? WHERE url = ?",
+                (FAILED, _timestamp(), error, normalize_url(url))
+            )
+
+    def set_priority(self, url: str, priority: int):
+        with self.conn:
+            self.conn.execute("UPDATE frontier SET priority = ? WHERE url = ?", (priority, normalize_url(url)))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of URLs per status"""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall())
+
+    def to_df(self, limit: Optional[int] = None) -> pd.DataFrame:
+        query = "SELECT url, priority, status, last_fetched, fail_count FROM frontier ORDER BY priority DESC, id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(query, self.conn)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+class ListingPages:
+    """Listing, tag and author pages that discovery crawls for script links.
+
+    Each page is rescheduled adaptively: when its set of script links
+    changed since the last visit its revisit interval halves, otherwise it
+    doubles (within DISCOVERY_MIN/MAX_INTERVAL_HOURS). Pages that change
+    often are therefore due often, and quiet ones drift towards the maximum.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "indicators.db")
+        self.setup()
+
+    @property
+    def conn(self):
+        return get_connection(self.db_path)
+
+    def setup(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS listing_pages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    kind TEXT,
+                    depth INTEGER NOT NULL DEFAULT 0,
+                    added_at TIMESTAMP,
+                    last_fetched TIMESTAMP,
+                    last_changed TIMESTAMP,
+                    fetch_count INTEGER NOT NULL DEFAULT 0,
+                    change_count INTEGER NOT NULL DEFAULT 0,
+                    links_hash TEXT,
+                    interval_hours REAL,
+                    next_due TIMESTAMP
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_listing_pages_next_due ON listing_pages (next_due)")
+
+    def add_many(self, pages: Iterable[Tuple[str, str, int]]) -> int:
+        """Add (url, kind, depth) pages not seen before; returns how many were new"""
+        rows = [(url, kind, depth, _timestamp()) for url, kind, depth in pages]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO listing_pages (url, kind, depth, added_at) VALUES (?, ?, ?, ?)", rows
+            )
+            return self.conn.total_changes - before
+
+    def due(self, limit: int, now: datetime = None) -> List[Tuple[str, int]]:
+        """(url, depth) of pages due for a visit.
+
+        Never-visited pages come first, then the pages whose links changed on
+        the largest share of visits, then the most overdue.
+        """
+        return self.conn.execute("""
+            SELECT url, depth FROM listing_pages
+            WHERE next_due IS NULL OR next_due <= ?
+            ORDER BY next_due IS NOT NULL,
+                     CAST(change_count AS REAL) / MAX(fetch_count, 1) DESC,
+                     next_due, id
+            LIMIT ?
+        """, (_timestamp(now), limit)).fetchall()
+
+    def record_visit(self, url: str, links_hash: Optional[str]) -> bool:
+        """Reschedule a visited page; links_hash None means the page was not modified.
+
+        Returns whether the page's links changed.
+        """
+        row = self.conn.execute(
+            "SELECT links_hash, interval_hours FROM listing_pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return False
+        stored_hash, interval = row
+        interval = interval or settings.DISCOVERY_INITIAL_INTERVAL_HOURS
+        changed = links_hash is not None and links_hash != stored_hash
+        interval = interval / 2 if changed else interval * 2
+        interval = min(max(interval, settings.DISCOVERY_MIN_INTERVAL_HOURS), settings.DISCOVERY_MAX_INTERVAL_HOURS)
+        now = datetime.now()
+        with self.conn:
+            self.conn.execute("""
+                UPDATE listing_pages
+                SET last_fetched = ?, fetch_count = fetch_count + 1,
+                    change_count = change_count + ?, last_changed = CASE WHEN ? THEN ? ELSE last_changed END,
+                    links_hash = COALESCE(?, links_hash), interval_hours = ?, next_due = ?
+                WHERE url = ?
+            """, (_timestamp(now), int(changed), changed, _timestamp(now), links_hash, interval,
+                  _timestamp(now + timedelta(hours=interval)), url))
+        return changed
+
+    def record_failure(self, url: str):
+        """Try a page that failed again after its current interval"""
+        row = self.conn.execute("SELECT interval_hours FROM listing_pages WHERE url = ?", (url,)).fetchone()
+        interval = (row and row[0]) or settings.DISCOVERY_INITIAL_INTERVAL_HOURS
+        with self.conn:
+            self.conn.execute(
+                "UPDATE listing_pages SET next_due = ? WHERE url = ?",
+                (_timestamp(datetime.now() + timedelta(hours=interval)), url)
+            )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM listing_pages").fetchone()[0]
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from database.connection import BatchWriter, add_missing_columns, get_connection
+
+# Per-URL states, in the order a URL moves through them
+PENDING = 'pending'
+FETCHED = 'fetched'
+PARSED = 'parsed'
+ANALYZED = 'analyzed'
+SAVED = 'saved'
+SKIPPED = 'skipped'  # Page not modified, or stored analysis still current
+FAILED = 'failed'
+
+TERMINAL_STATES = (SAVED, SKIPPED, FAILED)
+
+RUNNING = 'running'
+COMPLETED = 'completed'
+INTERRUPTED = 'interrupted'
+
+def _timestamp() -> str:
+    return datetime.now().isoformat(sep=' ')
+
+class CrawlJobStore:
+    """Crawl runs and the state of every URL in them.
+
+    Job rows live in `crawl_jobs`; one `analysis_logs` row per (job, URL)
+    holds that URL's latest state. State changes are buffered and written
+    as checkpoints every JOB_CHECKPOINT_EVERY changes or
+    JOB_CHECKPOINT_SECONDS, whichever comes first, so tracking adds no write
+    per stage. A crash loses at most the changes since the last checkpoint;
+    those URLs are simply picked up again on resume.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "indicators.db")
+        self.setup()
+        self._checkpoints = None
+        self._started = {}
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        return get_connection(self.db_path)
+
+    def setup(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    status TEXT NOT NULL,
+                    params TEXT,
+                    stats TEXT,
+                    started_at TIMESTAMP,
+                    checkpoint_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    indicator_id INTEGER,
+                    status TEXT,
+                    error_message TEXT,
+                    execution_time REAL,
+                    created_at TIMESTAMP
+                )
+            """)
+            # analysis_logs predates crawl jobs; add the per-item columns
+            add_missing_columns(self.conn, 'analysis_logs', {
+                'job_id': 'INTEGER',
+                'url': 'TEXT',
+                'updated_at': 'TIMESTAMP',
+            })
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_logs_job_url ON analysis_logs (job_id, url)"
+            )
+
+    @property
+    def checkpoints(self) -> BatchWriter:
+        if self._checkpoints is None:
+            self._checkpoints = BatchWriter(
+                self.db_path, self._write_states,
+                batch_size=settings.JOB_CHECKPOINT_EVERY,
+                flush_interval=settings.JOB_CHECKPOINT_SECONDS
+            )
+        return self._checkpoints
+
+    def create(self, params: Dict[str, Any] = None) -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO crawl_jobs (status, params, started_at) VALUES (?, ?, ?)",
+                (RUNNING, json.dumps(params or {}), _timestamp())
+            )
+        return cursor.lastrowid
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT id, status, params, stats, started_at, checkpoint_at, finished_at FROM crawl_jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0], 'status': row[1], 'params': json.loads(row[2] or '{}'),
+            'stats': json.loads(row[3] or '{}'), 'started_at': datetime.fromisoformat(row[4]),
+            'checkpoint_at': row[5], 'finished_at': row[6],
+        }
+
+    def latest_unfinished(self) -> Optional[Dict[str, Any]]:
+        """The most recent job that was interrupted or never finished (e.g. the process died)"""
+        row = self.conn.execute(
+            "SELECT id FROM crawl_jobs WHERE status IN (?, ?) ORDER BY id DESC LIMIT 1", (RUNNING, INTERRUPTED)
+        ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def set_status(self, job_id: int, status: str, stats: Dict[str, Any] = None):
+        self.checkpoint()
+        finished_at = _timestamp() if status in (COMPLETED, INTERRUPTED) else None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE crawl_jobs SET status = ?, stats = COALESCE(?, stats), finished_at = ? WHERE id = ?",
+                (status, json.dumps(stats) if stats is not None else None, finished_at, job_id)
+            )
+
+    def add_items(self, job_id: int, urls: Iterable[str]):
+        """Enroll URLs in a job as pending; written at once so a resume knows about them"""
+        now = _timestamp()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO analysis_logs (job_id, url, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(job_id, url, PENDING, now, now) for url in urls]
+            )
+
+    def record(self, job_id: int, url: str, state: str, error: str = None):
+        """Buffer a state change for the next checkpoint"""
+        now = time.perf_counter()
+        with self._lock:
+            started = self._started.setdefault((job_id, url), now)
+            if state in TERMINAL_STATES:
+                del self._started[(job_id, url)]
+        execution_time = now - started if state in TERMINAL_STATES else None
+        self.checkpoints.add((job_id, url, state, error, execution_time, _timestamp()))
+
+    def _write_states(self, conn, changes):
+        conn.executemany("""
+            UPDATE analysis_logs
+            SET status = ?, error_message = ?, execution_time = COALESCE(?, execution_time), updated_at = ?
+            WHERE job_id = ? AND url = ?
+        """, [(state, error, execution_time, at, job_id, url)
+              for job_id, url, state, error, execution_time, at in changes])
+        conn.executemany(
+            "UPDATE crawl_jobs SET checkpoint_at = ? WHERE id = ?",
+            [(_timestamp(), job_id) for job_id in {change[0] for change in changes}]
+        )
+
+    def checkpoint(self):
+        """Write buffered state changes now"""
+        if self._checkpoints is not None:
+            self._checkpoints.flush()
+
+    def unfinished_urls(self, job_id: int) -> List[str]:
+        """URLs of a job that never reached saved, skipped or failed"""
+        self.checkpoint()
+        return [row[0] for row in self.conn.execute(
+            f"SELECT url FROM analysis_logs WHERE job_id = ? AND status NOT IN ({','.join('?' * len(TERMINAL_STATES))}) "
+            "ORDER BY id", (job_id, *TERMINAL_STATES)
+        )]
+
+    def item_count(self, job_id: int) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM analysis_logs WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def summary(self, job_id: int) -> Dict[str, int]:
+        """Number of URLs per state"""
+        self.checkpoint()
+        return dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM analysis_logs WHERE job_id = ? GROUP BY status", (job_id,)
+        ).fetchall())
+
+    def close(self):
+        if self._checkpoints is not None:
+            self._checkpoints.close()
+            self._checkpoints = None
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Index, event
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
+from .search import create_search_index
+from .stats import stats_ddl
 
 Base = declarative_base()
 
@@ -21,7 +24,46 @@ class Indicator(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Newest-first listing, date filters and (created_at, id) keyset paging
+        Index('idx_indicators_created_at', 'created_at', 'id'),
+    )
+
+    @hybrid_property
+    def combined_score(self):
+        """Profitability plus reliability; None if either rating is missing, as in SQL"""
+        if self.profitability_rating is None or self.reliability_rating is None:
+            return None
+        return self.profitability_rating + self.reliability_rating
+
+    @combined_score.expression
+    def combined_score(cls):
+        # Must stay the exact expression of idx_indicators_combined_score for the index to be used
+        return cls.profitability_rating + cls.reliability_rating
+
+Index('idx_indicators_combined_score', Indicator.combined_score)
+
+@event.listens_for(Indicator.__table__, 'after_create')
+def _create_derived_tables(target, connection, **kw):
+    """Full-text index (FTS5 table or tsvector column) and the trigger-maintained daily stats"""
+    create_search_index(connection, connection.dialect.name)
+    for statement in stats_ddl(connection.dialect.name, 'created_at'):
+        connection.exec_driver_sql(statement)
+
+class CrawlJob(Base):
+    __tablename__ = 'crawl_jobs'
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False)  # running, completed or interrupted
+    params = Column(JSON)
+    stats = Column(JSON)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    checkpoint_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
 class AnalysisLog(Base):
+    """Outcome of one URL in a crawl job; status is its latest state
+    (pending, fetched, parsed, analyzed, saved, skipped or failed)"""
     __tablename__ = 'analysis_logs'
 
     id = Column(Integer, primary_key=True)
@@ -29,4 +71,12 @@ class AnalysisLog(Base):
     status = Column(String)
     error_message = Column(String, nullable=True)
     execution_time = Column(Float)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    job_id = Column(Integer, ForeignKey('crawl_jobs.id'))
+    url = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_analysis_logs_job_url', 'job_id', 'url', unique=True),
+        Index('idx_analysis_logs_indicator_created', 'indicator_id', 'created_at'),
+    )
\ No newline at end of file
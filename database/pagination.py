@@ -0,0 +1,49 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import and_, literal, or_, tuple_
+
+T = TypeVar('T')
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results; pass next_cursor back to get the following page (None at the end)"""
+    items: List[T]
+    next_cursor: Optional[str]
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque token for the sort-key values of the last row on a page"""
+    encoded = [{'dt': value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(encoded, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list):
+            raise ValueError
+        return [datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value for value in values]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+def after(keys: Sequence[tuple], values: Sequence[Any]):
+    """Filter for rows strictly after `values` in the order given by (expression, descending) keys.
+
+    Keys sorted in one direction compare as a row value, (created_at, id) < (c, i),
+    which SQLite and Postgres answer as a range scan of the (created_at, id) index;
+    mixed directions expand to a < c OR (a = c AND b > i).
+    """
+    if len({descending for _, descending in keys}) == 1:
+        row = tuple_(*[expression for expression, _ in keys])
+        bound = tuple_(*[literal(value, expression.type) for (expression, _), value in zip(keys, values)])
+        return row < bound if keys[0][1] else row > bound
+    clauses = []
+    for i, (expression, descending) in enumerate(keys):
+        beyond = expression < values[i] if descending else expression > values[i]
+        clauses.append(and_(*[keys[j][0] == values[j] for j in range(i)], beyond))
+    return or_(*clauses)
+
+def order_by(keys: Sequence[tuple]) -> list:
+    return [expression.desc() if descending else expression for expression, descending in keys]
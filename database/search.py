@@ -0,0 +1,125 @@
+import logging
+import re
+import sqlite3
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Indexed columns of the indicators table and their bm25 weights (name matches count most)
+SEARCH_COLUMNS = ('name', 'description', 'functionality')
+SEARCH_WEIGHTS = (10.0, 1.0, 3.0)
+FTS_TABLE = 'indicators_fts'
+# Postgres: generated tsvector column and its GIN index
+SEARCH_VECTOR = 'search_vector'
+_TSVECTOR_WEIGHTS = ('A', 'C', 'B')
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+def search_terms(text: str) -> List[str]:
+    """Words of a search box entry; punctuation and query operators are dropped"""
+    return _TERM.findall(text or '')[:16]
+
+def fts5_query(text: str) -> Optional[str]:
+    """FTS5 MATCH expression where every word must match as a prefix: 'rsi div' -> '"rsi"* "div"*'"""
+    terms = search_terms(text)
+    return ' '.join(f'"{term}"*' for term in terms) or None
+
+def tsquery(text: str) -> Optional[str]:
+    """Postgres to_tsquery expression with the same meaning: 'rsi div' -> 'rsi:* & div:*'"""
+    terms = search_terms(text)
+    return ' & '.join(f'{term.lower()}:*' for term in terms) or None
+
+# External-content FTS5 table over indicators plus the triggers that keep it in
+# sync with inserts, upserts and deletes; prefix indexes make 'rsi*' a lookup
+SQLITE_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {', '.join(SEARCH_COLUMNS)}, content='indicators', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS indicators_fts_insert AFTER INSERT ON indicators BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{column}' for column in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS indicators_fts_delete AFTER DELETE ON indicators BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS indicators_fts_update
+    AFTER UPDATE OF {', '.join(SEARCH_COLUMNS)} ON indicators BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in SEARCH_COLUMNS)});
+        INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{column}' for column in SEARCH_COLUMNS)});
+    END
+    """,
+]
+
+POSTGRES_SEARCH_DDL = [
+    f"""
+    ALTER TABLE indicators ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR} tsvector GENERATED ALWAYS AS (
+        {' || '.join(f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+                     for column, weight in zip(SEARCH_COLUMNS, _TSVECTOR_WEIGHTS))}
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS idx_indicators_search ON indicators USING GIN ({SEARCH_VECTOR})",
+]
+
+def search_index_ddl(dialect_name: str) -> List[str]:
+    """Statements creating the full-text index on a dialect; none where it is unsupported"""
+    return {'sqlite': SQLITE_SEARCH_DDL, 'postgresql': POSTGRES_SEARCH_DDL}.get(dialect_name, [])
+
+def create_search_index(connection, dialect_name: str):
+    """Run the full-text index DDL for a dialect on an SQLAlchemy connection"""
+    for statement in search_index_ddl(dialect_name):
+        connection.exec_driver_sql(statement)
+
+def ensure_sqlite_search(conn: sqlite3.Connection) -> bool:
+    """Create the FTS5 index on an SQLite indicators table and fill it if it is new.
+
+    Returns False when this SQLite build has no FTS5; search then falls back
+    to substring matching.
+    """
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone() is not None
+        for statement in SQLITE_SEARCH_DDL:
+            conn.execute(statement)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Full-text search unavailable, using substring search: {e}")
+        return False
+    if not exists:
+        # Index rows written before the index existed
+        conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+def candidate_limit(max_candidates: int) -> int:
+    """:candidates value for sqlite_ranked_matches; -1 (no limit) when max_candidates is 0"""
+    return max_candidates if max_candidates and max_candidates > 0 else -1
+
+def sqlite_ranked_matches(conditions: Sequence[str] = ()) -> str:
+    """(rowid, score) of the rows matching :match, lower score is better.
+
+    Only the :candidates newest matches are scored (-1 scores all of them).
+    bm25 has to score every match, which for a common prefix is most of the
+    table; a limit keeps a broad query's cost fixed as the corpus grows, at
+    the price of leaving older matches out of the ranking. conditions are
+    SQL filters on the indicators table, applied before the limit so a
+    filtered search still sees every matching row it could return.
+    """
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+    join = f" JOIN indicators ON indicators.id = {FTS_TABLE}.rowid" if conditions else ''
+    where = ''.join(f" AND {condition}" for condition in conditions)
+    return f"""
+        SELECT {FTS_TABLE}.rowid AS rowid, bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE}{join}
+        WHERE {FTS_TABLE} MATCH :match{where}
+        ORDER BY {FTS_TABLE}.rowid DESC
+        LIMIT :candidates
+    """
@@ -0,0 +1,269 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import tempfile
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+
+try:
+    import fcntl
+except ImportError:  # No flock (Windows): keep to one writing process per index
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_STOP_WORDS = frozenset(
+    'a an and are as at be by for from has in is it its of on or that the this to with you your'.split()
+)
+# Components of a unit vector are within [-1, 1]; stored as int8 in [-127, 127]
+_SCALE = 127.0
+# Rows scored per step, so a query never converts the whole matrix to float at once
+_CHUNK_ROWS = 8192
+
+def indicator_text(name: str = None, description: str = None, functionality: str = None) -> str:
+    """What an indicator is compared on; the name is repeated so it weighs more"""
+    return ' '.join(part for part in (name, name, description, functionality) if part)
+
+def text_features(text: str) -> Counter:
+    """Lowercase words (minus stop words) and the character trigrams of longer words.
+
+    Trigrams let 'divergence' and 'divergences' or 'macd' and 'macd-v' overlap.
+    """
+    features = Counter()
+    for word in _WORD.findall((text or '').lower()):
+        if word in _STOP_WORDS or len(word) < 2:
+            continue
+        features['w:' + word] += 1.0
+        if len(word) >= 4:
+            padded = f'#{word}#'
+            for i in range(len(padded) - 2):
+                features['c:' + padded[i:i + 3]] += 0.5
+    return features
+
+def hash_vector(text: str, dimensions: int) -> np.ndarray:
+    """Unit-length hashed feature vector with sublinear term weights.
+
+    Features are hashed with crc32 (stable across processes, unlike hash())
+    and the top hash bit picks the sign, so collisions tend to cancel out.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, count in text_features(text).items():
+        h = zlib.crc32(feature.encode('utf-8'))
+        vector[h % dimensions] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count + 1.0))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class SimilarityIndex:
+    """Nearest-neighbour index over hashed text vectors, stored next to the database.
+
+    Each indicator is one int8 row of a memory-mapped matrix (`vectors.i8`,
+    `dimensions` bytes per indicator) with its id in `ids.i64`; new
+    indicators are appended and changed ones overwritten in place, so
+    updates are incremental. A query converts the matrix to float32 in
+    chunks and takes the top k of one matrix-vector product, weighting the
+    query by inverse document frequency per dimension (`df.npy`) so rare
+    words count more than common ones.
+
+    Other processes (e.g. the dashboard while a crawl writes) see appended
+    rows on their next query: the id file's size and the df file's mtime
+    are checked each time. Writers in different processes (the scraper and
+    the dashboard both index rows) take turns through an flock on
+    `write.lock` and reload the files before changing them.
+    """
+
+    def __init__(self, directory: str = None, dimensions: int = None):
+        self.directory = directory or os.path.join(settings.DATA_DIR, 'similarity')
+        self.dimensions = dimensions or settings.SIMILARITY_DIMENSIONS
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors_path = os.path.join(self.directory, 'vectors.i8')
+        self._ids_path = os.path.join(self.directory, 'ids.i64')
+        self._df_path = os.path.join(self.directory, 'df.npy')
+        self._write_lock_path = os.path.join(self.directory, 'write.lock')
+        self._lock = threading.Lock()
+        self._check_layout()
+        self._load()
+
+    def _check_layout(self):
+        meta_path = os.path.join(self.directory, 'meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+        if meta.get('dimensions') != self.dimensions:
+            if meta:
+                logger.warning(f"Similarity index at {self.directory} has {meta.get('dimensions')} dimensions, "
+                               f"not {self.dimensions}; starting a new one")
+            for path in (self._vectors_path, self._ids_path, self._df_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            with open(meta_path, 'w') as file:
+                json.dump({'dimensions': self.dimensions}, file)
+
+    def _load(self):
+        ids_size = os.path.getsize(self._ids_path) if os.path.exists(self._ids_path) else 0
+        vectors_size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        # A crash between the two appends leaves at most one partial row; ignore it
+        count = min(ids_size // 8, vectors_size // self.dimensions)
+        if count:
+            self._ids = np.fromfile(self._ids_path, dtype=np.int64, count=count)
+            self._matrix = np.memmap(self._vectors_path, dtype=np.int8, mode='r+', shape=(count, self.dimensions))
+        else:
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._matrix = np.zeros((0, self.dimensions), dtype=np.int8)
+        self._rows = {int(indicator_id): row for row, indicator_id in enumerate(self._ids)}
+        self._load_df()
+        self._loaded_size = ids_size
+
+    def _load_df(self):
+        self._df_mtime = os.stat(self._df_path).st_mtime_ns if os.path.exists(self._df_path) else None
+        self._df = np.load(self._df_path) if self._df_mtime else np.zeros(self.dimensions, np.int64)
+
+    def _refresh(self):
+        size = os.path.getsize(self._ids_path) if os.path.exists(self._ids_path) else 0
+        if size != self._loaded_size:
+            self._load()
+            return
+        # Replacing vectors in place changes df without growing the id file
+        mtime = os.stat(self._df_path).st_mtime_ns if os.path.exists(self._df_path) else None
+        if mtime != self._df_mtime:
+            self._load_df()
+
+    @contextmanager
+    def _writing(self):
+        """Hold the inter-process write lock; threads are already serialised by self._lock"""
+        with open(self._write_lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_df(self):
+        # Through a temp file so a reader never loads a half-written array
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            np.save(file, self._df)
+        os.replace(tmp_path, self._df_path)
+        self._df_mtime = os.stat(self._df_path).st_mtime_ns
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+    def __contains__(self, indicator_id: int) -> bool:
+        with self._lock:
+            self._refresh()
+            return int(indicator_id) in self._rows
+
+    def add(self, indicator_id: int, text: str):
+        self.add_many([(indicator_id, text)])
+
+    def add_many(self, items: Iterable[Tuple[int, str]]):
+        """Index (id, text) pairs; an id already present has its vector replaced"""
+        items = [(int(indicator_id), np.round(hash_vector(text, self.dimensions) * _SCALE).astype(np.int8))
+                 for indicator_id, text in items]
+        if not items:
+            return
+        with self._lock, self._writing():
+            # Another process may have written since we last looked
+            self._refresh()
+            appended, replaced = {}, False
+            for indicator_id, quantized in items:
+                row = self._rows.get(indicator_id)
+                previous = self._matrix[row] if row is not None else appended.get(indicator_id)
+                if previous is not None:
+                    self._df[previous != 0] -= 1
+                self._df[quantized != 0] += 1
+                if row is not None:
+                    self._matrix[row] = quantized
+                    replaced = True
+                else:
+                    appended[indicator_id] = quantized
+            if replaced:
+                self._matrix.flush()
+            if not appended:
+                self._save_df()
+                return
+            # Vectors first and on disk: a reader sizes the index by the id file
+            with open(self._vectors_path, 'ab') as file:
+                file.write(np.stack(list(appended.values())).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            with open(self._ids_path, 'ab') as file:
+                file.write(np.fromiter(appended, dtype=np.int64, count=len(appended)).tobytes())
+            self._save_df()
+
+            start = len(self._ids)
+            self._ids = np.concatenate([self._ids, np.fromiter(appended, dtype=np.int64, count=len(appended))])
+            self._rows.update((indicator_id, start + i) for i, indicator_id in enumerate(appended))
+            self._matrix = np.memmap(self._vectors_path, dtype=np.int8, mode='r+',
+                                     shape=(len(self._ids), self.dimensions))
+            self._loaded_size = os.path.getsize(self._ids_path)
+
+    def similar(self, indicator_id: int, k: int = 5) -> List[Tuple[int, float]]:
+        """(id, score) of the k indicators closest to an indexed one, best first"""
+        with self._lock:
+            self._refresh()
+            row = self._rows.get(int(indicator_id))
+            if row is None:
+                return []
+            vector = self._matrix[row].astype(np.float32) / _SCALE
+            return self._top(vector, k, exclude_row=row)
+
+    def query(self, text: str, k: int = 5) -> List[Tuple[int, float]]:
+        """(id, score) of the k indicators closest to arbitrary text, best first"""
+        with self._lock:
+            self._refresh()
+            return self._top(hash_vector(text, self.dimensions), k)
+
+    def _top(self, vector: np.ndarray, k: int, exclude_row: Optional[int] = None) -> List[Tuple[int, float]]:
+        count = len(self._ids)
+        if not count or k <= 0:
+            return []
+        idf = np.log((count + 1.0) / (self._df + 1.0)).astype(np.float32) + 1.0
+        weighted = vector * idf
+        norm = np.linalg.norm(weighted)
+        if not norm:
+            return []
+        weighted /= norm * _SCALE
+
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, _CHUNK_ROWS):
+            chunk = self._matrix[start:start + _CHUNK_ROWS]
+            scores[start:start + len(chunk)] = chunk.astype(np.float32) @ weighted
+        if exclude_row is not None:
+            scores[exclude_row] = -np.inf
+
+        k = min(k, count - (exclude_row is not None))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self._ids[row]), float(scores[row])) for row in top]
+
+    def missing(self, indicator_ids: Iterable[int]) -> List[int]:
+        """Those of the given ids that are not indexed yet"""
+        with self._lock:
+            self._refresh()
+            return [indicator_id for indicator_id in indicator_ids if int(indicator_id) not in self._rows]
+
+def similarity_dir(db_path: str) -> str:
+    """Where the index for an SQLite database file lives: indicators.db -> indicators_similarity/"""
+    return os.path.splitext(db_path)[0] + '_similarity'
+
+def index_rows(index: SimilarityIndex, rows: Iterable[Tuple[int, Optional[str], Optional[str], Optional[str]]]):
+    """Index (id, name, description, functionality) rows"""
+    index.add_many((row[0], indicator_text(*row[1:])) for row in rows)
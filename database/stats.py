@@ -0,0 +1,142 @@
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+STATS_TABLE = 'indicator_daily_stats'
+# Per-day counters; averages are sum / count so missing ratings are left out, as AVG() does
+STATS_COLUMNS = (
+    'indicators', 'profitability_sum', 'profitability_count', 'reliability_sum', 'reliability_count'
+)
+
+def _delta_values(row: str, sign: int, day: str) -> str:
+    """VALUES for one row's contribution (sign +1 or -1) to its day"""
+    return (
+        f"({day}, {sign}, "
+        f"{sign} * COALESCE({row}.profitability_rating, 0), "
+        f"CASE WHEN {row}.profitability_rating IS NULL THEN 0 ELSE {sign} END, "
+        f"{sign} * COALESCE({row}.reliability_rating, 0), "
+        f"CASE WHEN {row}.reliability_rating IS NULL THEN 0 ELSE {sign} END)"
+    )
+
+_ACCUMULATE = ', '.join(f"{column} = {STATS_TABLE}.{column} + excluded.{column}" for column in STATS_COLUMNS)
+
+def _apply(row: str, sign: int, day: str) -> str:
+    return f"""
+        INSERT INTO {STATS_TABLE} (day, {', '.join(STATS_COLUMNS)})
+        VALUES {_delta_values(row, sign, day)}
+        ON CONFLICT (day) DO UPDATE SET {_ACCUMULATE};
+    """
+
+def _sqlite_apply(row: str, sign: int, date_column: str) -> str:
+    return _apply(row, sign, f"COALESCE(date({row}.{date_column}), '')")
+
+def _table_ddl(real_type: str) -> str:
+    counters = ', '.join(f'{column} {real_type} NOT NULL DEFAULT 0' if column.endswith('_sum')
+                         else f'{column} INTEGER NOT NULL DEFAULT 0' for column in STATS_COLUMNS)
+    return f"CREATE TABLE IF NOT EXISTS {STATS_TABLE} (day TEXT PRIMARY KEY, {counters})"
+
+def sqlite_stats_ddl(date_column: str) -> List[str]:
+    """Stats table plus triggers keeping it current; date_column picks the day a row counts for"""
+    return [
+        _table_ddl('REAL'),
+        f"""
+        CREATE TRIGGER IF NOT EXISTS indicators_stats_insert AFTER INSERT ON indicators BEGIN
+            {_sqlite_apply('new', 1, date_column)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS indicators_stats_delete AFTER DELETE ON indicators BEGIN
+            {_sqlite_apply('old', -1, date_column)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS indicators_stats_update
+        AFTER UPDATE OF profitability_rating, reliability_rating, {date_column} ON indicators BEGIN
+            {_sqlite_apply('old', -1, date_column)}
+            {_sqlite_apply('new', 1, date_column)}
+        END
+        """,
+    ]
+
+def postgres_stats_ddl(date_column: str) -> List[str]:
+    def apply(row, sign):
+        return _apply(row, sign, f"COALESCE(to_char({row}.{date_column}, 'YYYY-MM-DD'), '')")
+
+    return [
+        _table_ddl('DOUBLE PRECISION'),
+        f"""
+        CREATE OR REPLACE FUNCTION indicators_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {apply('OLD', -1)}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {apply('NEW', 1)}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS indicators_stats ON indicators",
+        f"""
+        CREATE TRIGGER indicators_stats
+        AFTER INSERT OR DELETE OR UPDATE OF profitability_rating, reliability_rating, {date_column} ON indicators
+        FOR EACH ROW EXECUTE FUNCTION indicators_stats_trigger()
+        """,
+    ]
+
+def stats_ddl(dialect_name: str, date_column: str) -> List[str]:
+    if dialect_name == 'sqlite':
+        return sqlite_stats_ddl(date_column)
+    if dialect_name == 'postgresql':
+        return postgres_stats_ddl(date_column)
+    return []
+
+def backfill_sql(dialect_name: str, date_column: str) -> str:
+    """One pass over indicators producing every day's counters, for an empty stats table"""
+    day = (f"COALESCE(to_char({date_column}, 'YYYY-MM-DD'), '')" if dialect_name == 'postgresql'
+           else f"COALESCE(date({date_column}), '')")
+    return f"""
+        INSERT INTO {STATS_TABLE} (day, {', '.join(STATS_COLUMNS)})
+        SELECT {day}, COUNT(*),
+               COALESCE(SUM(profitability_rating), 0), COUNT(profitability_rating),
+               COALESCE(SUM(reliability_rating), 0), COUNT(reliability_rating)
+        FROM indicators
+        GROUP BY 1
+    """
+
+def ensure_sqlite_stats(conn: sqlite3.Connection, date_column: str):
+    """Create the stats table and triggers, filling the table from existing rows if it is new.
+
+    Stats kept on a different date column by an older version are rebuilt.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (STATS_TABLE,)
+    ).fetchone() is not None
+    trigger = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'indicators_stats_insert'"
+    ).fetchone()
+    if exists and (trigger is None or f"date(new.{date_column})" not in trigger[0]):
+        for name in ('insert', 'delete', 'update'):
+            conn.execute(f"DROP TRIGGER IF EXISTS indicators_stats_{name}")
+        conn.execute(f"DROP TABLE {STATS_TABLE}")
+        exists = False
+    for statement in sqlite_stats_ddl(date_column):
+        conn.execute(statement)
+    if not exists:
+        conn.execute(backfill_sql('sqlite', date_column))
+
+def summarize(days: List[tuple], recent_days: int = 7, today: date = None) -> Dict[str, Any]:
+    """Dashboard numbers from (day, indicators, profitability_sum, profitability_count,
+    reliability_sum, reliability_count) rows"""
+    cutoff = ((today or date.today()) - timedelta(days=recent_days)).isoformat()
+    total = sum(row[1] for row in days)
+    profitability_count = sum(row[3] for row in days)
+    reliability_count = sum(row[5] for row in days)
+    return {
+        'total_indicators': total,
+        'avg_profitability': sum(row[2] for row in days) / profitability_count if profitability_count else None,
+        'avg_reliability': sum(row[4] for row in days) / reliability_count if reliability_count else None,
+        'recent_additions': sum(row[1] for row in days if row[0] and row[0] >= cutoff),
+        'daily': {row[0]: row[1] for row in days if row[0] and row[1]},
+    }
@@ -0,0 +1,150 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from config import settings
+from database.connection import get_connection
+from database.pagination import Page, decode_cursor, encode_cursor
+from database.search import FTS_TABLE, SEARCH_COLUMNS, candidate_limit, fts5_query, sqlite_ranked_matches
+from database.similarity import SimilarityIndex, index_rows, similarity_dir
+from database.stats import STATS_COLUMNS, STATS_TABLE, summarize
+
+# Small columns the dashboard metrics, charts and search work from
+SUMMARY_COLUMNS = (
+    'id', 'url', 'name', 'profitability_rating', 'reliability_rating', 'analyzed_date', 'updated_at'
+)
+# Long text, loaded only when a single indicator is opened
+DETAIL_COLUMNS = (
+    'description', 'functionality', 'usage_guidelines', 'user_feedback', 'additional_insights'
+)
+
+class IndicatorSummary:
+    """Narrow reads of the indicators table for the dashboard.
+
+    Each method answers one question (a page, a few rows, the totals) with
+    a targeted query instead of loading the whole table. version() is a
+    cheap token that changes whenever the table does (updated_at is set by
+    the scraper's batch writer), for use as a cache key.
+
+    One instance may be shared by several threads (e.g. Streamlit
+    sessions): the similarity index is set up under a lock; the other
+    methods only read the database.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, "indicators.db")
+        self._similarity = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        return get_connection(self.db_path)
+
+    def version(self) -> Tuple[int, Optional[str]]:
+        """Row count and newest write time, answered from indexes without reading the text columns"""
+        return tuple(self.conn.execute("SELECT COUNT(*), MAX(updated_at) FROM indicators").fetchone())
+
+    def rows(self, urls: Sequence[str]) -> pd.DataFrame:
+        """Summary rows for the given urls, in that order; for search results and other short lists"""
+        frames = []
+        for i in range(0, len(urls), 500):
+            chunk = list(urls[i:i + 500])
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM indicators WHERE url IN ({','.join('?' * len(chunk))})",
+                self.conn, params=chunk
+            ))
+        if not frames:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        found = pd.concat(frames, ignore_index=True).set_index('url', drop=False)
+        return found.reindex([url for url in urls if url in found.index]).reset_index(drop=True)
+
+    def names(self, ids: Sequence[int]) -> Dict[int, str]:
+        """Names of the given indicator ids"""
+        names = {}
+        for i in range(0, len(ids), 500):
+            chunk = [int(indicator_id) for indicator_id in ids[i:i + 500]]
+            names.update(self.conn.execute(
+                f"SELECT id, name FROM indicators WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return names
+
+    def rating_distribution(self) -> pd.DataFrame:
+        """Indicators per rating value (index 0-10), one column per rating"""
+        counts = {}
+        for column in ('profitability_rating', 'reliability_rating'):
+            counts[column] = pd.Series(dict(self.conn.execute(
+                f"SELECT {column}, COUNT(*) FROM indicators WHERE {column} IS NOT NULL GROUP BY {column}"
+            ).fetchall()), dtype='int64')
+        return pd.DataFrame(counts).reindex(range(11), fill_value=0).fillna(0).astype('int64')
+
+    def statistics(self) -> Dict[str, Any]:
+        """Totals, average ratings and indicators per day from the daily stats table"""
+        return summarize(self.conn.execute(f"SELECT day, {', '.join(STATS_COLUMNS)} FROM {STATS_TABLE}").fetchall())
+
+    def page(self, cursor: str = None, limit: int = 50) -> Page:
+        """Summary rows newest first, limit at a time; a keyset read on id, so any page is as cheap as the first.
+
+        Ids are AUTOINCREMENT and kept on upsert, so id order is created_at
+        order, the same order the ORM's (created_at, id) pages give, without
+        an index on created_at.
+        """
+        query = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM indicators"
+        params = []
+        if cursor:
+            query += " WHERE id < ?"
+            params.extend(decode_cursor(cursor))
+        rows = self.conn.execute(query + " ORDER BY id DESC LIMIT ?", (*params, limit + 1)).fetchall()
+        items = [dict(zip(SUMMARY_COLUMNS, row)) for row in rows[:limit]]
+        return Page(items, encode_cursor([items[-1]['id']]) if len(rows) > limit else None)
+
+    def details(self, url: str) -> Optional[Dict[str, Any]]:
+        """Text fields of one indicator"""
+        row = self.conn.execute(
+            f"SELECT {', '.join(DETAIL_COLUMNS)} FROM indicators WHERE url = ?", (url,)
+        ).fetchone()
+        return dict(zip(DETAIL_COLUMNS, row)) if row else None
+
+    def search(self, text: str, limit: int = 200) -> List[str]:
+        """URLs of indicators matching every word of text as a prefix, best match first"""
+        match = fts5_query(text)
+        if match is None:
+            return []
+        has_index = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)
+        ).fetchone() is not None
+        if has_index:
+            rows = self.conn.execute(f"""
+                SELECT indicators.url FROM ({sqlite_ranked_matches()}) AS matches
+                JOIN indicators ON indicators.id = matches.rowid
+                ORDER BY matches.score, indicators.id
+                LIMIT :limit
+            """, {'match': match, 'candidates': candidate_limit(settings.SEARCH_MAX_CANDIDATES), 'limit': limit})
+        else:
+            # SQLite built without FTS5
+            rows = self.conn.execute(
+                f"SELECT url FROM indicators WHERE {' OR '.join(f'{column} LIKE ?' for column in SEARCH_COLUMNS)} "
+                "LIMIT ?", (*[f'%{text}%'] * len(SEARCH_COLUMNS), limit)
+            )
+        return [row[0] for row in rows]
+
+    def similar(self, indicator_id: int, k: int = 5) -> List[Tuple[int, float]]:
+        """(id, score) of the indicators most like this one, from the scraper's similarity index"""
+        with self._lock:
+            if self._similarity is None:
+                self._similarity = self._open_similarity()
+        return self._similarity.similar(indicator_id, k)
+
+    def _open_similarity(self) -> SimilarityIndex:
+        index = SimilarityIndex(similarity_dir(self.db_path))
+        # Rows written before the index existed
+        ids = [row[0] for row in self.conn.execute("SELECT id FROM indicators")]
+        missing = index.missing(ids)
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            index_rows(index, self.conn.execute(
+                f"SELECT id, name, description, functionality FROM indicators "
+                f"WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return index
@@ -1,11 +1,23 @@
-from sqlalchemy import or_, and_, func
+from sqlalchemy import DateTime, Float, Integer, bindparam, case, or_, func, literal_column, text
 from .models import Indicator, AnalysisLog
-from typing import List, Dict, Optional
+from config import settings
+from .pagination import Page, after, decode_cursor, encode_cursor, order_by
+from .search import SEARCH_VECTOR, candidate_limit, fts5_query, search_terms, sqlite_ranked_matches, tsquery
+from .similarity import SimilarityIndex, index_rows
+from .stats import STATS_COLUMNS, STATS_TABLE, backfill_sql, summarize
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime, timedelta
 
 class IndicatorQueries:
-    def __init__(self, db_session):
+    def __init__(self, db_session, similarity_index: SimilarityIndex = None):
         self.session = db_session
+        self._similarity = similarity_index
+
+    @property
+    def similarity(self) -> SimilarityIndex:
+        if self._similarity is None:
+            self._similarity = SimilarityIndex()
+        return self._similarity
 
     def search_indicators(
         self,
@@ -19,56 +31,151 @@ class IndicatorQueries:
     ) -> List[Indicator]:
         """
         Advanced search functionality for indicators
+
+        A text query goes through the full-text index (FTS5 on SQLite, the
+        tsvector column on Postgres): every word matches as a prefix and
+        results come best match first. Without one, newest first.
+
+        offset makes the database skip that many rows on every call; to page
+        deep into results use search_page, which costs the same on every page.
+        """
+        search, keys = self._search_query(query, min_profitability, min_reliability, date_from, date_to)
+        return search\
+            .order_by(*order_by(keys))\
+            .limit(limit)\
+            .offset(offset)\
+            .all()
+
+    def search_page(
+        self,
+        query: str = None,
+        min_profitability: float = None,
+        min_reliability: float = None,
+        date_from: datetime = None,
+        date_to: datetime = None,
+        limit: int = 50,
+        cursor: str = None
+    ) -> Page[Indicator]:
+        """
+        One page of search_indicators results, continuing after cursor
+
+        Keyset pagination: the cursor holds the sort key of the previous
+        page's last row ((created_at, id), or the rank and id for text
+        queries), so each page is an index range read instead of an offset
+        scan. A cursor is only meaningful with the filters it came from.
+        """
+        search, keys = self._search_query(query, min_profitability, min_reliability, date_from, date_to)
+        if cursor:
+            search = search.filter(after(keys, decode_cursor(cursor)))
+        rows = search\
+            .add_columns(*[expression for expression, _ in keys])\
+            .order_by(*order_by(keys))\
+            .limit(limit + 1)\
+            .all()
+        next_cursor = encode_cursor(rows[limit - 1][1:]) if len(rows) > limit else None
+        return Page([row[0] for row in rows[:limit]], next_cursor)
+
+    def iter_indicators(self, batch_size: int = 1000) -> Iterator[Indicator]:
+        """
+        Every indicator, streamed batch_size rows at a time instead of loaded at once
         """
+        return self.session.query(Indicator)\
+            .order_by(Indicator.id)\
+            .yield_per(batch_size)
+
+    def _search_query(self, query, min_profitability, min_reliability, date_from, date_to):
+        """The filtered query and its sort keys as (expression, descending) pairs, id last"""
         filters = []
-        
-        if query:
-            filters.append(
-                or_(
-                    Indicator.name.ilike(f'%{query}%'),
-                    Indicator.description.ilike(f'%{query}%'),
-                    Indicator.functionality.ilike(f'%{query}%')
-                )
-            )
-            
+        # The same filters as SQL over the indicators table, for the FTS5 candidate query
+        conditions, params = [], {}
+        search = self.session.query(Indicator)
+        keys = [(Indicator.created_at, True), (Indicator.id, True)]
+
         if min_profitability:
             filters.append(Indicator.profitability_rating >= min_profitability)
-            
+            conditions.append("indicators.profitability_rating >= :min_profitability")
+            params['min_profitability'] = bindparam('min_profitability', min_profitability, Float)
+
         if min_reliability:
             filters.append(Indicator.reliability_rating >= min_reliability)
-            
+            conditions.append("indicators.reliability_rating >= :min_reliability")
+            params['min_reliability'] = bindparam('min_reliability', min_reliability, Float)
+
         if date_from:
             filters.append(Indicator.created_at >= date_from)
-            
+            conditions.append("indicators.created_at >= :date_from")
+            params['date_from'] = bindparam('date_from', date_from, DateTime)
+
         if date_to:
             filters.append(Indicator.created_at <= date_to)
+            conditions.append("indicators.created_at <= :date_to")
+            params['date_to'] = bindparam('date_to', date_to, DateTime)
 
-        return self.session.query(Indicator)\
-            .filter(and_(*filters))\
-            .order_by(Indicator.created_at.desc())\
-            .limit(limit)\
-            .offset(offset)\
-            .all()
+        if query and search_terms(query):
+            dialect = self.session.get_bind().dialect.name
+            if dialect == 'sqlite':
+                matches = text(sqlite_ranked_matches(conditions)).bindparams(
+                    bindparam('match', fts5_query(query)),
+                    bindparam('candidates', candidate_limit(settings.SEARCH_MAX_CANDIDATES)),
+                    *params.values()
+                ).columns(rowid=Integer, score=Float).subquery()
+                search = search.join(matches, matches.c.rowid == Indicator.id)
+                keys = [(matches.c.score, False), (Indicator.id, False)]
+            elif dialect == 'postgresql':
+                vector = literal_column(f'indicators.{SEARCH_VECTOR}')
+                ts_query = func.to_tsquery('simple', tsquery(query))
+                filters.append(vector.op('@@')(ts_query))
+                keys = [(func.ts_rank(vector, ts_query), True), (Indicator.id, False)]
+            else:
+                filters.append(
+                    or_(
+                        Indicator.name.ilike(f'%{query}%'),
+                        Indicator.description.ilike(f'%{query}%'),
+                        Indicator.functionality.ilike(f'%{query}%')
+                    )
+                )
+
+        return search.filter(*filters), keys
 
-    def get_statistics(self) -> Dict:
+    def get_statistics(self, exact: bool = False) -> Dict:
         """
         Get general statistics about indicators
+
+        Read from the trigger-maintained daily stats table, so the cost does
+        not grow with the number of indicators; recent_additions counts whole
+        days. exact=True computes them from the indicators table instead, in
+        a single aggregate pass.
         """
-        return {
-            'total_indicators': self.session.query(func.count(Indicator.id)).scalar(),
-            'avg_profitability': self.session.query(func.avg(Indicator.profitability_rating)).scalar(),
-            'avg_reliability': self.session.query(func.avg(Indicator.reliability_rating)).scalar(),
-            'recent_additions': self.session.query(func.count(Indicator.id))\
-                .filter(Indicator.created_at >= datetime.now() - timedelta(days=7))\
-                .scalar()
-        }
+        if exact:
+            cutoff = datetime.now() - timedelta(days=7)
+            total, avg_profitability, avg_reliability, recent = self.session.query(
+                func.count(Indicator.id),
+                func.avg(Indicator.profitability_rating),
+                func.avg(Indicator.reliability_rating),
+                func.coalesce(func.sum(case((Indicator.created_at >= cutoff, 1), else_=0)), 0),
+            ).one()
+            return {
+                'total_indicators': total,
+                'avg_profitability': avg_profitability,
+                'avg_reliability': avg_reliability,
+                'recent_additions': recent,
+            }
+        return summarize(self.session.execute(
+            text(f"SELECT day, {', '.join(STATS_COLUMNS)} FROM {STATS_TABLE}")
+        ).all())
+
+    def recompute_statistics(self):
+        """Rebuild the daily stats table from the indicators table, e.g. after bulk edits with triggers off"""
+        dialect = self.session.get_bind().dialect.name
+        self.session.execute(text(f"DELETE FROM {STATS_TABLE}"))
+        self.session.execute(text(backfill_sql(dialect, 'created_at')))
 
     def get_top_indicators(self, limit: int = 10) -> List[Indicator]:
         """
         Get top performing indicators based on combined ratings
         """
         return self.session.query(Indicator)\
-            .order_by((Indicator.profitability_rating + Indicator.reliability_rating).desc())\
+            .order_by(Indicator.combined_score.desc())\
             .limit(limit)\
             .all()
 
@@ -83,15 +190,31 @@ class IndicatorQueries:
 
     def get_similar_indicators(self, indicator_id: int, limit: int = 5) -> List[Indicator]:
         """
-        Find similar indicators based on name and description
+        Find similar indicators based on name, description and functionality
+
+        Uses the local similarity index (see database/similarity.py), so it
+        works on any backend; rows not indexed yet are indexed first.
         """
-        indicator = self.session.query(Indicator).get(indicator_id)
-        if not indicator:
+        self.index_missing()
+        # A few spare neighbours in case some were deleted since they were indexed
+        neighbours = [neighbour_id for neighbour_id, _ in self.similarity.similar(indicator_id, limit + 5)]
+        if not neighbours:
             return []
-            
-        return self.session.query(Indicator)\
-            .filter(Indicator.id != indicator_id)\
-            .order_by(
-                func.similarity(Indicator.name, indicator.name) +
-                func.similarity(Indicator.description, indicator.description)
-            ).limit(limit).all()
\ No newline at end of file
+        found = {
+            indicator.id: indicator
+            for indicator in self.session.query(Indicator).filter(Indicator.id.in_(neighbours))
+        }
+        return [found[neighbour_id] for neighbour_id in neighbours if neighbour_id in found][:limit]
+
+    def index_missing(self, batch_size: int = 1000) -> int:
+        """Add indicators written without going through the index; returns how many"""
+        total = self.session.query(func.count(Indicator.id)).scalar()
+        if total <= len(self.similarity):
+            return 0
+        ids = [row[0] for row in self.session.query(Indicator.id)]
+        missing = self.similarity.missing(ids)
+        for i in range(0, len(missing), batch_size):
+            index_rows(self.similarity, self.session.query(
+                Indicator.id, Indicator.name, Indicator.description, Indicator.functionality
+            ).filter(Indicator.id.in_(missing[i:i + batch_size])))
+        return len(missing)
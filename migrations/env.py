@@ -0,0 +1,82 @@
+"""Alembic environment: migrates the database in settings.DATABASE_URL.
+
+    alembic upgrade head
+    alembic -x url=sqlite:///data/other.db upgrade head
+"""
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from database.models import Base
+from database.search import FTS_TABLE
+from database.stats import STATS_TABLE
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Made by raw DDL in the migrations rather than by the models: the FTS5 table
+# with its shadow tables, and the trigger-maintained daily stats. Autogenerate
+# would otherwise offer to drop them.
+UNMANAGED_TABLES = frozenset(
+    [FTS_TABLE, STATS_TABLE]
+    + [f'{FTS_TABLE}_{shadow}' for shadow in ('data', 'idx', 'content', 'docsize', 'config')]
+)
+
+def include_object(object_, name, type_, reflected, compare_to):
+    """Leave UNMANAGED_TABLES and their indexes out of autogenerate"""
+    if type_ == 'table':
+        return name not in UNMANAGED_TABLES
+    table = getattr(object_, 'table', None)
+    return table is None or table.name not in UNMANAGED_TABLES
+
+def database_url():
+    return context.get_x_argument(as_dictionary=True).get('url') \
+        or config.get_main_option('sqlalchemy.url') \
+        or settings.DATABASE_URL
+
+def run_migrations_offline():
+    """Emit the migration SQL instead of running it (alembic upgrade head --sql)"""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite can only alter tables by copying them
+        render_as_batch=connection.dialect.name == 'sqlite',
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        # An open connection passed in by the caller, e.g. a test
+        run_migrations(connection)
+        return
+    engine = engine_from_config({'sqlalchemy.url': database_url()}, prefix='sqlalchemy.', poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        run_migrations(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
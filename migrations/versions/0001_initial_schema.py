@@ -0,0 +1,66 @@
+"""Initial schema: indicators with their full-text index, crawl jobs and analysis logs
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from database.search import search_index_ddl
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'indicators',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('url', sa.String(), nullable=False, unique=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String()),
+        sa.Column('functionality', sa.String()),
+        sa.Column('usage_guidelines', sa.String()),
+        sa.Column('user_feedback', sa.JSON()),
+        sa.Column('additional_insights', sa.String()),
+        sa.Column('profitability_rating', sa.Float()),
+        sa.Column('reliability_rating', sa.Float()),
+        sa.Column('raw_data', sa.JSON()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    for statement in search_index_ddl(op.get_context().dialect.name):
+        op.execute(statement)
+
+    op.create_table(
+        'crawl_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('params', sa.JSON()),
+        sa.Column('stats', sa.JSON()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('checkpoint_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime()),
+    )
+    op.create_table(
+        'analysis_logs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('indicator_id', sa.Integer()),
+        sa.Column('status', sa.String()),
+        sa.Column('error_message', sa.String(), nullable=True),
+        sa.Column('execution_time', sa.Float()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('crawl_jobs.id')),
+        sa.Column('url', sa.String()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('idx_analysis_logs_job_url', 'analysis_logs', ['job_id', 'url'], unique=True)
+
+def downgrade():
+    op.drop_table('analysis_logs')
+    op.drop_table('crawl_jobs')
+    if op.get_context().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS indicators_fts")
+    op.drop_table('indicators')
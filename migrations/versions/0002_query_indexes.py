@@ -0,0 +1,30 @@
+"""Indexes for the hot IndicatorQueries paths
+
+- indicators (created_at, id): newest-first listing, date filters and keyset paging
+- indicators (profitability_rating + reliability_rating): get_top_indicators
+- analysis_logs (indicator_id, created_at): get_analysis_history
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('idx_indicators_created_at', 'indicators', ['created_at', 'id'])
+    op.create_index(
+        'idx_indicators_combined_score', 'indicators',
+        [sa.text('(profitability_rating + reliability_rating)')]
+    )
+    op.create_index('idx_analysis_logs_indicator_created', 'analysis_logs', ['indicator_id', 'created_at'])
+
+def downgrade():
+    op.drop_index('idx_analysis_logs_indicator_created', table_name='analysis_logs')
+    op.drop_index('idx_indicators_combined_score', table_name='indicators')
+    op.drop_index('idx_indicators_created_at', table_name='indicators')
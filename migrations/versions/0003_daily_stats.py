@@ -0,0 +1,29 @@
+"""Daily indicator stats table, maintained by triggers, for get_statistics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+from database.stats import STATS_TABLE, backfill_sql, stats_ddl
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+    for statement in stats_ddl(dialect, 'created_at'):
+        op.execute(statement)
+    op.execute(backfill_sql(dialect, 'created_at'))
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS indicators_stats ON indicators")
+        op.execute("DROP FUNCTION IF EXISTS indicators_stats_trigger()")
+    else:
+        for trigger in ('insert', 'delete', 'update'):
+            op.execute(f"DROP TRIGGER IF EXISTS indicators_stats_{trigger}")
+    op.drop_table(STATS_TABLE)
@@ -1,38 +1,324 @@
 import openai
+import asyncio
 import logging
-from typing import Dict, Any
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
 from datetime import datetime
 from config import settings
+from scraper.data_validator import AnalysisResult
+from scraper.json_stream import JsonObjectStream, loads_lenient
+from scraper.llm_cache import ResponseCache, cache_key, get_response_cache
+from scraper.prompt_budget import BudgetedContent, fit_to_budget
+from scraper.rate_limiter import OPENAI_HOST, get_host_limiter
+from scraper.tokens import count_tokens
+
+DEFAULT_MODEL = "gpt-3.5-turbo-16k"  # or "gpt-4" depending on needs
+
+# Bump whenever _create_analysis_prompt changes so stored analyses get redone
+PROMPT_VERSION = "2"
+
+SYSTEM_MESSAGE = "You are a trading indicator analysis expert."
+
+# Reply structure requested for every analyzed indicator
+ANALYSIS_SCHEMA = """{
+            "indicator_functionality": "",
+            "usage_guidelines": "",
+            "user_feedback": {"positive": [], "negative": []},
+            "additional_insights": "",
+            "ratings": {"profitability": 0-10, "reliability": 0-10}
+        }"""
+
+# Sentinel so IndicatorAnalyzer(cache=None) can mean "no cache"
+_DEFAULT_CACHE = object()
+
+class InvalidResponseError(ValueError):
+    """The model's reply could not be parsed or failed AnalysisResult validation"""
+
+# Transient failures worth another attempt after a backoff. A malformed reply
+# is repaired locally where possible and otherwise fails once: asking again
+# costs another paid completion.
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.ServiceUnavailableError,
+    asyncio.TimeoutError,
+)
+
+@dataclass
+class AnalysisOutcome:
+    """Result of one analysis in a batch, with its wall-clock latency"""
+    data: Dict[str, Any]
+    analysis: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+    latency: float = 0.0
+    attempts: int = 0
+    packed: bool = False  # Answered as part of a multi-indicator request
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class IndicatorAnalyzer:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, limiter=None, cache: ResponseCache = _DEFAULT_CACHE):
         # Use the provided api_key or default to the one in settings
         self.api_key = api_key or settings.OPENAI_API_KEY
         openai.api_key = self.api_key
-        self.model = "gpt-3.5-turbo-16k"  # or "gpt-4" depending on needs
+        self.model = DEFAULT_MODEL
+        self.prompt_version = PROMPT_VERSION
+        self.limiter = limiter or get_host_limiter()
+        # Identical (model, system message, prompt) requests are answered from here
+        self.cache = get_response_cache() if cache is _DEFAULT_CACHE else cache
+        self.timeout = settings.ANALYSIS_TIMEOUT_SECONDS
+        self.max_retries = settings.ANALYSIS_MAX_RETRIES
+        self.retry_base_delay = settings.ANALYSIS_RETRY_BASE_DELAY
+        self.retry_max_delay = 60.0
+        self.streaming = settings.ANALYSIS_STREAMING
+        self.token_budget = None  # None: the per-model budget from settings
+        self.prompt_stats = Counter()
+
+    @property
+    def uses_mock(self) -> bool:
+        """True with the dummy API key, when analyses are mock results rather than model output"""
+        return self.api_key == 'sk-dummy-key-for-testing'
 
     async def analyze_indicator(self, data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             # Check if we're using a dummy API key (for testing)
-            if self.api_key == 'sk-dummy-key-for-testing':
+            if self.uses_mock:
                 logging.warning("Using dummy OpenAI API key. Returning mock analysis.")
                 return self._generate_mock_analysis(data)
 
             prompt = self._create_analysis_prompt(data)
+
+            def validate(content):
+                self._parse_gpt_response(content, data)
+
+            if self.streaming:
+                content = await self._complete_json_object(prompt, validate=validate)
+            else:
+                content = await self._complete(prompt, validate=validate)
+
+            # Parse the response into structured format
+            return self._parse_gpt_response(content, data)
+        except Exception as e:
+            logging.error(f"Analysis failed for {data['name']}: {str(e)}")
+            raise
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with full jitter, never shorter than a Retry-After hint"""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        headers = getattr(error, 'headers', None) or {}
+        try:
+            retry_after = float(headers.get('retry-after', 0))
+        except (TypeError, ValueError):
+            retry_after = 0
+        return max(delay, retry_after)
+
+    async def _with_retry(self, label: str, make_call):
+        """Await make_call() until it succeeds, retrying transient errors.
+
+        Returns (result, error, attempts); error is None on success.
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.wait_for(make_call(), self.timeout), None, attempt + 1
+            except RETRYABLE_ERRORS as e:
+                error = e
+                if attempt == self.max_retries:
+                    break
+                delay = self._backoff_delay(attempt, e)
+                logging.warning(f"Retrying {label} in {delay:.1f}s after {type(e).__name__}")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                return None, e, attempt + 1
+        return None, error, self.max_retries + 1
+
+    async def analyze_with_retry(self, data: Dict[str, Any]) -> AnalysisOutcome:
+        """Analyze one indicator, retrying rate-limit and timeout errors.
+
+        Never raises for a failed analysis; the error is returned in the outcome.
+        """
+        start = time.perf_counter()
+        analysis, error, attempts = await self._with_retry(
+            f"analysis of {data.get('name')}", lambda: self.analyze_indicator(data)
+        )
+        return AnalysisOutcome(
+            data=data, analysis=analysis, error=error,
+            latency=time.perf_counter() - start, attempts=attempts
+        )
+
+    async def analyze_many(
+        self,
+        items: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        concurrency: int = None
+    ) -> AsyncIterator[AnalysisOutcome]:
+        """Analyze indicators concurrently, yielding outcomes as they complete.
+
+        `items` may be a plain or async iterable. At most `concurrency`
+        analyses are in flight; the source is only read as slots free up.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.ANALYSIS_CONCURRENCY)
+        outcomes = asyncio.Queue()
+        tasks = set()
+        submitted = 0
+
+        async def run_one(data):
+            try:
+                outcome = await self.analyze_with_retry(data)
+            finally:
+                semaphore.release()
+            await outcomes.put(outcome)
+
+        async def feed():
+            nonlocal submitted
+            async def source():
+                if hasattr(items, '__aiter__'):
+                    async for item in items:
+                        yield item
+                else:
+                    for item in items:
+                        yield item
+            async for data in source():
+                await semaphore.acquire()
+                task = asyncio.create_task(run_one(data))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                submitted += 1
+
+        feeder = asyncio.create_task(feed())
+        received = 0
+        try:
+            while True:
+                if feeder.done():
+                    if feeder.exception():
+                        raise feeder.exception()
+                    if received == submitted:
+                        break
+                    outcome = await outcomes.get()
+                else:
+                    # Wake up for a finished analysis or for the source running dry
+                    getter = asyncio.create_task(outcomes.get())
+                    done, _ = await asyncio.wait({getter, feeder}, return_when=asyncio.FIRST_COMPLETED)
+                    if getter not in done:
+                        getter.cancel()
+                        continue
+                    outcome = getter.result()
+                received += 1
+                yield outcome
+        finally:
+            feeder.cancel()
+            for task in list(tasks):
+                task.cancel()
+
+    def _cached(self, key: str, validate: Callable[[str], Any] = None) -> Optional[str]:
+        """Cached reply for key, skipping one that no longer passes validate"""
+        content = self.cache.get(key) if self.cache is not None else None
+        if content is not None and not self._is_valid(content, validate):
+            return None
+        return content
+
+    def _remember(self, key: str, content: str, validate: Callable[[str], Any] = None):
+        """Cache a fresh reply, but only once it parses and validates"""
+        if self.cache is not None and self._is_valid(content, validate):
+            self.cache.set(key, content)
+
+    @staticmethod
+    def _is_valid(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        if validate is None:
+            return True
+        try:
+            validate(content)
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    async def _request(self, prompt: str, system_message: str, **options):
+        """Send one chat completion request through the shared OpenAI rate limiter"""
+        await self.limiter.acquire_async(OPENAI_HOST)
+        try:
             response = await openai.ChatCompletion.acreate(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "You are a trading indicator analysis expert."},
+                    {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                **options
             )
-
-            # Parse the response into structured format
-            analysis = self._parse_gpt_response(response.choices[0].message.content)
-            return analysis
-        except Exception as e:
-            logging.error(f"Analysis failed for {data['name']}: {str(e)}")
+        except openai.error.RateLimitError as e:
+            retry_after = (e.headers or {}).get('retry-after')
+            self.limiter.record_response(OPENAI_HOST, 429, retry_after)
             raise
+        self.limiter.record_response(OPENAI_HOST, 200)
+        return response
+
+    async def _complete(self, prompt: str, system_message: str = SYSTEM_MESSAGE,
+                        validate: Callable[[str], Any] = None) -> str:
+        """Return the model's reply to a prompt, from the response cache when possible.
+
+        A reply is cached only if validate(reply) does not raise, so a
+        malformed answer is asked for again instead of being replayed.
+        """
+        key = cache_key(self.model, system_message, prompt)
+        cached = await asyncio.to_thread(self._cached, key, validate)
+        if cached is not None:
+            return cached
+
+        response = await self._request(prompt, system_message)
+        content = response.choices[0].message.content
+        await asyncio.to_thread(self._remember, key, content, validate)
+        return content
+
+    async def _complete_json_object(self, prompt: str, system_message: str = SYSTEM_MESSAGE,
+                                    validate: Callable[[str], Any] = None) -> str:
+        """Stream the reply and return its first JSON object as soon as it closes.
+
+        The rest of the stream (closing fences, sign-offs) is not waited
+        for. If the stream ends before the object closes, the partial text is
+        returned for repair and is not cached; neither is an object that
+        fails validate.
+        """
+        key = cache_key(self.model, system_message, prompt)
+        cached = await asyncio.to_thread(self._cached, key, validate)
+        if cached is not None:
+            return cached
+
+        response = await self._request(prompt, system_message, stream=True)
+        parser = JsonObjectStream()
+        content = None
+        try:
+            async for chunk in response:
+                delta = chunk['choices'][0]['delta'].get('content')
+                if not delta:
+                    continue
+                objects = parser.feed(delta)
+                if objects:
+                    content = objects[0]
+                    break
+        finally:
+            aclose = getattr(response, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+
+        if content is None:
+            logging.warning("Response stream ended before the JSON object closed")
+            return parser.text
+        await asyncio.to_thread(self._remember, key, content, validate)
+        return content
+
+    def close(self):
+        """Release the response cache's connections"""
+        if self.cache is not None:
+            self.cache.close()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the response cache"""
+        return self.cache.stats() if self.cache is not None else {'hits': 0, 'misses': 0, 'size': 0}
 
     def _generate_mock_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate mock analysis for testing purposes"""
@@ -48,46 +334,190 @@ class IndicatorAnalyzer:
             'analyzed_date': datetime.now()
         }
 
+    def budget_stats(self) -> Dict[str, int]:
+        """Prompts built, and tokens and comments trimmed to fit the budget"""
+        return dict(self.prompt_stats)
+
+    def _budgeted_content(self, data: Dict[str, Any], record: bool = True) -> BudgetedContent:
+        content = fit_to_budget(data, self.model, self.token_budget)
+        if not record:
+            return content
+        self.prompt_stats.update({
+            'prompts': 1,
+            'tokens_saved': content.tokens_saved,
+            'comments_dropped': content.comments_dropped,
+        })
+        if content.tokens_saved:
+            logging.debug(f"Trimmed {content.tokens_saved} prompt tokens for {data.get('name')}")
+        return content
+
+    @staticmethod
+    def _format_comments(comments: List[str]) -> str:
+        return ''.join(f"\n        - {comment}" for comment in comments) or ' None'
+
     def _create_analysis_prompt(self, data: Dict[str, Any]) -> str:
+        content = self._budgeted_content(data)
         return f"""
         Please analyze and summarize this indicator '{data['name']}' from TradingView.
 
-        Description: {data['description']}
+        Description: {content.description}
 
-        User Comments: {' '.join(data['comments'][:10])}  # Limiting to first 10 comments
+        User Comments:{self._format_comments(content.comments)}
 
         Please provide analysis in the following JSON structure:
-        {{
-            "indicator_functionality": "",
-            "usage_guidelines": "",
-            "user_feedback": {{"positive": [], "negative": []}},
-            "additional_insights": "",
-            "ratings": {{"profitability": 0-10, "reliability": 0-10}}
-        }}
+        {ANALYSIS_SCHEMA}
         """
 
-    def _parse_gpt_response(self, response: str) -> Dict[str, Any]:
-        """Parse the GPT response into a structured format
+    def _format_packed_item(self, index: int, data: Dict[str, Any], record: bool = True) -> str:
+        content = self._budgeted_content(data, record)
+        return (
+            f"### Indicator {index}\n"
+            f"URL: {data['url']}\n"
+            f"Name: {data['name']}\n"
+            f"Description: {content.description}\n"
+            f"User Comments:{self._format_comments(content.comments)}\n"
+        )
+
+    def _create_packed_prompt(self, items: List[Dict[str, Any]]) -> str:
+        """One prompt covering several indicators, sharing the instruction block"""
+        indicators = '\n'.join(self._format_packed_item(i + 1, data) for i, data in enumerate(items))
+        return f"""
+        Please analyze and summarize each of the following {len(items)} indicators from TradingView.
+
+        {indicators}
+        Reply with a JSON array holding one object per indicator, in the same order.
+        Each object must include the indicator's "url" and follow this structure:
+        {ANALYSIS_SCHEMA}
+        """
+
+    def pack_indicators(self, items: List[Dict[str, Any]], token_budget: int = None) -> List[List[Dict[str, Any]]]:
+        """Group indicators into packs whose prompt fits the token budget.
+
+        Long indicators (over ANALYSIS_PACK_MAX_ITEM_TOKENS) get a pack of
+        their own, which is analyzed with the regular single prompt.
+        """
+        token_budget = token_budget or settings.ANALYSIS_PACK_TOKEN_BUDGET
+        overhead = count_tokens(self._create_packed_prompt([]), self.model)
+        packs, current, used = [], [], overhead
+        for data in items:
+            cost = count_tokens(self._format_packed_item(len(current) + 1, data, record=False), self.model)
+            if cost > settings.ANALYSIS_PACK_MAX_ITEM_TOKENS:
+                packs.append([data])
+                continue
+            if current and (used + cost > token_budget or len(current) >= settings.ANALYSIS_PACK_MAX_ITEMS):
+                packs.append(current)
+                current, used = [], overhead
+            current.append(data)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+
+    async def analyze_packed(self, items: List[Dict[str, Any]], token_budget: int = None) -> List[AnalysisOutcome]:
+        """Analyze short indicators several to a request.
+
+        Outcomes come back in input order. Any indicator whose entry is
+        missing or malformed in the packed reply is re-analyzed on its own.
+        """
+        packs = self.pack_indicators(items, token_budget)
+        results = await asyncio.gather(*(self._analyze_pack(pack) for pack in packs))
+        by_id = {id(outcome.data): outcome for pack_outcomes in results for outcome in pack_outcomes}
+        return [by_id[id(data)] for data in items]
+
+    async def _analyze_pack(self, pack: List[Dict[str, Any]]) -> List[AnalysisOutcome]:
+        if len(pack) == 1 or self.uses_mock:
+            return list(await asyncio.gather(*(self.analyze_with_retry(data) for data in pack)))
+
+        def validate(content):
+            # Cache the packed reply only if it answers every indicator in the pack
+            entries = self._match_packed_entries(content, pack)
+            for data in pack:
+                self._validated_analysis(data, self._analysis_from_json(entries[data['url']]))
+
+        start = time.perf_counter()
+        content, error, attempts = await self._with_retry(
+            f"packed analysis of {len(pack)} indicators",
+            lambda: self._complete(self._create_packed_prompt(pack), validate=validate)
+        )
+        latency = time.perf_counter() - start
+        entries = self._match_packed_entries(content, pack) if error is None else {}
+
+        outcomes, fallbacks = [], []
+        for data in pack:
+            try:
+                analysis = self._validated_analysis(data, self._analysis_from_json(entries[data['url']]))
+            except (KeyError, TypeError, ValueError):
+                fallbacks.append(data)
+                continue
+            outcomes.append(AnalysisOutcome(
+                data=data,
+                analysis=analysis,
+                latency=latency, attempts=attempts, packed=True
+            ))
+        if fallbacks:
+            logging.warning(f"Falling back to single analysis for {len(fallbacks)} of {len(pack)} packed indicators")
+            outcomes.extend(await asyncio.gather(*(self.analyze_with_retry(data) for data in fallbacks)))
+        return outcomes
+
+    @staticmethod
+    def _match_packed_entries(content: str, pack: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Map each URL in the pack to its object in a JSON array reply"""
+        try:
+            entries = loads_lenient(content)
+        except ValueError:
+            return {}
+        if not isinstance(entries, list):
+            return {}
+        matched = {e.get('url'): e for e in entries if isinstance(e, dict) and e.get('url')}
+        # Fall back to position when the model dropped the URLs but kept the order
+        if not matched and len(entries) == len(pack):
+            matched = {data['url']: entry for data, entry in zip(pack, entries)}
+        return matched
+
+    @staticmethod
+    def _rating(value) -> int:
+        # Accept 7, 7.5, "7" and "7/10"; out-of-range values are clamped to 0-10
+        match = re.search(r'\d+(?:\.\d+)?', str(value))
+        if match is None:
+            raise ValueError(f"Not a rating: {value!r}")
+        return min(10, int(round(float(match.group(0)))))
+
+    def _analysis_from_json(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Map one analysis object from the model's JSON into our field names"""
+        ratings = obj.get('ratings') or {}
+        feedback = obj.get('user_feedback') or {'positive': [], 'negative': []}
+        if not isinstance(feedback, dict):
+            feedback = {'summary': feedback}
+        return {
+            'functionality': str(obj.get('indicator_functionality') or obj.get('functionality') or ''),
+            'usage_guidelines': str(obj.get('usage_guidelines') or ''),
+            'user_feedback': feedback,
+            'additional_insights': str(obj.get('additional_insights') or ''),
+            'profitability_rating': self._rating(ratings.get('profitability', obj.get('profitability_rating'))),
+            'reliability_rating': self._rating(ratings.get('reliability', obj.get('reliability_rating'))),
+            'analyzed_date': datetime.now()
+        }
+
+    @staticmethod
+    def _validated_analysis(data: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Check an analysis against AnalysisResult; raises ValidationError (a ValueError)"""
+        result = AnalysisResult(url=data['url'], name=data['name'], **analysis)
+        # Keep the URL exactly as scraped; it is the upsert key
+        return {**result.model_dump(), 'url': data['url']}
+
+    def _parse_gpt_response(self, response: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse and validate the model's JSON reply for one indicator.
 
-        In a real implementation, this would parse JSON from the response.
-        For now, we'll return a simple mock structure.
+        Common malformations (fences, trailing commas, truncation, ...) are
+        repaired locally rather than by asking the model again.
         """
-        # This is a simplified implementation
-        # In a real scenario, you would parse the JSON from the response
         try:
-            # Just using the response string to show it's being used
-            logging.info(f"Parsing response of length: {len(response)}")
-
-            # Return a mock structure for now
-            return {
-                'functionality': "Extracted from response...",
-                'usage_guidelines': "Extracted from response...",
-                'user_feedback': "Extracted from response...",
-                'additional_insights': "Extracted from response...",
-                'profitability_rating': 7,
-                'reliability_rating': 8,
-                'analyzed_date': datetime.now()
-            }
+            obj = loads_lenient(response)
+            if isinstance(obj, list) and obj:
+                obj = obj[0]
+            if not isinstance(obj, dict):
+                raise ValueError(f"Expected a JSON object, got {type(obj).__name__}")
+            return self._validated_analysis(data, self._analysis_from_json(obj))
         except Exception as e:
             logging.error(f"Error parsing GPT response: {str(e)}")
-            raise
\ No newline at end of file
+            raise InvalidResponseError(str(e)) from e
@@ -1,14 +1,31 @@
-from pydantic import BaseModel, HttpUrl, validator
-from typing import List, Optional
+from dataclasses import dataclass
+from pydantic import BaseModel, HttpUrl, TypeAdapter, field_validator
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow input and Arrow-backed string checks are optional
+    pa = None
+
+# With pyarrow the regex and strip checks run in Arrow compute kernels
+STRING_DTYPE = 'string[pyarrow]' if pa is not None else 'string'
+
+RATING_COLUMNS = ('profitability_rating', 'reliability_rating')
+TEXT_COLUMNS = ('functionality', 'usage_guidelines', 'additional_insights')
+
+# Same shape HttpUrl accepts for our data: http(s), a dotted host, optional path
+URL_PATTERN = r'^https?://[^\s/?#]+\.[^\s/?#]+(?:[/?#]\S*)?$'
 
 class IndicatorData(BaseModel):
     url: HttpUrl
     name: str
     description: str
     comments: List[str]
-    
-    @validator('description')
+
+    @field_validator('description')
+    @classmethod
     def clean_description(cls, v):
         return ' '.join(v.split())  # Remove extra whitespace
 
@@ -23,8 +40,94 @@ class AnalysisResult(BaseModel):
     reliability_rating: int
     analyzed_date: datetime
 
-    @validator('profitability_rating', 'reliability_rating')
+    @field_validator('profitability_rating', 'reliability_rating')
+    @classmethod
     def validate_rating(cls, v):
         if not 0 <= v <= 10:
             raise ValueError('Rating must be between 0 and 10')
-        return v
\ No newline at end of file
+        return v
+
+# Validate whole lists in one call into pydantic-core instead of a Python loop
+_indicator_list = TypeAdapter(List[IndicatorData])
+_analysis_list = TypeAdapter(List[AnalysisResult])
+
+def validate_indicators(rows: Iterable[Dict[str, Any]]) -> List[IndicatorData]:
+    """Validate a batch of scraped indicators; raises ValidationError listing every bad row"""
+    return _indicator_list.validate_python(list(rows))
+
+def validate_analyses(rows: Iterable[Dict[str, Any]]) -> List[AnalysisResult]:
+    """Validate a batch of analyses; raises ValidationError listing every bad row"""
+    return _analysis_list.validate_python(list(rows))
+
+@dataclass
+class ColumnValidation:
+    """Rows of a frame split into those that passed the column checks and those that did not.
+
+    `invalid` has an extra `errors` column naming the failed checks.
+    """
+    valid: pd.DataFrame
+    invalid: pd.DataFrame
+
+    @property
+    def ok(self) -> bool:
+        return self.invalid.empty
+
+def validate_analysis_columns(frame) -> ColumnValidation:
+    """Check analysis rows column by column in vectorized passes.
+
+    Covers what AnalysisResult checks for bulk data without building a model
+    per row: URL shape, a non-empty name, integral ratings within 0-10 and a
+    parseable analyzed_date. Accepts a pandas DataFrame or a pyarrow Table.
+    Valid rows come back with ratings as ints and analyzed_date as datetimes;
+    missing text fields become empty strings.
+    """
+    if pa is not None and isinstance(frame, pa.Table):
+        frame = frame.to_pandas()
+    missing = [c for c in ('url', 'name', *RATING_COLUMNS, 'analyzed_date') if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    frame = frame.copy()
+    failures = {}
+
+    urls = frame['url'].astype(STRING_DTYPE)
+    failures['url'] = ~urls.str.match(URL_PATTERN).fillna(False).astype(bool)
+
+    names = frame['name'].astype(STRING_DTYPE).str.strip()
+    failures['name'] = names.isna() | (names == '')
+
+    for column in RATING_COLUMNS:
+        ratings = pd.to_numeric(frame[column], errors='coerce')
+        failures[column] = ~(ratings.between(0, 10) & (ratings % 1 == 0))
+        frame[column] = ratings
+
+    dates = pd.to_datetime(frame['analyzed_date'], errors='coerce', format='mixed')
+    failures['analyzed_date'] = dates.isna()
+    frame['analyzed_date'] = dates
+
+    failed = pd.DataFrame(failures, index=frame.index)
+    bad = failed.any(axis=1)
+
+    valid = frame[~bad].copy()
+    for column in RATING_COLUMNS:
+        valid[column] = valid[column].astype(int)
+    for column in TEXT_COLUMNS:
+        if column in valid.columns:
+            valid[column] = valid[column].fillna('').astype(str)
+
+    invalid = frame[bad].copy()
+    checks = list(failed.columns)
+    invalid['errors'] = [
+        ', '.join(check for check, failed_check in zip(checks, row) if failed_check)
+        for row in failed[bad].to_numpy()
+    ]
+    return ColumnValidation(valid=valid, invalid=invalid)
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Optional[Any]]]:
+    """Rows as dicts with missing values as None, ready for a DB write"""
+    frame = frame.copy()
+    for column in frame.select_dtypes(include='datetime').columns:
+        # sqlite3 adapts datetime but not pandas' Timestamp subclass
+        frame[column] = pd.Series(frame[column].dt.to_pydatetime(), index=frame.index, dtype=object)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict('records')
@@ -0,0 +1,113 @@
+import hashlib
+import html
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from config import settings
+from database.frontier import ListingPages
+from scraper.urls import TRADINGVIEW_HOST, is_script_url, normalize_url
+
+logger = logging.getLogger('scraper')
+
+_HREF = re.compile(r'''href\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+# /scripts/, /scripts/page-2/, /scripts/<tag>/ and their pages
+_LISTING_PATH = re.compile(r'^/scripts/(?:(?P<tag>[\w-]+)/)?(?:page-\d+/)?$')
+_AUTHOR_PATH = re.compile(r'^/u/[^/]+/$')
+_PAGE_SEGMENT = re.compile(r'^page-\d+$')
+
+def listing_kind(url: str) -> Optional[str]:
+    """'listing', 'tag' or 'author' for pages discovery should crawl, else None"""
+    parts = urlsplit(url)
+    if parts.netloc.lower() not in ('tradingview.com', TRADINGVIEW_HOST):
+        return None
+    path = parts.path if parts.path.endswith('/') else parts.path + '/'
+    if _AUTHOR_PATH.match(path):
+        return 'author'
+    match = _LISTING_PATH.match(path)
+    if match is None:
+        return None
+    tag = match.group('tag')
+    return 'tag' if tag and not _PAGE_SEGMENT.match(tag) else 'listing'
+
+def normalize_listing_url(url: str) -> str:
+    url = normalize_url(url)
+    return url if url.endswith('/') else url + '/'
+
+def extract_links(page_html: str, base_url: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Script URLs and (url, kind) listing pages linked from a page, normalized and deduplicated.
+
+    Scans href attributes directly rather than building a DOM; listing pages
+    are large and only their links matter here.
+    """
+    scripts, listings = {}, {}
+    for match in _HREF.finditer(page_html):
+        url = urljoin(base_url, html.unescape(match.group(1)).strip())
+        if is_script_url(url):
+            scripts.setdefault(normalize_url(url), None)
+            continue
+        kind = listing_kind(url)
+        if kind:
+            listings.setdefault(normalize_listing_url(url), kind)
+    return list(scripts), list(listings.items())
+
+def links_hash(script_urls: List[str]) -> str:
+    """Fingerprint of a page's script links, ignoring order and page chrome"""
+    return hashlib.sha256('\n'.join(sorted(script_urls)).encode('utf-8')).hexdigest()
+
+class DiscoveryCrawler:
+    """Grow the URL frontier by crawling listing, tag and author pages.
+
+    Pages are fetched through the scraper's fetch_page, so they share its
+    rate limiter, HTML cache, conditional GETs and offline replay. Script
+    links go into the frontier (deduplicated by its unique index); listing
+    links found up to DISCOVERY_MAX_DEPTH hops from the seeds are queued for
+    later visits, and ListingPages decides which are due.
+    """
+
+    def __init__(self, scraper, pages: ListingPages = None, seeds: List[str] = None,
+                 max_depth: int = None):
+        self.scraper = scraper
+        self.pages = pages or ListingPages(scraper.db_path)
+        self.seeds = settings.DISCOVERY_SEEDS if seeds is None else seeds
+        self.max_depth = settings.DISCOVERY_MAX_DEPTH if max_depth is None else max_depth
+
+    def run(self, max_pages: int = None) -> Dict[str, int]:
+        """Visit up to max_pages due pages; returns discovery statistics"""
+        max_pages = max_pages or settings.DISCOVERY_MAX_PAGES
+        self.pages.add_many(
+            (normalize_listing_url(url), listing_kind(url) or 'listing', 0) for url in self.seeds
+        )
+        stats = {'pages_visited': 0, 'pages_changed': 0, 'pages_failed': 0,
+                 'scripts_found': 0, 'scripts_new': 0, 'pages_new': 0}
+
+        while stats['pages_visited'] + stats['pages_failed'] < max_pages:
+            due = self.pages.due(max_pages - stats['pages_visited'] - stats['pages_failed'])
+            if not due:
+                break
+            for url, depth in due:
+                self._visit(url, depth, stats)
+        logger.info(f"Discovery finished: {stats}")
+        return stats
+
+    def _visit(self, url: str, depth: int, stats: Dict[str, int]):
+        result = self.scraper.fetch_page(url)
+        if result is None:
+            self.pages.record_failure(url)
+            stats['pages_failed'] += 1
+            return
+        stats['pages_visited'] += 1
+        if result.not_modified:
+            self.pages.record_visit(url, None)
+            return
+
+        scripts, listings = extract_links(result.html, url)
+        if self.pages.record_visit(url, links_hash(scripts)):
+            stats['pages_changed'] += 1
+        stats['scripts_found'] += len(scripts)
+        stats['scripts_new'] += self.scraper.frontier.add_many(scripts)
+        if depth < self.max_depth:
+            stats['pages_new'] += self.pages.add_many(
+                (listing_url, kind, depth + 1) for listing_url, kind in listings
+            )
@@ -0,0 +1,195 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    import lxml.html
+except ImportError:  # lxml is optional, BeautifulSoup is the fallback
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+logger = logging.getLogger('scraper')
+
+UNKNOWN_NAME = "Unknown Indicator"
+NO_DESCRIPTION = "No description available"
+
+def _indicator(url: str, name: Optional[str], description: Optional[str], comments: List[str]) -> Dict[str, Any]:
+    """Assemble the dict handed to analysis, filling the usual defaults"""
+    return {
+        'name': name or UNKNOWN_NAME,
+        'description': description or NO_DESCRIPTION,
+        'comments': comments,
+        'url': url
+    }
+
+# Matches a class attribute containing any of the classes we extract
+_WANTED_CLASSES = re.compile(r'(^|\s)(title|description|comment)(\s|$)')
+
+class BeautifulSoupExtractor:
+    """Reference extractor: full html.parser tree, optionally cut down by a SoupStrainer"""
+
+    def __init__(self, strainer: bool = False):
+        self.name = 'bs4-strainer' if strainer else 'bs4'
+        # Only build the h1/div subtrees carrying the classes we read
+        self.parse_only = SoupStrainer(['h1', 'div'], class_=_WANTED_CLASSES) if strainer else None
+
+    def extract(self, html, url: str) -> Dict[str, Any]:
+        soup = BeautifulSoup(html, 'html.parser', parse_only=self.parse_only)
+
+        # Extract relevant data with better error handling
+        try:
+            name_element = soup.find('h1', {'class': 'title'})
+            name = name_element.text.strip() if name_element else None
+        except Exception as e:
+            logger.warning(f"Error extracting name from {url}: {str(e)}")
+            name = None
+
+        try:
+            description_element = soup.find('div', {'class': 'description'})
+            description = description_element.text.strip() if description_element else None
+        except Exception as e:
+            logger.warning(f"Error extracting description from {url}: {str(e)}")
+            description = None
+
+        try:
+            comments = soup.find_all('div', {'class': 'comment'})
+            comment_texts = [c.text.strip() for c in comments]
+        except Exception as e:
+            logger.warning(f"Error extracting comments from {url}: {str(e)}")
+            comment_texts = []
+
+        return _indicator(url, name, description, comment_texts)
+
+def _class_xpath(tag: str, css_class: str) -> str:
+    # Same matching rule as BeautifulSoup's class filter: one of the element's classes
+    return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+
+class LxmlExtractor:
+    """libxml2 parser with pre-compiled XPath selectors.
+
+    lxml parsers and XPath objects must not be used by two threads at once,
+    so each thread builds its own on first use.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _tools(self):
+        tools = getattr(self._local, 'tools', None)
+        if tools is None:
+            tools = self._local.tools = (
+                lxml.html.HTMLParser(encoding='utf-8'),
+                etree.XPath(_class_xpath('h1', 'title')),
+                etree.XPath(_class_xpath('div', 'description')),
+                etree.XPath(_class_xpath('div', 'comment')),
+            )
+        return tools
+
+    def extract(self, html, url: str) -> Dict[str, Any]:
+        parser, title, description, comments = self._tools()
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        root = lxml.html.fromstring(html, parser=parser)
+
+        titles = title(root)
+        descriptions = description(root)
+        return _indicator(
+            url,
+            titles[0].text_content().strip() if titles else None,
+            descriptions[0].text_content().strip() if descriptions else None,
+            [c.text_content().strip() for c in comments(root)]
+        )
+
+class SelectolaxExtractor:
+    """Lexbor-backed CSS selectors, the fastest option when selectolax is installed"""
+
+    name = 'selectolax'
+
+    def extract(self, html, url: str) -> Dict[str, Any]:
+        tree = SelectolaxParser(html)
+        title = tree.css_first('h1.title')
+        description = tree.css_first('div.description')
+        return _indicator(
+            url,
+            title.text(deep=True).strip() if title else None,
+            description.text(deep=True).strip() if description else None,
+            [c.text(deep=True).strip() for c in tree.css('div.comment')]
+        )
+
+class FallbackExtractor:
+    """Run a fast backend and fall back to BeautifulSoup if it raises"""
+
+    def __init__(self, primary, fallback=None):
+        self.primary = primary
+        self.fallback = fallback or BeautifulSoupExtractor()
+        self.name = primary.name
+
+    def extract(self, html, url: str) -> Dict[str, Any]:
+        try:
+            return self.primary.extract(html, url)
+        except Exception as e:
+            logger.warning(f"{self.name} extraction failed for {url}, using BeautifulSoup: {str(e)}")
+            return self.fallback.extract(html, url)
+
+def available_backends() -> List[str]:
+    backends = ['bs4', 'bs4-strainer']
+    if lxml is not None:
+        backends.append('lxml')
+    if SelectolaxParser is not None:
+        backends.append('selectolax')
+    return backends
+
+def get_extractor(backend: str = 'auto'):
+    """Return an extractor for the named backend.
+
+    'auto' picks selectolax, then lxml, then BeautifulSoup depending on
+    what is installed. Fast backends fall back to BeautifulSoup per page.
+    """
+    if backend == 'auto':
+        backend = 'selectolax' if SelectolaxParser is not None else 'lxml' if lxml is not None else 'bs4'
+
+    if backend == 'bs4':
+        return BeautifulSoupExtractor()
+    if backend == 'bs4-strainer':
+        return BeautifulSoupExtractor(strainer=True)
+    if backend == 'lxml':
+        if lxml is None:
+            raise ValueError("The lxml extractor requires the lxml package")
+        return FallbackExtractor(LxmlExtractor())
+    if backend == 'selectolax':
+        if SelectolaxParser is None:
+            raise ValueError("The selectolax extractor requires the selectolax package")
+        return FallbackExtractor(SelectolaxExtractor())
+    raise ValueError(f"Unknown extractor backend: {backend}")
+
+# Extractors built inside each worker process, keyed by backend name
+_process_extractors = {}
+
+def parse_indicator(html, url: str, backend: str = 'auto') -> Optional[Dict[str, Any]]:
+    """Pure HTML (str or bytes) -> indicator dict, safe to run in a worker process.
+
+    The dict has the IndicatorData fields (url, name, description, comments).
+    Returns None if the page cannot be parsed at all.
+    """
+    extractor = _process_extractors.get(backend)
+    if extractor is None:
+        extractor = _process_extractors[backend] = get_extractor(backend)
+    try:
+        return extractor.extract(html, url)
+    except Exception as e:
+        logger.error(f"Error parsing {url}: {str(e)}")
+        return None
+
+def parse_batch(pages: List[tuple], backend: str = 'auto') -> List[Optional[Dict[str, Any]]]:
+    """Parse a chunk of (html, url) pairs in one worker call"""
+    return [parse_indicator(html, url, backend) for html, url in pages]
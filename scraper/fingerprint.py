@@ -0,0 +1,41 @@
+import hashlib
+import json
+from typing import Any, Dict, List
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only changes don't count as edits"""
+    return ' '.join((text or '').split())
+
+def _digest(payload: Dict[str, Any]) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def normalized_comments(comments: List[str]) -> List[str]:
+    return [normalize_text(c) for c in comments or [] if normalize_text(c)]
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """Hash of the scraped content (name, description, comments) of an indicator"""
+    return _digest({
+        'name': normalize_text(data.get('name')),
+        'description': normalize_text(data.get('description')),
+        'comments': normalized_comments(data.get('comments')),
+    })
+
+# Model recorded for placeholder and mock analyses, so a real model never takes them as current
+PLACEHOLDER_MODEL = 'placeholder'
+
+def analysis_fingerprint(data: Dict[str, Any], prompt_version: str, model: str) -> str:
+    """Hash of everything that shapes an LLM analysis.
+
+    If this matches the stored fingerprint the analysis would come out the
+    same, so the paid API call can be skipped.
+    """
+    return fingerprint_for_content(content_hash(data), prompt_version, model)
+
+def fingerprint_for_content(content_digest: str, prompt_version: str, model: str) -> str:
+    """analysis_fingerprint from an already computed content_hash"""
+    return _digest({
+        'content': content_digest,
+        'prompt_version': prompt_version,
+        'model': model,
+    })
@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from config import settings
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+logger = logging.getLogger('scraper')
+
+@dataclass
+class CachedPage:
+    url: str
+    html: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+class HtmlCache:
+    """Compressed on-disk cache of raw script pages.
+
+    Pages are stored under DATA_DIR/html_cache as <sha256(url)>.html.zst (or
+    .gz without zstandard) with a small SQLite index holding fetch and access
+    times. Entries older than the TTL are treated as misses, and the least
+    recently used pages are evicted once the total size passes the cap.
+    """
+
+    def __init__(self, cache_dir: str = None, ttl: float = None, max_bytes: int = None, compression: str = None):
+        self.cache_dir = cache_dir or os.path.join(settings.DATA_DIR, 'html_cache')
+        self.ttl = settings.HTML_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_bytes = max_bytes or settings.HTML_CACHE_MAX_MB * 1024 * 1024
+        self.compression = compression or ('zstd' if zstandard else 'gzip')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, 'index.db')
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    compression TEXT,
+                    size INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    accessed_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed_at ON pages (accessed_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, compression: str) -> str:
+        suffix = 'zst' if compression == 'zstd' else 'gz'
+        return os.path.join(self.cache_dir, f"{key}.html.{suffix}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data: bytes, compression: str) -> bytes:
+        if compression == 'zstd':
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def get(self, url: str, allow_stale: bool = False) -> Optional[CachedPage]:
+        """Return the cached page, or None if missing or older than the TTL"""
+        key = self.key_for(url)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT compression, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            compression, etag, last_modified, fetched_at = row
+            if not allow_stale and self.ttl and time.time() - fetched_at > self.ttl:
+                return None
+            conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+        try:
+            with open(self._path(key, compression), 'rb') as f:
+                html = self._decompress(f.read(), compression).decode('utf-8')
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry for {url}: {str(e)}")
+            self.delete(url)
+            return None
+        return CachedPage(url=url, html=html, fetched_at=fetched_at, etag=etag, last_modified=last_modified)
+
+    def put(self, url: str, html: str, etag: str = None, last_modified: str = None):
+        key = self.key_for(url)
+        payload = self._compress(html.encode('utf-8'))
+        path = self._path(key, self.compression)
+
+        # Write to a temp file first so readers never see a partial page
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO pages
+                (key, url, compression, size, etag, last_modified, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, url, self.compression, len(payload), etag, last_modified, now, now))
+        self._evict()
+
+    def touch(self, url: str):
+        """Mark a cached page as fresh again, e.g. after a 304 revalidation"""
+        with self._connect() as conn:
+            now = time.time()
+            conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, self.key_for(url))
+            )
+
+    def delete(self, url: str):
+        key = self.key_for(url)
+        with self._connect() as conn:
+            row = conn.execute("SELECT compression FROM pages WHERE key = ?", (key,)).fetchone()
+            conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+        if row:
+            self._remove_file(key, row[0])
+
+    def _remove_file(self, key: str, compression: str):
+        try:
+            os.remove(self._path(key, compression))
+        except FileNotFoundError:
+            pass
+
+    def total_size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used pages until the cache fits under max_bytes"""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = []
+            for key, compression, size in conn.execute(
+                "SELECT key, compression, size FROM pages ORDER BY accessed_at"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key, compression))
+                total -= size
+            conn.executemany("DELETE FROM pages WHERE key = ?", [(key,) for key, _ in evicted])
+        for key, compression in evicted:
+            self._remove_file(key, compression)
+        logger.info(f"Evicted {len(evicted)} pages from the HTML cache")
@@ -0,0 +1,99 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+from scraper.rate_limiter import HostRateLimiter, get_host_limiter
+
+logger = logging.getLogger('scraper')
+
+# More realistic headers to avoid being blocked
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Referer': 'https://www.tradingview.com/',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'same-origin',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0'
+}
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    html: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+    @property
+    def validators(self) -> Dict[str, Optional[str]]:
+        """Cache validators to store with the indicator row"""
+        return {'etag': self.etag, 'last_modified': self.last_modified}
+
+class HttpClient:
+    """Pooled keep-alive HTTP session that revalidates pages with conditional GETs"""
+
+    def __init__(self, pool_size: int = None, timeout: float = None, limiter: Optional[HostRateLimiter] = None):
+        self.pool_size = pool_size or settings.HTTP_POOL_SIZE
+        self.timeout = timeout or settings.HTTP_TIMEOUT
+        self.limiter = limiter or get_host_limiter()
+
+        self.session = requests.Session()
+        self.session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def get(self, url: str, etag: str = None, last_modified: str = None) -> FetchResult:
+        """GET a page, sending If-None-Match/If-Modified-Since when validators are known.
+
+        A 304 comes back as a FetchResult without HTML. Network errors are
+        raised as the usual requests exceptions.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.limiter.record_response(url, response.status_code, response.headers.get('Retry-After'))
+
+        if response.status_code == 304:
+            # Keep the validators we sent unless the server issued new ones
+            return FetchResult(
+                url=url,
+                status_code=304,
+                etag=response.headers.get('ETag', etag),
+                last_modified=response.headers.get('Last-Modified', last_modified)
+            )
+
+        return FetchResult(
+            url=url,
+            status_code=response.status_code,
+            html=response.text,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
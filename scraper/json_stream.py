@@ -0,0 +1,162 @@
+import json
+import re
+from typing import Any, List
+
+_FENCE = re.compile(r'```(?:json)?', re.IGNORECASE)
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+_PYTHON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+class JsonObjectStream:
+    """Incrementally find complete JSON objects in streamed LLM output.
+
+    Feed text as it arrives; feed() returns the raw text of every object
+    that closed in that chunk. Prose or code fences before the JSON are
+    skipped. A top-level object is returned whole; inside a top-level array
+    each element object is returned as soon as it closes, so a packed reply
+    can be consumed item by item.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._start = None  # Offset in the current object's text where it began
+        self._object_depth = None
+        self._text = ''
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[str]:
+        completed = []
+        offset = len(self._text)
+        self._text += chunk
+        for i, char in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 0 and char not in '{[':
+                continue  # Prose or fences around the JSON
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+                if char == '{' and self._start is None:
+                    self._start = i
+                    self._object_depth = self._depth
+            elif char in '}]':
+                if char == '}' and self._depth == self._object_depth:
+                    completed.append(self._text[self._start:i + 1])
+                    self._start = self._object_depth = None
+                self._depth -= 1
+        return completed
+
+    def pending(self) -> str:
+        """Text of an object that started but has not closed yet"""
+        return self._text[self._start:] if self._start is not None else ''
+
+def repair_json(text: str) -> str:
+    """Fix the malformations LLMs commonly produce so json.loads accepts them.
+
+    Handles code fences and surrounding prose, smart quotes, Python literals
+    (True/False/None), trailing commas, and output cut off mid-way (an open
+    string, dangling key or unclosed brackets).
+    """
+    text = _FENCE.sub('', text)
+    if '"' not in text:
+        # Quoted throughout with curly quotes; otherwise they are content
+        text = text.translate(_SMART_QUOTES)
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        raise ValueError("No JSON found in response")
+    text = text[min(starts):]
+
+    out, stack = [], []
+    in_string = escaped = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == '\n':
+                out[-1] = '\\n'  # Raw newlines are not allowed inside JSON strings
+            i += 1
+            continue
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]':
+            _strip_trailing_comma(out)
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break  # Ignore anything after the top-level value
+            i += 1
+            continue
+        elif char.isalpha():
+            word = re.match(r'[A-Za-z]+', text[i:]).group(0)
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        out.append(char)
+        i += 1
+
+    # Truncated output: close the open string and containers
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    _drop_dangling_member(out)
+    while stack:
+        _strip_trailing_comma(out)
+        out.append(stack.pop())
+    return ''.join(out)
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+def _drop_dangling_member(out: List[str]):
+    """Remove a trailing `"key"` or `"key":` whose value never arrived"""
+    text = ''.join(out).rstrip()
+    match = re.search(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', text)
+    if match and (text[match.start()] == '{' or text.endswith(':') or _is_object_key(text, match.start())):
+        text = text[:match.start() + 1] if text[match.start()] == '{' else text[:match.start()]
+        out[:] = [text]
+
+def _is_object_key(text: str, comma: int) -> bool:
+    """Whether the comma at `comma` separates object members rather than array items"""
+    depth = 0
+    for char in reversed(text[:comma]):
+        if char in '}]':
+            depth += 1
+        elif char in '{[':
+            if depth == 0:
+                return char == '{'
+            depth -= 1
+    return False
+
+def loads_lenient(text: str) -> Any:
+    """json.loads, retried once on the repaired text"""
+    try:
+        return json.loads(_FENCE.sub('', text).strip())
+    except ValueError:
+        return json.loads(repair_json(text))
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger('analyzer')
+
+def cache_key(model: str, system_message: str, prompt: str) -> str:
+    payload = json.dumps([model, system_message, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResponseCache(ABC):
+    """Base for LLM response caches with a TTL, an entry cap and hit/miss counters"""
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = settings.LLM_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._load(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        self._store(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def close(self):
+        """Release any resources held; the cache stays usable"""
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[str]:
+        """Stored value for key, or None if missing or expired"""
+
+    @abstractmethod
+    def _store(self, key: str, value: str):
+        """Store value under key, evicting entries beyond max_entries"""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of stored entries"""
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache"""
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        super().__init__(ttl, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self._expired(created_at):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteResponseCache(ResponseCache):
+    """Persistent cache shared by runs, tests and reprocessing jobs.
+
+    Each thread reuses one connection, as database/connection.py does;
+    close() closes them all.
+    """
+
+    def __init__(self, db_path: str = None, ttl: float = None, max_entries: int = None):
+        super().__init__(ttl, max_entries)
+        self.db_path = db_path or os.path.join(settings.DATA_DIR, 'llm_cache.db')
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT,
+                    created_at REAL,
+                    accessed_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only its own thread uses it; close() may run on another one
+            conn = self._local.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads notice their closed connection and open a new one next time
+        self._local = threading.local()
+
+    def _load(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def _store(self, key, value):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            # Drop least recently used responses beyond the cap
+            conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+def get_response_cache(backend: str = None) -> Optional[ResponseCache]:
+    """Build the cache named by LLM_CACHE_BACKEND: sqlite, memory or none"""
+    backend = backend or settings.LLM_CACHE_BACKEND
+    if backend == 'sqlite':
+        return SQLiteResponseCache()
+    if backend == 'memory':
+        return MemoryResponseCache()
+    if backend == 'none':
+        return None
+    raise ValueError(f"Unknown LLM cache backend: {backend}")
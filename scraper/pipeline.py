@@ -0,0 +1,225 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from scraper.extractors import parse_batch
+
+logger = logging.getLogger('scraper')
+
+# Marker pushed through a queue to tell one worker to stop
+_DONE = object()
+# Returned by a stage handler to drop an item on purpose (not a failure)
+_SKIP = object()
+
+STAGES = ('fetch', 'parse', 'analyze', 'save')
+
+
+class ScrapePipeline:
+    """Concurrent scrape pipeline.
+
+    Fetching, parsing, analysis and DB writes run as separate stages joined
+    by bounded queues, each with its own number of workers. Politeness comes
+    from the scraper's shared per-host limiter, which fetch_page only waits
+    on when a page actually goes to the network.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        fetch_workers: int = None,
+        parse_workers: int = None,
+        analyze_workers: int = None,
+        save_workers: int = None,
+        queue_size: int = None,
+        parse_processes: int = None,
+        parse_chunk_size: int = None,
+        pack_analyses: bool = None
+    ):
+        self.scraper = scraper
+        self.workers = {
+            'fetch': fetch_workers or settings.PIPELINE_FETCH_WORKERS,
+            'parse': parse_workers or settings.PIPELINE_PARSE_WORKERS,
+            'analyze': analyze_workers or settings.PIPELINE_ANALYZE_WORKERS,
+            'save': save_workers or settings.PIPELINE_SAVE_WORKERS,
+        }
+        self.queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+        # Parsing is CPU-bound, so with a process pool it runs on every core.
+        # Each parse worker keeps one chunk in flight, so have at least one per process.
+        self.parse_processes = settings.PIPELINE_PARSE_PROCESSES if parse_processes is None else parse_processes
+        self.parse_chunk_size = parse_chunk_size or settings.PIPELINE_PARSE_CHUNK_SIZE
+        if self.parse_processes:
+            self.workers['parse'] = max(self.workers['parse'], self.parse_processes)
+        # Packing only pays off with a real LLM analyzer behind the scraper
+        if pack_analyses is None:
+            pack_analyses = settings.ANALYSIS_PACKING and getattr(scraper, 'analyzer', None) is not None
+        self.pack_analyses = pack_analyses
+        self._process_pool = None
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'fetched': 0, 'not_modified': 0, 'parsed': 0, 'analysis_skipped': 0,
+            'analyzed': 0, 'saved': 0, 'failed': 0
+        }
+
+    def run_sync(self, urls: Iterable[str]) -> Dict[str, int]:
+        """Run the pipeline from synchronous code"""
+        return asyncio.run(self.run(urls))
+
+    async def run(self, urls: Iterable[str]) -> Dict[str, int]:
+        """Push every URL through all stages and return per-stage counts"""
+        self.stats = self._empty_stats()
+
+        queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        handlers = {
+            'fetch': self._fetch,
+            'parse': self._parse_chunk if self.parse_processes else self._parse,
+            'analyze': self._analyze_chunk if self.pack_analyses else self._analyze,
+            'save': self._save,
+        }
+        chunk_sizes = {
+            'parse': self.parse_chunk_size if self.parse_processes else 1,
+            'analyze': settings.ANALYSIS_PACK_MAX_ITEMS if self.pack_analyses else 1,
+        }
+
+        tasks = [self._feed(urls, queues['fetch'])]
+        for i, stage in enumerate(STAGES):
+            downstream = STAGES[i + 1] if i + 1 < len(STAGES) else None
+            tasks.append(self._run_stage(
+                stage,
+                handlers[stage],
+                queues[stage],
+                queues[downstream] if downstream else None,
+                self.workers[downstream] if downstream else 0,
+                chunk_sizes.get(stage, 1)
+            ))
+
+        if self.parse_processes:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if self._process_pool:
+                self._process_pool.shutdown()
+                self._process_pool = None
+        return self.stats
+
+    async def _feed(self, urls: Iterable[str], queue: asyncio.Queue):
+        for url in urls:
+            await queue.put(url)
+        for _ in range(self.workers['fetch']):
+            await queue.put(_DONE)
+
+    @staticmethod
+    async def _next_chunk(inbox: asyncio.Queue, size: int):
+        """Wait for one item, then take up to size-1 more that are already queued.
+
+        Returns (items, done) where done means a stop marker was consumed.
+        """
+        item = await inbox.get()
+        if item is _DONE:
+            return [], True
+        items = [item]
+        while len(items) < size:
+            try:
+                item = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is _DONE:
+                return items, True
+            items.append(item)
+        return items, False
+
+    async def _run_stage(self, stage, handler, inbox, outbox, downstream_workers, chunk_size=1):
+        async def worker():
+            done = False
+            while not done:
+                items, done = await self._next_chunk(inbox, chunk_size)
+                if not items:
+                    continue
+                try:
+                    # Chunked handlers take and return lists
+                    results = await handler(items) if chunk_size > 1 else [await handler(items[0])]
+                except Exception as e:
+                    logger.error(f"Pipeline {stage} stage failed: {str(e)}")
+                    results = [None] * len(items)
+                for result in results:
+                    if result is None:
+                        self.stats['failed'] += 1
+                        continue
+                    if result is _SKIP:
+                        continue
+                    if outbox is not None:
+                        await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(self.workers[stage])))
+
+        # Every worker of this stage has stopped, so nothing more can reach
+        # the next stage; release its workers in turn
+        if outbox is not None:
+            for _ in range(downstream_workers):
+                await outbox.put(_DONE)
+
+    async def _fetch(self, url: str):
+        result = await asyncio.to_thread(self.scraper.fetch_page, url)
+        if result is None:
+            return None
+        if result.not_modified:
+            # Page unchanged since the stored ETag/Last-Modified
+            self.stats['not_modified'] += 1
+            return _SKIP
+        self.stats['fetched'] += 1
+        return result
+
+    async def _parse(self, result) -> Optional[Dict[str, Any]]:
+        data = await asyncio.to_thread(self.scraper.parse_page, result.html, result.url)
+        if data is not None:
+            data.update(result.validators)
+            self.stats['parsed'] += 1
+        return data
+
+    async def _parse_chunk(self, results) -> List[Optional[Dict[str, Any]]]:
+        pages = [(result.html, result.url) for result in results]
+        loop = asyncio.get_running_loop()
+        parsed = await loop.run_in_executor(
+            self._process_pool, parse_batch, pages, settings.EXTRACTOR_BACKEND
+        )
+        observed, failed = [], []
+        for result, data in zip(results, parsed):
+            if data is not None:
+                data.update(result.validators)
+                self.stats['parsed'] += 1
+                observed.append(data)
+            else:
+                failed.append(result.url)
+        # parse_batch runs in another process, so record the chunk's outcome
+        # here, in one trip off the event loop
+        await asyncio.to_thread(self.scraper.observe_many, observed, failed)
+        return parsed
+
+    async def _analyze(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not await asyncio.to_thread(self.scraper.needs_analysis, data):
+            # Stored analysis already covers this content, prompt and model
+            self.stats['analysis_skipped'] += 1
+            return _SKIP
+        analysis = await self.scraper.analyze_indicator_async(data)
+        if analysis is not None:
+            self.stats['analyzed'] += 1
+        return analysis
+
+    async def _analyze_chunk(self, items: List[Dict[str, Any]]) -> List[Any]:
+        needed = await asyncio.gather(*(asyncio.to_thread(self.scraper.needs_analysis, data) for data in items))
+        pending = [data for data, need in zip(items, needed) if need]
+        self.stats['analysis_skipped'] += len(items) - len(pending)
+        analyses = iter(await self.scraper.analyze_batch_async(pending) if pending else [])
+        results = [next(analyses) if need else _SKIP for need in needed]
+        self.stats['analyzed'] += sum(1 for r in results if r is not None and r is not _SKIP)
+        return results
+
+    async def _save(self, analysis: Dict[str, Any]):
+        await asyncio.to_thread(self.scraper.save_to_db, analysis)
+        self.stats['saved'] += 1
+        return analysis
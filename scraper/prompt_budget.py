@@ -0,0 +1,137 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from config import settings
+from scraper.fingerprint import normalize_text
+from scraper.tokens import count_tokens
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_WORD = re.compile(r'\w+')
+
+# Comments at least this similar (word-set Jaccard) count as duplicates
+DUPLICATE_SIMILARITY = 0.8
+
+ELLIPSIS = ' …'
+
+@dataclass
+class BudgetedContent:
+    """Description and comments trimmed to fit a prompt token budget"""
+    description: str
+    comments: List[str] = field(default_factory=list)
+    original_tokens: int = 0
+    used_tokens: int = 0
+    comments_dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.used_tokens)
+
+def budget_for_model(model: str) -> int:
+    """Content token budget for `model`, falling back to PROMPT_TOKEN_BUDGET"""
+    return settings.PROMPT_TOKEN_BUDGETS.get(model, settings.PROMPT_TOKEN_BUDGET)
+
+def truncate_text(text: str, max_tokens: int, model: str) -> str:
+    """Shorten text to max_tokens, keeping whole leading sentences where possible.
+
+    This is an extractive summary: descriptions usually open with what the
+    indicator does, so the head carries most of the signal.
+    """
+    text = normalize_text(text)
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ''
+
+    budget = max_tokens - count_tokens(ELLIPSIS, model)
+    kept, used = [], 0
+    for sentence in _SENTENCE_END.split(text):
+        cost = count_tokens(sentence + ' ', model)
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return ' '.join(kept) + ELLIPSIS
+
+    # The first sentence alone is too long: cut it down on word boundaries
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(' '.join(words[:middle]), model) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return ' '.join(words[:low]) + ELLIPSIS
+
+def _words(text: str) -> frozenset:
+    return frozenset(word.lower() for word in _WORD.findall(text))
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def select_comments(comments: List[str], max_tokens: int, model: str) -> List[str]:
+    """Pick a deduplicated, diverse subset of comments that fits max_tokens.
+
+    Near-duplicates ("great indicator!", "Great indicator") are dropped, then
+    comments are chosen greedily by how little they overlap with those
+    already picked, so later dissenting comments get in ahead of the tenth
+    variation of the same praise. The picks keep their original order.
+
+    Only the first PROMPT_MAX_COMMENT_CANDIDATES comments are considered, so
+    the cost stays bounded on scripts with thousands of comments.
+    """
+    candidates = []
+    for index, comment in enumerate((comments or [])[:settings.PROMPT_MAX_COMMENT_CANDIDATES]):
+        text = truncate_text(comment, settings.PROMPT_MAX_COMMENT_TOKENS, model)
+        if not text:
+            continue
+        words = _words(text)
+        if any(_similarity(words, other) >= DUPLICATE_SIMILARITY for _, _, other, _ in candidates):
+            continue
+        candidates.append((index, text, words, count_tokens(text + ' ', model)))
+
+    # Highest overlap of each remaining candidate with any pick so far
+    overlap = {position: 0.0 for position in range(len(candidates))}
+    selected, used = [], 0
+    while used < max_tokens:
+        # Picks only add tokens, so a candidate that does not fit now never will
+        remaining = [position for position in overlap if candidates[position][3] <= max_tokens - used]
+        if not remaining:
+            break
+        # Prefer novel comments, then earlier ones
+        best = max(remaining, key=lambda position: (-overlap[position], -position))
+        chosen = candidates[best]
+        selected.append(chosen)
+        used += chosen[3]
+        overlap = {position: max(overlap[position], _similarity(candidates[position][2], chosen[2]))
+                   for position in remaining if position != best}
+
+    return [text for _, text, _, _ in sorted(selected)]
+
+def fit_to_budget(data: Dict[str, Any], model: str, token_budget: int = None) -> BudgetedContent:
+    """Trim an indicator's description and comments to token_budget tokens.
+
+    The description gets up to PROMPT_DESCRIPTION_SHARE of the budget; the
+    comments get whatever the description leaves.
+    """
+    token_budget = token_budget or budget_for_model(model)
+    description = data.get('description') or ''
+    comments = data.get('comments') or []
+    original = count_tokens(description, model) + sum(count_tokens(c + ' ', model) for c in comments)
+
+    description = truncate_text(description, int(token_budget * settings.PROMPT_DESCRIPTION_SHARE), model)
+    description_tokens = count_tokens(description, model)
+    selected = select_comments(comments, token_budget - description_tokens, model)
+    used = description_tokens + sum(count_tokens(c + ' ', model) for c in selected)
+
+    return BudgetedContent(
+        description=description,
+        comments=selected,
+        original_tokens=original,
+        used_tokens=used,
+        comments_dropped=len(comments) - len(selected),
+    )
@@ -1,17 +1,154 @@
+import asyncio
+import threading
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from config import settings
+
+OPENAI_HOST = 'api.openai.com'
+TRADINGVIEW_HOST = 'tradingview.com'
+
+class TokenBucket:
+    """Thread- and async-safe token bucket.
+
+    Up to `burst` calls may go through back to back, after which calls are
+    spaced to `calls_per_minute`. Callers reserve a token under a lock and
+    then sleep outside it, so waiting never blocks other callers.
+    """
+
+    def __init__(self, calls_per_minute=20, burst=1, min_calls_per_minute=None):
+        self.base_rate = calls_per_minute / 60.0
+        self.rate = self.base_rate
+        self.min_rate = (min_calls_per_minute or calls_per_minute / 10.0) / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def calls_per_minute(self):
+        return self.rate * 60.0
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            # `updated` lies in the future while a Retry-After pause is active
+            wait = self.updated - now
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return max(0.0, wait)
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after: Optional[float] = None, factor=0.5):
+        """Shrink the rate after a throttling response and honour Retry-After"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * factor)
+            if retry_after:
+                now = time.monotonic()
+                self.updated = max(self.updated, now) + retry_after
+                self.tokens = min(self.tokens, 0.0)
+
+    def reward(self, factor=1.1):
+        """Grow the rate back towards its configured value after a success"""
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate * factor)
+
+class RateLimiter(TokenBucket):
+    """Evenly spaced limiter without bursts, kept for existing callers"""
 
-class RateLimiter:
     def __init__(self, calls_per_minute=20):
-        self.calls_per_minute = calls_per_minute
+        super().__init__(calls_per_minute, burst=1)
         self.interval = 60.0 / calls_per_minute
-        self.last_call = 0
 
     def wait(self):
-        elapsed = time.time() - self.last_call
-        if elapsed < self.interval:
-            time.sleep(self.interval - elapsed)
-        self.last_call = time.time()
+        self.acquire()
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def host_key(url_or_host: str) -> str:
+    """Bucket key for a URL or host name; www. shares the bare domain's budget"""
+    host = urlparse(url_or_host).hostname if '//' in url_or_host else url_or_host
+    host = (host or url_or_host).lower()
+    return host[4:] if host.startswith('www.') else host
+
+class HostRateLimiter:
+    """One token bucket per host, e.g. tradingview.com pages vs the OpenAI API"""
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, limits: Dict[str, Tuple[int, int]] = None, default_calls_per_minute=20, default_burst=1):
+        self.limits = {host_key(h): v for h, v in (limits or {}).items()}
+        self.default = (default_calls_per_minute, default_burst)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        key = host_key(url_or_host)
+        with self._lock:
+            if key not in self._buckets:
+                calls_per_minute, burst = self.limits.get(key, self.default)
+                self._buckets[key] = TokenBucket(calls_per_minute, burst)
+            return self._buckets[key]
+
+    def acquire(self, url_or_host: str):
+        self.bucket(url_or_host).acquire()
+
+    async def acquire_async(self, url_or_host: str):
+        await self.bucket(url_or_host).acquire_async()
+
+    def record_response(self, url_or_host: str, status_code: int, retry_after=None):
+        """Feed a response status back so the host's rate adapts"""
+        bucket = self.bucket(url_or_host)
+        if status_code in self.THROTTLE_STATUSES:
+            bucket.penalize(parse_retry_after(retry_after))
+        elif 200 <= status_code < 400:
+            bucket.reward()
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_host_limiter() -> HostRateLimiter:
+    """Process-wide limiter configured from settings"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter({
+                TRADINGVIEW_HOST: (settings.REQUESTS_PER_MINUTE, settings.RATE_LIMIT_BURST),
+                OPENAI_HOST: (settings.OPENAI_REQUESTS_PER_MINUTE, settings.OPENAI_RATE_LIMIT_BURST),
+            }, settings.REQUESTS_PER_MINUTE, settings.RATE_LIMIT_BURST)
+        return _shared_limiter
 
 def rate_limit(calls_per_minute=20):
     limiter = RateLimiter(calls_per_minute)
@@ -21,4 +158,4 @@ def rate_limit(calls_per_minute=20):
             limiter.wait()
             return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,35 @@
+import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger('analyzer')
+
+# Rough size of an English token for the fallback estimate
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        # tiktoken fetches encodings on first use, which can fail offline
+        logger.warning(f"tiktoken unavailable, estimating token counts: {str(e)}")
+        return None
+
+def count_tokens(text: str, model: str = 'gpt-3.5-turbo') -> int:
+    """Token count of `text` for `model`, exact with tiktoken and estimated without"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
@@ -0,0 +1,28 @@
+from urllib.parse import urlsplit, urlunsplit
+
+TRADINGVIEW_HOST = 'www.tradingview.com'
+SCRIPT_PATH_PREFIX = '/script/'
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a TradingView URL so the same page is stored once.
+
+    Forces https and the www host, drops query strings and fragments, and
+    ends script paths with a slash:
+    http://tradingview.com/script/abc-Name?utm=x#c -> https://www.tradingview.com/script/abc-Name/
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host in ('tradingview.com', TRADINGVIEW_HOST):
+        host = TRADINGVIEW_HOST
+    path = parts.path or '/'
+    if path.startswith(SCRIPT_PATH_PREFIX) and not path.endswith('/'):
+        path += '/'
+    return urlunsplit(('https', host, path, '', ''))
+
+def is_script_url(url: str) -> bool:
+    """Whether url points at a single TradingView script page"""
+    parts = urlsplit(url)
+    slug = parts.path[len(SCRIPT_PATH_PREFIX):].strip('/')
+    return (parts.netloc.lower() in ('tradingview.com', TRADINGVIEW_HOST)
+            and parts.path.startswith(SCRIPT_PATH_PREFIX)
+            and bool(slug) and '/' not in slug)
@@ -0,0 +1,70 @@
+"""Micro-benchmark the HTML extractor backends over saved script pages.
+
+Pages come from a directory of .html files or, by default, from the raw
+HTML cache under DATA_DIR/html_cache:
+
+    python scripts/benchmark_extractors.py
+    python scripts/benchmark_extractors.py --pages tests/fixtures --repeat 200
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.extractors import available_backends, get_extractor
+from scraper.html_cache import HtmlCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_pages_from_dir(path):
+    pages = []
+    for file_name in sorted(os.listdir(path)):
+        if file_name.endswith('.html'):
+            with open(os.path.join(path, file_name), encoding='utf-8') as f:
+                pages.append((file_name, f.read()))
+    return pages
+
+def load_pages_from_cache():
+    cache = HtmlCache()
+    with sqlite3.connect(cache.index_path) as conn:
+        urls = [row[0] for row in conn.execute("SELECT url FROM pages")]
+    pages = []
+    for url in urls:
+        page = cache.get(url, allow_stale=True)
+        if page:
+            pages.append((url, page.html))
+    return pages
+
+def benchmark(backend, pages, repeat):
+    extractor = get_extractor(backend)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in pages:
+            extractor.extract(html, url)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extractor backends")
+    parser.add_argument('--pages', help="Directory of saved .html pages (default: the HTML cache)")
+    parser.add_argument('--repeat', type=int, default=50, help="Passes over the page set per backend")
+    args = parser.parse_args()
+
+    pages = load_pages_from_dir(args.pages) if args.pages else load_pages_from_cache()
+    if not pages:
+        logger.error("No saved pages found to benchmark")
+        return
+
+    results = {backend: benchmark(backend, pages, args.repeat) for backend in available_backends()}
+    baseline = results['bs4']
+
+    logger.info(f"{len(pages)} pages x {args.repeat} passes")
+    for backend, per_page in sorted(results.items(), key=lambda item: item[1]):
+        logger.info(f"{backend:<14} {per_page * 1000:8.3f} ms/page  {baseline / per_page:6.1f}x vs bs4")
+
+if __name__ == "__main__":
+    main()
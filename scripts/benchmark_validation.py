@@ -0,0 +1,60 @@
+"""Compare per-object, TypeAdapter batch and column-wise validation of analysis rows.
+
+    python scripts/benchmark_validation.py --rows 100000
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.data_validator import AnalysisResult, validate_analyses, validate_analysis_columns
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_rows(count):
+    now = datetime.now()
+    return [{
+        'url': f"https://www.tradingview.com/script/{i}/",
+        'name': f"Indicator {i}",
+        'functionality': "Plots a moving average",
+        'usage_guidelines': "Use on higher timeframes",
+        'user_feedback': {'positive': [], 'negative': []},
+        'additional_insights': "",
+        'profitability_rating': random.randint(0, 10),
+        'reliability_rating': random.randint(0, 10),
+        'analyzed_date': now,
+    } for i in range(count)]
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis row validation")
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    frame = pd.DataFrame(rows)
+    results = {
+        'per-object': timed(lambda: [AnalysisResult(**row) for row in rows]),
+        'type-adapter': timed(lambda: validate_analyses(rows)),
+        'columns': timed(lambda: validate_analysis_columns(frame)),
+    }
+
+    baseline = results['per-object']
+    logger.info(f"{args.rows} rows")
+    for name, seconds in sorted(results.items(), key=lambda item: item[1]):
+        logger.info(f"{name:<14} {seconds:8.3f} s  {baseline / seconds:6.1f}x vs per-object")
+
+if __name__ == "__main__":
+    main()
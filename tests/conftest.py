@@ -0,0 +1,4 @@
+import os
+
+# Keep test runs from reading or filling the on-disk LLM response cache
+os.environ.setdefault('LLM_CACHE_BACKEND', 'memory')
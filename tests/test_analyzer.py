@@ -1,6 +1,10 @@
+import asyncio
+import json
+import openai
 import pytest
 from scraper.analyzer import IndicatorAnalyzer
-from unittest.mock import Mock, patch
+from scraper.llm_cache import MemoryResponseCache
+from unittest.mock import patch
 
 @pytest.fixture
 def analyzer():
@@ -17,18 +21,231 @@ def test_create_analysis_prompt():
     assert "Test Indicator" in prompt
     assert "Test Description" in prompt
 
+REPLY = json.dumps({
+    "indicator_functionality": "test", "usage_guidelines": "", "additional_insights": "",
+    "user_feedback": {"positive": [], "negative": []},
+    "ratings": {"profitability": 6, "reliability": 7}
+})
+
+def streamed(text, size=5):
+    """Fake acreate(stream=True) that yields the reply a few characters at a time"""
+    async def acreate(**kwargs):
+        assert kwargs.get("stream")
+        async def chunks():
+            for i in range(0, len(text), size):
+                yield {"choices": [{"delta": {"content": text[i:i + size]}}]}
+        return chunks()
+    return acreate
+
 @pytest.mark.asyncio
 async def test_analyze_indicator():
-    with patch('openai.ChatCompletion.acreate') as mock_create:
-        mock_create.return_value.choices = [
-            Mock(message=Mock(content='{"indicator_functionality": "test"}'))
-        ]
-        
+    with patch('openai.ChatCompletion.acreate', side_effect=streamed(REPLY)):
         analyzer = IndicatorAnalyzer(api_key="test_key")
         result = await analyzer.analyze_indicator({
+            "url": "https://www.tradingview.com/script/abc/",
             "name": "Test",
             "description": "Test",
             "comments": []
         })
-        
-        assert isinstance(result, dict)
\ No newline at end of file
+
+        assert result["functionality"] == "test"
+        assert result["reliability_rating"] == 7
+        assert result["url"] == "https://www.tradingview.com/script/abc/"
+
+@pytest.mark.asyncio
+async def test_identical_prompts_hit_response_cache():
+    with patch('openai.ChatCompletion.acreate', side_effect=streamed(REPLY)) as mock_create:
+        analyzer = IndicatorAnalyzer(api_key="test_key", cache=MemoryResponseCache())
+        data = {"url": "https://www.tradingview.com/script/abc/", "name": "Test",
+                "description": "Test", "comments": []}
+        await analyzer.analyze_indicator(data)
+        await analyzer.analyze_indicator(data)
+
+        assert mock_create.call_count == 1
+        assert analyzer.cache_stats()['hits'] == 1
+
+@pytest.mark.asyncio
+async def test_invalid_reply_fails_once_and_is_not_cached():
+    replies = ["Sorry, I cannot help with that.", REPLY]
+
+    async def acreate(**kwargs):
+        return await streamed(replies.pop(0))(**kwargs)
+
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=MemoryResponseCache())
+    analyzer.retry_base_delay = 0.001
+    data = {"url": "https://www.tradingview.com/script/abc/", "name": "Test",
+            "description": "Test", "comments": []}
+    with patch('openai.ChatCompletion.acreate', side_effect=acreate) as mock_create:
+        failed = await analyzer.analyze_with_retry(data)
+        assert not failed.ok and failed.attempts == 1
+        assert analyzer.cache_stats()['size'] == 0
+
+        # The bad reply was not cached, so the next run asks again
+        again = await analyzer.analyze_with_retry(data)
+
+    assert again.ok
+    assert mock_create.call_count == 2
+    assert analyzer.cache_stats()['size'] == 1
+
+def make_items(count):
+    return [{"url": f"https://www.tradingview.com/script/{i}/", "name": f"Test {i}",
+             "description": "Test", "comments": []} for i in range(count)]
+
+@pytest.mark.asyncio
+async def test_analyze_many_bounds_concurrency():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    in_flight = 0
+    peak = 0
+
+    async def fake_analyze(data):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"url": data["url"]}
+
+    with patch.object(analyzer, 'analyze_indicator', side_effect=fake_analyze):
+        outcomes = [o async for o in analyzer.analyze_many(make_items(20), concurrency=4)]
+
+    assert len(outcomes) == 20
+    assert all(o.ok and o.latency > 0 for o in outcomes)
+    assert peak == 4
+
+@pytest.mark.asyncio
+async def test_analyze_many_retries_rate_limits():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    analyzer.retry_base_delay = 0.001
+    calls = {}
+
+    async def flaky_analyze(data):
+        calls[data["url"]] = calls.get(data["url"], 0) + 1
+        if calls[data["url"]] < 3:
+            raise openai.error.RateLimitError("slow down")
+        return {"url": data["url"]}
+
+    async def stream():
+        for item in make_items(3):
+            yield item
+
+    with patch.object(analyzer, 'analyze_indicator', side_effect=flaky_analyze):
+        outcomes = [o async for o in analyzer.analyze_many(stream(), concurrency=2)]
+
+    assert [o.attempts for o in outcomes] == [3, 3, 3]
+    assert all(o.ok for o in outcomes)
+
+@pytest.mark.asyncio
+async def test_analyze_many_reports_permanent_failures():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+
+    async def broken_analyze(data):
+        raise ValueError("bad response")
+
+    with patch.object(analyzer, 'analyze_indicator', side_effect=broken_analyze):
+        outcomes = [o async for o in analyzer.analyze_many(make_items(2))]
+
+    assert all(isinstance(o.error, ValueError) and o.attempts == 1 for o in outcomes)
+
+def packed_reply(items, **overrides):
+    entries = [{"url": item["url"], "indicator_functionality": f"does {item['name']}",
+                "usage_guidelines": "", "user_feedback": {"positive": [], "negative": []},
+                "additional_insights": "", "ratings": {"profitability": 6, "reliability": 7}}
+               for item in items]
+    for index, entry in overrides.items():
+        entries[int(index[1:])] = entry
+    return "```json\n" + json.dumps(entries) + "\n```"
+
+def test_pack_indicators_respects_limits():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    items = make_items(10)
+    items[4]["description"] = "long " * 5000
+
+    packs = analyzer.pack_indicators(items, token_budget=100000)
+
+    assert [items[4]] in packs
+    assert sorted(len(p) for p in packs) == [1, 1, 8]
+
+@pytest.mark.asyncio
+async def test_analyze_packed_splits_reply_per_url():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    items = make_items(3)
+
+    with patch.object(analyzer, '_complete', return_value=packed_reply(items[::-1])) as complete:
+        outcomes = await analyzer.analyze_packed(items)
+
+    assert complete.call_count == 1
+    assert [o.data for o in outcomes] == items
+    assert all(o.ok and o.packed for o in outcomes)
+    assert outcomes[2].analysis["functionality"] == "does Test 2"
+    assert outcomes[0].analysis["reliability_rating"] == 7
+
+@pytest.mark.asyncio
+async def test_analyze_packed_falls_back_for_unparsable_items():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    items = make_items(3)
+    reply = packed_reply(items, i1={"url": items[1]["url"], "ratings": {}})
+
+    with patch.object(analyzer, '_complete', return_value=reply), \
+         patch.object(analyzer, 'analyze_indicator', return_value={"url": items[1]["url"]}) as single:
+        outcomes = await analyzer.analyze_packed(items)
+
+    single.assert_called_once_with(items[1])
+    assert [o.packed for o in outcomes] == [True, False, True]
+
+def test_analysis_prompt_fits_token_budget():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    analyzer.token_budget = 200
+    comments = [f"Praise number {i}" for i in range(15)] + ["Repaints and lags on every timeframe"]
+    data = {"name": "Test", "description": "Word " * 2000, "comments": comments}
+
+    prompt = analyzer._create_analysis_prompt(data)
+
+    assert "Repaints and lags" in prompt
+    assert analyzer.budget_stats()["tokens_saved"] > 0
+
+@pytest.mark.asyncio
+async def test_streamed_reply_returns_when_object_closes():
+    reply = "Here you go:\n```json\n" + REPLY + "\n```\nLet me know if you need more."
+    consumed = []
+
+    async def acreate(**kwargs):
+        async def chunks():
+            for char in reply:
+                consumed.append(char)
+                yield {"choices": [{"delta": {"content": char}}]}
+        return chunks()
+
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    with patch('openai.ChatCompletion.acreate', side_effect=acreate):
+        content = await analyzer._complete_json_object("prompt")
+
+    assert content == REPLY
+    assert len(consumed) < len(reply)
+
+def test_parse_response_repairs_malformed_json():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    data = {"url": "https://www.tradingview.com/script/abc/", "name": "Test"}
+    response = """```json
+    {"indicator_functionality": "Trend filter", "user_feedback": "Mostly positive",
+     "ratings": {"profitability": "7/10", "reliability": 8,},"""
+
+    analysis = analyzer._parse_gpt_response(response, data)
+
+    assert analysis["functionality"] == "Trend filter"
+    assert analysis["user_feedback"] == {"summary": "Mostly positive"}
+    assert (analysis["profitability_rating"], analysis["reliability_rating"]) == (7, 8)
+
+def test_parse_response_clamps_out_of_range_ratings():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    data = {"url": "https://www.tradingview.com/script/abc/", "name": "Test"}
+
+    analysis = analyzer._parse_gpt_response('{"ratings": {"profitability": 12, "reliability": 3}}', data)
+
+    assert (analysis["profitability_rating"], analysis["reliability_rating"]) == (10, 3)
+
+def test_parse_response_rejects_replies_without_ratings():
+    analyzer = IndicatorAnalyzer(api_key="test_key", cache=None)
+    data = {"url": "https://www.tradingview.com/script/abc/", "name": "Test"}
+
+    with pytest.raises(ValueError):
+        analyzer._parse_gpt_response('{"ratings": {"reliability": 3}}', data)
@@ -0,0 +1,50 @@
+import sqlite3
+import time
+import pytest
+from database.connection import BatchWriter, get_connection
+
+def create_table(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+
+def write_items(conn, rows):
+    conn.executemany("INSERT INTO items (value) VALUES (?)", [(row,) for row in rows])
+
+def count_items(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    create_table(path)
+    return path
+
+def test_connection_is_reused_and_uses_wal(db_path):
+    conn = get_connection(db_path)
+
+    assert get_connection(db_path) is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+def test_batch_writer_flushes_by_size(db_path):
+    with BatchWriter(db_path, write_items, batch_size=3, flush_interval=60) as writer:
+        writer.add('a')
+        writer.add('b')
+        assert count_items(db_path) == 0
+
+        writer.add('c')
+        assert count_items(db_path) == 3
+        assert writer.pending() == 0
+
+def test_batch_writer_flushes_by_time(db_path):
+    with BatchWriter(db_path, write_items, batch_size=100, flush_interval=0.05) as writer:
+        writer.add('a')
+        time.sleep(0.3)
+        assert count_items(db_path) == 1
+
+def test_batch_writer_flushes_on_close(db_path):
+    writer = BatchWriter(db_path, write_items, batch_size=100, flush_interval=60)
+    writer.add_many(['a', 'b'])
+    writer.close()
+
+    assert count_items(db_path) == 2
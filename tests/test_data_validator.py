@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from scraper.data_validator import (
+    IndicatorData, frame_to_records, validate_analyses, validate_analysis_columns, validate_indicators
+)
+
+def analysis_row(i, **overrides):
+    return {
+        "url": f"https://www.tradingview.com/script/{i}/", "name": f"Test {i}",
+        "functionality": "f", "usage_guidelines": "u", "user_feedback": {},
+        "additional_insights": "a", "profitability_rating": 5, "reliability_rating": 6,
+        "analyzed_date": datetime(2024, 1, 1), **overrides,
+    }
+
+def test_field_validator_cleans_description():
+    data = IndicatorData(url="https://www.tradingview.com/script/a/", name="A",
+                         description="  two\n  lines ", comments=[])
+    assert data.description == "two lines"
+
+def test_validate_indicators_batch():
+    rows = [{"url": f"https://www.tradingview.com/script/{i}/", "name": "A",
+             "description": "d", "comments": ["c"]} for i in range(3)]
+    assert len(validate_indicators(rows)) == 3
+
+def test_validate_analyses_reports_every_bad_row():
+    rows = [analysis_row(0), analysis_row(1, profitability_rating=11), analysis_row(2, url="nope")]
+
+    with pytest.raises(ValidationError) as excinfo:
+        validate_analyses(rows)
+
+    assert {error["loc"][0] for error in excinfo.value.errors()} == {1, 2}
+
+def test_column_validation_splits_rows():
+    frame = pd.DataFrame([
+        analysis_row(0),
+        analysis_row(1, profitability_rating=11),
+        analysis_row(2, url="ftp://x"),
+        analysis_row(3, reliability_rating=2.5, name=" "),
+        analysis_row(4, analyzed_date="not a date", functionality=None),
+    ])
+
+    checked = validate_analysis_columns(frame)
+
+    assert list(checked.valid["name"]) == ["Test 0"]
+    assert list(checked.invalid["errors"]) == [
+        "profitability_rating", "url", "name, reliability_rating", "analyzed_date"
+    ]
+
+def test_column_validation_agrees_with_model_on_valid_rows():
+    frame = pd.DataFrame([analysis_row(i, functionality=None) for i in range(5)])
+
+    checked = validate_analysis_columns(frame)
+
+    records = frame_to_records(checked.valid)
+    assert checked.ok
+    assert len(validate_analyses(records)) == 5
+    assert isinstance(records[0]["analyzed_date"], datetime)
@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.frontier import ListingPages
+from scraper.discovery import DiscoveryCrawler, extract_links, listing_kind
+from scraper.html_cache import HtmlCache
+from tradingview_analyzer import TradingViewScraper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+SEED = "https://www.tradingview.com/scripts/"
+AUTHOR = "https://www.tradingview.com/u/JustUncleL/"
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def test_extract_links_normalizes_and_dedups():
+    scripts, listings = extract_links(fixture("listing_page.html"), SEED)
+
+    assert scripts == [
+        "https://www.tradingview.com/script/56tr3OzQ-Big-Snapper-Alerts-R2-0-by-JustUncleL/",
+        "https://www.tradingview.com/script/cXVnf1WH-Reversal-Trading-Bot-Strategy-BullByte/",
+        "https://www.tradingview.com/script/Ab12Cd34-Smart-Money-Concepts/",
+    ]
+    assert dict(listings) == {
+        AUTHOR: "author",
+        "https://www.tradingview.com/scripts/trendanalysis/": "tag",
+        "https://www.tradingview.com/u/BullByte/": "author",
+        "https://www.tradingview.com/scripts/page-2/": "listing",
+    }
+
+def test_listing_kind():
+    assert listing_kind("https://www.tradingview.com/scripts/page-3/") == "listing"
+    assert listing_kind("https://www.tradingview.com/chart/") is None
+    assert listing_kind("https://example.com/u/someone/") is None
+
+@pytest.fixture
+def scraper(tmp_path):
+    cache = HtmlCache(cache_dir=str(tmp_path / "html"))
+    cache.put(SEED, fixture("listing_page.html"))
+    cache.put(AUTHOR, fixture("author_page.html"))
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=cache, offline=True) as scraper:
+        yield scraper
+
+def test_discovery_feeds_frontier_offline(scraper):
+    stats = DiscoveryCrawler(scraper, seeds=[SEED], max_depth=1).run(max_pages=10)
+
+    assert len(scraper.frontier) == 4
+    assert stats["scripts_new"] == 4
+    assert stats["pages_visited"] == 2  # Seed and the cached author page
+    assert stats["pages_failed"] == 3   # Not in the offline cache
+    assert len(ListingPages(scraper.db_path)) == 5
+
+def test_second_run_waits_until_pages_are_due(scraper):
+    crawler = DiscoveryCrawler(scraper, seeds=[SEED], max_depth=0)
+    crawler.run()
+
+    assert crawler.run()["pages_visited"] == 0
+
+def test_pages_that_change_are_revisited_sooner(tmp_path):
+    pages = ListingPages(str(tmp_path / "indicators.db"))
+    busy, quiet = "https://www.tradingview.com/scripts/", "https://www.tradingview.com/u/quiet/"
+    pages.add_many([(busy, "listing", 0), (quiet, "author", 0)])
+    for i in range(3):
+        pages.record_visit(busy, f"hash-{i}")
+        pages.record_visit(quiet, "same")
+
+    later = datetime.now() + timedelta(days=30)
+    assert [url for url, _ in pages.due(10, now=later)] == [busy, quiet]
+    assert pages.due(10, now=datetime.now() + timedelta(hours=12)) == [(busy, 0)]
@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from scraper.extractors import available_backends, get_extractor
+
+URL = "https://www.tradingview.com/script/56tr3OzQ-Big-Snapper-Alerts-R2-0-by-JustUncleL/"
+
+@pytest.fixture
+def page():
+    path = os.path.join(os.path.dirname(__file__), 'fixtures', 'script_page.html')
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def test_bs4_extraction(page):
+    data = get_extractor('bs4').extract(page, URL)
+
+    assert data['name'] == "Big Snapper Alerts R2.0"
+    assert "Hull MA" in data['description']
+    assert len(data['comments']) == 3
+    assert data['url'] == URL
+
+def normalized(data):
+    # Parsers differ only in the whitespace they keep between block elements
+    return {k: ' '.join(v.split()) if isinstance(v, str) else v for k, v in data.items()}
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_backends_match_beautifulsoup(page, backend):
+    expected = get_extractor('bs4').extract(page, URL)
+
+    assert normalized(get_extractor(backend).extract(page, URL)) == normalized(expected)
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_missing_elements_use_defaults(backend):
+    data = get_extractor(backend).extract("<html><body><p>Nothing here</p></body></html>", URL)
+
+    assert data['name'] == "Unknown Indicator"
+    assert data['description'] == "No description available"
+    assert data['comments'] == []
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_one_extractor_shared_by_threads(page, backend):
+    extractor = get_extractor(backend)
+    expected = normalized(extractor.extract(page, URL))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: normalized(extractor.extract(page, URL)), range(64)))
+
+    assert all(result == expected for result in results)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_extractor('regex')
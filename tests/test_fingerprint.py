@@ -0,0 +1,16 @@
+from scraper.fingerprint import analysis_fingerprint, content_hash
+
+DATA = {'name': 'Test', 'description': 'Line one\n   line two', 'comments': ['Good', ' ']}
+
+def test_content_hash_ignores_whitespace():
+    reformatted = {**DATA, 'description': 'Line one line two', 'comments': ['Good']}
+
+    assert content_hash(DATA) == content_hash(reformatted)
+    assert content_hash(DATA) != content_hash({**DATA, 'comments': ['Bad']})
+
+def test_analysis_fingerprint_tracks_prompt_and_model():
+    base = analysis_fingerprint(DATA, '1', 'gpt-3.5-turbo-16k')
+
+    assert base == analysis_fingerprint(DATA, '1', 'gpt-3.5-turbo-16k')
+    assert base != analysis_fingerprint(DATA, '2', 'gpt-3.5-turbo-16k')
+    assert base != analysis_fingerprint(DATA, '1', 'gpt-4')
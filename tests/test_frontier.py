@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.frontier import UrlFrontier
+from scraper.urls import is_script_url, normalize_url
+
+@pytest.fixture
+def frontier(tmp_path):
+    return UrlFrontier(str(tmp_path / "indicators.db"))
+
+def test_normalize_url():
+    assert normalize_url("http://TradingView.com/script/abc-Name?utm=x#c") == \
+        "https://www.tradingview.com/script/abc-Name/"
+    assert is_script_url("https://www.tradingview.com/script/abc-Name/")
+    assert not is_script_url("https://www.tradingview.com/scripts/")
+
+def test_add_dedups_normalized_urls(frontier):
+    assert frontier.add("https://www.tradingview.com/script/a/")
+    assert not frontier.add("https://tradingview.com/script/a?ref=1")
+    assert frontier.add_many([f"https://www.tradingview.com/script/{i}" for i in range(5)] * 2) == 5
+    assert len(frontier) == 6
+    assert "http://www.tradingview.com/script/3/" in frontier
+
+def test_import_csv(frontier, tmp_path):
+    path = tmp_path / "urls.csv"
+    path.write_text("url\nhttps://www.tradingview.com/script/a/\n\nhttps://www.tradingview.com/script/a/\n")
+    assert frontier.import_csv(str(path)) == 1
+
+def test_next_batch_orders_by_priority_and_skips_fresh(frontier):
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(4)]
+    frontier.add_many(urls)
+    frontier.set_priority(urls[2], 5)
+    frontier.mark_fetched(urls[0])
+
+    assert frontier.next_batch(10) == [urls[2], urls[1], urls[3]]
+    assert urls[0] in frontier.next_batch(10, stale_after=timedelta(0))
+
+def test_failed_urls_retry_until_limit(frontier, monkeypatch):
+    monkeypatch.setattr("config.settings.FRONTIER_MAX_FAILURES", 2)
+    url = "https://www.tradingview.com/script/a/"
+    frontier.add(url)
+    frontier.mark_failed(url, "HTTP 500")
+    assert frontier.next_batch(10) == [url]
+    frontier.mark_failed(url, "HTTP 500")
+    assert frontier.next_batch(10) == []
+    assert frontier.counts() == {'failed': 1}
+
+def test_claimed_urls_are_skipped_for_the_rest_of_a_crawl(frontier):
+    started = datetime.now()
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(3)]
+    frontier.add_many(urls)
+    frontier.claim(urls[:2])
+
+    assert frontier.next_batch(10, not_attempted_since=started) == [urls[2]]
+
+def _backdate(frontier, url, hours):
+    then = (datetime.now() - timedelta(hours=hours)).isoformat(sep=' ')
+    with frontier.conn:
+        frontier.conn.execute(
+            "UPDATE frontier SET last_fetched = ?, first_fetched = ? WHERE url = ?", (then, then, url)
+        )
+
+def test_record_content_counts_changes_and_comment_growth(frontier):
+    url = "https://www.tradingview.com/script/a/"
+    frontier.add(url)
+    frontier.mark_fetched(url)
+    start = datetime.now()
+    assert not frontier.record_content(url, "h1", 10, now=start)
+    assert not frontier.record_content(url, "h1", 10, now=start + timedelta(days=1))
+    assert frontier.record_content(url, "h2", 20, now=start + timedelta(days=2))
+
+    change_count, comment_rate = frontier.conn.execute(
+        "SELECT change_count, comment_rate FROM frontier WHERE url = ?", (url,)
+    ).fetchone()
+    assert change_count == 1
+    assert comment_rate == pytest.approx(5.0)  # Average of 0 and 10 comments/day
+
+def test_adaptive_next_batch_prefers_urls_likely_to_have_changed(frontier, monkeypatch):
+    monkeypatch.setattr("config.settings.RECRAWL_MIN_EXPECTED_CHANGES", 0.5)
+    quiet, busy, fresh = [f"https://www.tradingview.com/script/{name}/" for name in ("quiet", "busy", "fresh")]
+    frontier.add_many([quiet, busy, fresh])
+    for url in (quiet, busy, fresh):
+        frontier.mark_fetched(url)
+    _backdate(frontier, quiet, 100)
+    _backdate(frontier, busy, 100)
+    with frontier.conn:
+        frontier.conn.execute("UPDATE frontier SET change_count = 5 WHERE url = ?", (busy,))
+
+    # fresh was fetched just now, so no change is expected yet
+    assert frontier.next_batch(10, adaptive=True) == [busy, quiet]
+    assert frontier.expected_changes(busy) > frontier.expected_changes(quiet) > 0.5
+    assert frontier.expected_changes(fresh) < 0.5
+
+def test_comment_growth_makes_a_url_due_sooner(frontier, monkeypatch):
+    monkeypatch.setattr("config.settings.RECRAWL_MIN_EXPECTED_CHANGES", 1.0)
+    url = "https://www.tradingview.com/script/a/"
+    frontier.add(url)
+    frontier.mark_fetched(url)
+    _backdate(frontier, url, 12)
+    assert frontier.next_batch(10, adaptive=True) == []
+
+    with frontier.conn:
+        frontier.conn.execute("UPDATE frontier SET comment_rate = 10 WHERE url = ?", (url,))
+    assert frontier.next_batch(10, adaptive=True) == [url]
+    # A fixed staleness window still applies when asked for
+    assert frontier.next_batch(10, stale_after=timedelta(days=7)) == []
@@ -0,0 +1,41 @@
+import time
+import pytest
+from scraper.html_cache import HtmlCache
+
+URL = "https://www.tradingview.com/script/abc-Test/"
+
+@pytest.fixture
+def cache(tmp_path):
+    return HtmlCache(cache_dir=str(tmp_path), ttl=60, max_bytes=10 * 1024 * 1024, compression='gzip')
+
+def test_round_trip(cache):
+    html = "<h1 class='title'>Test</h1>" * 100
+    cache.put(URL, html, etag='"e1"')
+
+    page = cache.get(URL)
+
+    assert page.html == html
+    assert page.etag == '"e1"'
+    assert cache.total_size() < len(html)  # Stored compressed
+
+def test_expired_entries_only_served_when_stale_allowed(cache):
+    cache.put(URL, "<html></html>")
+    cache.ttl = 0.01
+    time.sleep(0.05)
+
+    assert cache.get(URL) is None
+    assert cache.get(URL, allow_stale=True).html == "<html></html>"
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = HtmlCache(cache_dir=str(tmp_path), ttl=60, max_bytes=10 ** 6, compression='gzip')
+    for i in range(3):
+        cache.put(f"{URL}{i}", f"<p>{i}</p>")
+        time.sleep(0.01)
+    cache.get(f"{URL}0")  # Most recently used now
+
+    cache.max_bytes = cache.total_size() - 1
+    cache._evict()
+
+    assert cache.get(f"{URL}0") is not None
+    assert cache.get(f"{URL}1") is None
+    assert cache.get(f"{URL}2") is not None
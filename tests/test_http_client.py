@@ -0,0 +1,52 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from scraper.http_client import HttpClient
+from scraper.rate_limiter import HostRateLimiter
+
+PAGE = b"<html><h1 class='title'>Test Indicator</h1></html>"
+ETAG = '"abc123"'
+
+class ScriptPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Last-Modified', 'Wed, 21 Oct 2015 07:28:00 GMT')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/script/abc/"
+    server.shutdown()
+
+@pytest.fixture
+def client():
+    limiter = HostRateLimiter(default_calls_per_minute=60000, default_burst=10)
+    with HttpClient(pool_size=2, timeout=5, limiter=limiter) as client:
+        yield client
+
+def test_get_returns_validators(client, server_url):
+    result = client.get(server_url)
+
+    assert result.status_code == 200
+    assert 'Test Indicator' in result.html
+    assert result.validators == {'etag': ETAG, 'last_modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+
+def test_conditional_get_not_modified(client, server_url):
+    result = client.get(server_url, etag=ETAG, last_modified='Wed, 21 Oct 2015 07:28:00 GMT')
+
+    assert result.not_modified
+    assert result.html is None
+    assert result.etag == ETAG
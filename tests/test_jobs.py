@@ -0,0 +1,30 @@
+import pytest
+
+from database.jobs import CrawlJobStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = CrawlJobStore(str(tmp_path / "indicators.db"))
+    yield store
+    store.close()
+
+def test_states_are_checkpointed(store):
+    job_id = store.create({'pipeline': False})
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(3)]
+    store.add_items(job_id, urls)
+
+    store.record(job_id, urls[0], 'fetched')
+    store.record(job_id, urls[0], 'saved')
+    store.record(job_id, urls[1], 'failed', 'HTTP 500')
+
+    assert store.summary(job_id) == {'saved': 1, 'failed': 1, 'pending': 1}
+    assert store.unfinished_urls(job_id) == [urls[2]]
+    assert store.get(job_id)['checkpoint_at'] is not None
+
+def test_latest_unfinished_skips_completed_jobs(store):
+    first = store.create()
+    second = store.create()
+    store.set_status(second, 'completed', {'crawled': 0})
+
+    assert store.latest_unfinished()['id'] == first
+    assert store.get(second)['stats'] == {'crawled': 0}
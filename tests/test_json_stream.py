@@ -0,0 +1,36 @@
+import pytest
+from scraper.json_stream import JsonObjectStream, loads_lenient, repair_json
+
+def feed_all(text, size=1):
+    stream = JsonObjectStream()
+    found = []
+    for i in range(0, len(text), size):
+        found.extend(stream.feed(text[i:i + size]))
+    return stream, found
+
+def test_stream_returns_object_when_it_closes():
+    stream, found = feed_all('Sure!\n```json\n{"a": "brace } in string", "b": {"c": [1, 2]}}\n```')
+
+    assert found == ['{"a": "brace } in string", "b": {"c": [1, 2]}}']
+
+def test_stream_splits_array_elements():
+    stream, found = feed_all('[{"url": "a"}, {"url": "b", "x": {"y": 1}}, {"url": "c"', size=4)
+
+    assert found == ['{"url": "a"}', '{"url": "b", "x": {"y": 1}}']
+    assert stream.pending() == '{"url": "c"'
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ('{"a": True, "b": None}', {"a": True, "b": None}),
+    ('{"a": "line\nbreak"}', {"a": "line\nbreak"}),
+    ('{"a": {"b": "cut off', {"a": {"b": "cut off"}}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{“a”: “b”}', {"a": "b"}),
+    ('{"a": "say “hi”"}', {"a": "say “hi”"}),
+])
+def test_loads_lenient_repairs_common_mistakes(text, expected):
+    assert loads_lenient(text) == expected
+
+def test_repair_json_without_json_raises():
+    with pytest.raises(ValueError):
+        repair_json("I cannot help with that.")
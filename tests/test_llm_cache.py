@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+import time
+import pytest
+from scraper.llm_cache import MemoryResponseCache, ResponseCache, SQLiteResponseCache, cache_key
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == 'memory':
+            return MemoryResponseCache(**kwargs)
+        return SQLiteResponseCache(db_path=str(tmp_path / "llm_cache.db"), **kwargs)
+    return make
+
+def test_cache_key_depends_on_all_parts():
+    key = cache_key('gpt-4', 'system', 'prompt')
+
+    assert key == cache_key('gpt-4', 'system', 'prompt')
+    assert key != cache_key('gpt-3.5-turbo-16k', 'system', 'prompt')
+    assert key != cache_key('gpt-4', 'other system', 'prompt')
+
+def test_hits_and_misses(make_cache):
+    cache = make_cache(ttl=60, max_entries=10)
+
+    assert cache.get('a') is None
+    cache.set('a', '{"ok": true}')
+    assert cache.get('a') == '{"ok": true}'
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+def test_ttl_expiry(make_cache):
+    cache = make_cache(ttl=0.01, max_entries=10)
+    cache.set('a', 'value')
+    time.sleep(0.05)
+
+    assert cache.get('a') is None
+
+def test_evicts_least_recently_used(make_cache):
+    cache = make_cache(ttl=60, max_entries=2)
+    cache.set('a', '1')
+    time.sleep(0.01)
+    cache.set('b', '2')
+    time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.set('c', '3')
+
+    assert cache.get('a') == '1'
+    assert cache.get('b') is None
+    assert cache.get('c') == '3'
+
+def test_sqlite_cache_reuses_one_connection_per_thread(tmp_path):
+    cache = SQLiteResponseCache(db_path=str(tmp_path / "llm_cache.db"), ttl=60, max_entries=10)
+    conn = cache._connect()
+    cache.set('a', '1')
+    assert cache.get('a') == '1'
+    assert cache._connect() is conn
+
+    others = []
+    thread = threading.Thread(target=lambda: others.append(cache._connect()))
+    thread.start()
+    thread.join()
+    assert others[0] is not conn
+
+    cache.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert cache.get('a') == '1'  # Reopened on next use
+
+def test_response_cache_requires_a_backend():
+    with pytest.raises(TypeError):
+        ResponseCache()
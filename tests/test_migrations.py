@@ -0,0 +1,85 @@
+import os
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database.models import AnalysisLog, Base, Indicator
+from database.pagination import after, decode_cursor
+from database.utils import IndicatorQueries
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def config():
+    config = Config(os.path.join(ROOT, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(ROOT, 'migrations'))
+    return config
+
+@pytest.fixture
+def engine(tmp_path, config):
+    engine = create_engine(f"sqlite:///{tmp_path / 'analysis.db'}")
+    with engine.begin() as connection:
+        config.attributes['connection'] = connection
+        command.upgrade(config, 'head')
+    return engine
+
+def query_plan(session, query):
+    """SQLite's EXPLAIN QUERY PLAN details for an ORM query"""
+    sql = query.statement.compile(session.get_bind(), compile_kwargs={'literal_binds': True})
+    return ' | '.join(row[3] for row in session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+def test_migrations_create_the_model_indexes(engine):
+    # sqlite_master rather than the inspector, which skips expression indexes
+    with engine.connect() as connection:
+        migrated = {row[0] for row in connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+    for table in Base.metadata.sorted_tables:
+        assert {index.name for index in table.indexes} <= migrated, table.name
+
+def test_hot_queries_use_their_indexes(engine):
+    with Session(engine) as session:
+        session.add_all(
+            Indicator(url=f"u{i}", name=f"Indicator {i}", profitability_rating=i % 10,
+                      reliability_rating=i % 7, created_at=datetime(2026, 1, 1 + i % 28))
+            for i in range(200)
+        )
+        session.add_all(AnalysisLog(indicator_id=i % 50, status='saved') for i in range(200))
+        session.commit()
+        session.connection().exec_driver_sql("ANALYZE")
+        indicators = session.query(Indicator)
+
+        newest = indicators.order_by(Indicator.created_at.desc()).limit(50)
+        assert "idx_indicators_created_at" in query_plan(session, newest)
+        assert "TEMP B-TREE" not in query_plan(session, newest)
+
+        page = IndicatorQueries(session).search_page(limit=10)
+        keyset = indicators.filter(after(
+            [(Indicator.created_at, True), (Indicator.id, True)], decode_cursor(page.next_cursor)
+        )).order_by(Indicator.created_at.desc(), Indicator.id.desc()).limit(10)
+        assert "SEARCH indicators USING INDEX idx_indicators_created_at" in query_plan(session, keyset)
+        assert "TEMP B-TREE" not in query_plan(session, keyset)
+
+        recent = indicators.filter(Indicator.created_at >= datetime(2026, 1, 27))
+        assert "idx_indicators_created_at" in query_plan(session, recent)
+
+        top = indicators.order_by(Indicator.combined_score.desc()).limit(10)
+        assert "idx_indicators_combined_score" in query_plan(session, top)
+
+        history = session.query(AnalysisLog).filter(AnalysisLog.indicator_id == 3)\
+            .order_by(AnalysisLog.created_at.desc())
+        assert "idx_analysis_logs_indicator_created" in query_plan(session, history)
+        assert "TEMP B-TREE" not in query_plan(session, history)
+
+        top_indicators = IndicatorQueries(session).get_top_indicators(3)
+        assert [indicator.combined_score for indicator in top_indicators] == [15, 15, 14]
+
+def test_autogenerate_ignores_tables_made_by_raw_ddl(engine, config):
+    # The FTS5 shadow tables and indicator_daily_stats exist but are not models
+    with engine.begin() as connection:
+        config.attributes['connection'] = connection
+        command.check(config)  # Raises if autogenerate would change anything
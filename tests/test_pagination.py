@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Indicator
+from database.pagination import decode_cursor, encode_cursor
+from database.summary import IndicatorSummary
+from database.utils import IndicatorQueries
+from tradingview_analyzer import TradingViewScraper
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        # Pairs of rows share a created_at, so the id tiebreak matters
+        session.add_all(
+            Indicator(url=f"u{i}", name=f"RSI variant {i}", profitability_rating=i % 10,
+                      created_at=datetime(2026, 1, 1 + i // 2))
+            for i in range(25)
+        )
+        session.commit()
+        yield session
+
+def walk(queries, **filters):
+    pages, cursor = [], None
+    while True:
+        page = queries.search_page(limit=4, cursor=cursor, **filters)
+        pages.append([indicator.url for indicator in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 1, 2, 3, 4, 5), 17]
+    assert decode_cursor(encode_cursor(values)) == values
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_search_page_visits_every_row_once_in_order(session):
+    queries = IndicatorQueries(session)
+    pages = walk(queries)
+    assert [len(page) for page in pages] == [4] * 6 + [1]
+    assert sum(pages, []) == [indicator.url for indicator in queries.search_indicators(limit=100)]
+
+    filtered = sum(walk(queries, min_profitability=5), [])
+    assert filtered == [indicator.url for indicator in queries.search_indicators(min_profitability=5, limit=100)]
+
+def test_search_page_pages_through_ranked_text_results(session):
+    queries = IndicatorQueries(session)
+    ranked = sum(walk(queries, query="rsi"), [])
+    assert sorted(ranked) == sorted(f"u{i}" for i in range(25))
+    assert ranked == [indicator.url for indicator in queries.search_indicators("rsi", limit=100)]
+
+def test_iter_indicators_streams_everything(session):
+    assert [indicator.url for indicator in IndicatorQueries(session).iter_indicators(batch_size=7)] == \
+        [f"u{i}" for i in range(25)]
+
+def test_summary_pages_and_chunked_export(tmp_path):
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        for i in range(5):
+            scraper.save_to_db(scraper.analyze_indicator(
+                {'url': f"https://www.tradingview.com/script/{i}/", 'name': str(i), 'description': '', 'comments': []}
+            ))
+        scraper.flush()
+
+        summary = IndicatorSummary(scraper.db_path)
+        first = summary.page(limit=3)
+        second = summary.page(first.next_cursor, limit=3)
+        assert [row['name'] for row in first.items + second.items] == ['4', '3', '2', '1', '0']
+        assert second.next_cursor is None
+
+        assert [len(chunk) for chunk in scraper.iter_indicators_df(chunksize=2)] == [2, 2, 1]
+        success, message = scraper.export_to_csv(str(tmp_path / "export.csv"))
+        assert success and "5 indicators" in message
+
+def test_summary_pages_keep_insertion_order_after_upsert(tmp_path):
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        for i in range(3):
+            scraper.save_to_db(scraper.analyze_indicator(
+                {'url': f"https://www.tradingview.com/script/{i}/", 'name': str(i), 'description': '', 'comments': []}
+            ))
+        scraper.flush()
+        scraper.save_to_db(scraper.analyze_indicator(
+            {'url': "https://www.tradingview.com/script/0/", 'name': '0', 'description': 'Edited', 'comments': []}
+        ))
+        scraper.flush()
+
+        assert [row['name'] for row in IndicatorSummary(scraper.db_path).page(limit=5).items] == ['2', '1', '0']
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from scraper.http_client import FetchResult
+from scraper.pipeline import ScrapePipeline
+
+class FakeScraper:
+    def __init__(self, failing=(), unchanged=(), up_to_date=()):
+        self.failing = set(failing)
+        self.unchanged = set(unchanged)
+        self.up_to_date = set(up_to_date)
+        self.saved = []
+        self.batches = []
+        self.observed = []
+
+    def fetch_page(self, url):
+        if url in self.failing:
+            return None
+        if url in self.unchanged:
+            return FetchResult(url=url, status_code=304, etag='"v1"')
+        return FetchResult(url=url, status_code=200, html=f"<h1 class='title'>{url}</h1>", etag='"v2"')
+
+    def parse_page(self, html, url):
+        return {'url': url, 'name': url, 'description': '', 'comments': []}
+
+    def needs_analysis(self, data):
+        return data['url'] not in self.up_to_date
+
+    def analyze_indicator(self, data):
+        return {'url': data['url'], 'name': data['name'], 'etag': data.get('etag')}
+
+    async def analyze_indicator_async(self, data):
+        return self.analyze_indicator(data)
+
+    async def analyze_batch_async(self, items):
+        self.batches.append(len(items))
+        return [self.analyze_indicator(data) for data in items]
+
+    def save_to_db(self, analysis):
+        self.saved.append(analysis['url'])
+
+    def track(self, url, state, error=None):
+        pass
+
+    def observe(self, data):
+        pass
+
+    def observe_many(self, parsed, failed_urls=()):
+        self.observed.append(len(parsed) + len(failed_urls))
+
+def test_pipeline_saves_every_url():
+    scraper = FakeScraper()
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(25)]
+    pipeline = ScrapePipeline(scraper, fetch_workers=3, parse_workers=2,
+                              analyze_workers=2, save_workers=1,
+                              queue_size=2)
+
+    stats = asyncio.run(pipeline.run(urls))
+
+    assert sorted(scraper.saved) == sorted(urls)
+    assert stats['saved'] == 25
+    assert stats['failed'] == 0
+
+def test_pipeline_continues_after_failures():
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(5)]
+    scraper = FakeScraper(failing=[urls[1], urls[3]])
+    pipeline = ScrapePipeline(scraper)
+
+    stats = pipeline.run_sync(urls)
+
+    assert stats['saved'] == 3
+    assert stats['failed'] == 2
+
+def test_pipeline_skips_unchanged_pages():
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(4)]
+    scraper = FakeScraper(unchanged=urls[:3])
+    pipeline = ScrapePipeline(scraper)
+
+    stats = pipeline.run_sync(urls)
+
+    assert scraper.saved == [urls[3]]
+    assert stats['not_modified'] == 3
+    assert stats['failed'] == 0
+
+def test_pipeline_parses_in_process_pool():
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(20)]
+    scraper = FakeScraper()
+    pipeline = ScrapePipeline(scraper, parse_processes=2, parse_chunk_size=4)
+
+    stats = pipeline.run_sync(urls)
+
+    assert sorted(scraper.saved) == sorted(urls)
+    assert stats['parsed'] == 20
+    assert stats['failed'] == 0
+    assert sum(scraper.observed) == 20 and len(scraper.observed) < 20  # Recorded per chunk
+
+def test_pipeline_skips_up_to_date_analyses():
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(4)]
+    scraper = FakeScraper(up_to_date=urls[1:])
+
+    stats = ScrapePipeline(scraper).run_sync(urls)
+
+    assert scraper.saved == [urls[0]]
+    assert stats['analysis_skipped'] == 3
+
+def test_pipeline_packs_analyses():
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(12)]
+    scraper = FakeScraper(up_to_date=urls[:2])
+
+    stats = ScrapePipeline(scraper, pack_analyses=True).run_sync(urls)
+
+    assert sorted(scraper.saved) == sorted(urls[2:])
+    assert sum(scraper.batches) == 10
+    assert stats['analyzed'] == 10
+    assert stats['analysis_skipped'] == 2
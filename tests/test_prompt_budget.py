@@ -0,0 +1,71 @@
+from collections import Counter
+
+from scraper import prompt_budget
+from scraper.prompt_budget import fit_to_budget, select_comments, truncate_text
+from scraper.tokens import count_tokens
+
+MODEL = "gpt-3.5-turbo"
+
+def test_truncate_text_keeps_leading_sentences():
+    text = "Plots a moving average. " + "Filler sentence here. " * 200
+
+    short = truncate_text(text, 20, MODEL)
+
+    assert short.startswith("Plots a moving average.")
+    assert short.endswith("…")
+    assert count_tokens(short, MODEL) <= 20
+
+def test_truncate_text_leaves_short_text_alone():
+    assert truncate_text("  Short   text. ", 50, MODEL) == "Short text."
+
+def test_select_comments_drops_duplicates_and_keeps_order():
+    comments = ["Great indicator!", "great indicator", "Repaints on the 1m chart, useless for scalping",
+                "Great indicator!!"]
+
+    selected = select_comments(comments, 100, MODEL)
+
+    assert selected == ["Great indicator!", "Repaints on the 1m chart, useless for scalping"]
+
+def test_select_comments_prefers_diverse_comments_under_budget():
+    praise = [f"Great indicator works really well thanks {i}" for i in range(20)]
+    comments = praise + ["Lags badly in sideways markets and gives false signals"]
+
+    selected = select_comments(comments, 40, MODEL)
+
+    assert comments[-1] in selected
+    assert sum(count_tokens(c + " ", MODEL) for c in selected) <= 40
+
+def test_select_comments_work_is_bounded_by_candidate_cap(monkeypatch):
+    monkeypatch.setattr("config.settings.PROMPT_MAX_COMMENT_CANDIDATES", 100)
+    calls = Counter()
+
+    def counting(name, function):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return function(*args, **kwargs)
+        monkeypatch.setattr(prompt_budget, name, wrapper)
+
+    counting("_similarity", prompt_budget._similarity)
+    counting("count_tokens", prompt_budget.count_tokens)
+
+    work = []
+    for count in (1000, 3000):
+        calls.clear()
+        comments = [f"Comment {i} mentions rsi divergence and signal quality number {i * 13}" for i in range(count)]
+        assert select_comments(comments, 1500, MODEL)
+        work.append(dict(calls))
+
+    # Three times the comments, the same work: only the first 100 are considered,
+    # with at most one comparison per pair for dedup and one per pick for diversity
+    assert work[0] == work[1]
+    assert work[0]["_similarity"] <= 100 * 99
+    assert work[0]["count_tokens"] <= 3 * 100
+
+def test_fit_to_budget_reports_tokens_saved():
+    data = {"description": "Word " * 3000, "comments": [f"Comment number {i} about topic {i * 7}" for i in range(50)]}
+
+    content = fit_to_budget(data, MODEL, token_budget=300)
+
+    assert content.used_tokens <= 300
+    assert content.tokens_saved == content.original_tokens - content.used_tokens > 0
+    assert content.comments_dropped > 0
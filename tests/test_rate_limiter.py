@@ -1,6 +1,9 @@
+import asyncio
 import pytest
 import time
-from scraper.rate_limiter import RateLimiter, rate_limit
+from scraper.rate_limiter import (
+    HostRateLimiter, RateLimiter, TokenBucket, parse_retry_after, rate_limit
+)
 
 def test_rate_limiter():
     limiter = RateLimiter(calls_per_minute=60)
@@ -22,4 +25,48 @@ def test_rate_limit_decorator():
         dummy_function()
     elapsed = time.time() - start_time
     
-    assert elapsed >= 2/60
\ No newline at end of file
+    assert elapsed >= 2/60
+
+def test_token_bucket_allows_burst():
+    bucket = TokenBucket(calls_per_minute=60, burst=5)
+
+    start_time = time.time()
+    for _ in range(5):
+        bucket.acquire()
+    elapsed = time.time() - start_time
+
+    assert elapsed < 0.5  # The whole burst goes through without waiting
+
+def test_token_bucket_async_acquire():
+    bucket = TokenBucket(calls_per_minute=600, burst=1)
+
+    async def run():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+
+    start_time = time.time()
+    asyncio.run(run())
+    elapsed = time.time() - start_time
+
+    assert elapsed >= 2/10  # 3 calls at 10 calls/second
+
+def test_host_limiter_keeps_separate_buckets():
+    limiter = HostRateLimiter({'tradingview.com': (60, 2), 'api.openai.com': (120, 4)})
+
+    assert limiter.bucket('https://www.tradingview.com/script/x/') is limiter.bucket('tradingview.com')
+    assert limiter.bucket('api.openai.com').capacity == 4
+    assert limiter.bucket('tradingview.com').capacity == 2
+
+def test_host_limiter_shrinks_rate_on_429():
+    limiter = HostRateLimiter({'tradingview.com': (60, 1)})
+    bucket = limiter.bucket('tradingview.com')
+
+    limiter.record_response('https://www.tradingview.com/script/x/', 429, '0')
+    assert bucket.calls_per_minute == 30
+
+    limiter.record_response('https://www.tradingview.com/script/x/', 200)
+    assert 30 < bucket.calls_per_minute <= 60
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after('garbage') is None
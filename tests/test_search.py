@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database.models import Base, Indicator
+from database.search import fts5_query, tsquery
+from database.summary import IndicatorSummary
+from database.utils import IndicatorQueries
+from tradingview_analyzer import TradingViewScraper
+
+def test_queries_use_prefix_terms():
+    assert fts5_query("RSI  div-ergence!") == '"RSI"* "div"* "ergence"*'
+    assert tsquery("RSI div") == 'rsi:* & div:*'
+    # Operators and quotes cannot leak into the MATCH syntax
+    assert fts5_query('" OR *') == '"OR"*'
+    assert fts5_query("?!") is None
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+def test_search_indicators_ranks_name_matches_first(session):
+    session.add_all([
+        Indicator(url="u1", name="Volume profile", description="Uses the RSI as a filter"),
+        Indicator(url="u2", name="RSI Divergence", description="Finds divergences"),
+        Indicator(url="u3", name="MACD", description="Moving averages"),
+    ])
+    session.commit()
+    queries = IndicatorQueries(session)
+
+    assert [i.url for i in queries.search_indicators("rsi")] == ["u2", "u1"]
+    assert [i.url for i in queries.search_indicators("diverg")] == ["u2"]
+    assert [i.url for i in queries.search_indicators("rsi", limit=1)] == ["u2"]
+
+    # Kept in sync on update and delete
+    session.query(Indicator).filter_by(url="u3").update({'name': "MACD with RSI"})
+    session.query(Indicator).filter_by(url="u1").delete()
+    session.commit()
+    assert [i.url for i in queries.search_indicators("rsi")] == ["u2", "u3"]
+
+def test_candidate_cap_is_opt_in_and_filters_apply_before_it(session, monkeypatch):
+    # The best match is the oldest row; newer ones mention RSI only in passing
+    session.add(Indicator(url="best", name="RSI", description="RSI", profitability_rating=9))
+    session.add_all([Indicator(url=f"u{i}", name="Trend", description="Uses an RSI filter", profitability_rating=2)
+                     for i in range(5)])
+    session.commit()
+    queries = IndicatorQueries(session)
+
+    assert queries.search_indicators("rsi", limit=1)[0].url == "best"
+
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 3)
+    # Only the 3 newest matches are ranked, so the best one is left out...
+    assert "best" not in [i.url for i in queries.search_indicators("rsi")]
+    # ...but filters narrow the candidates before the cap, not after
+    assert [i.url for i in queries.search_indicators("rsi", min_profitability=5)] == ["best"]
+
+def test_scraper_table_is_indexed_on_upsert(tmp_path):
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        url = "https://www.tradingview.com/script/a/"
+        data = {'url': url, 'name': 'Supertrend', 'description': 'Trend filter', 'comments': []}
+        scraper.save_to_db(scraper.analyze_indicator(data))
+        scraper.flush()
+        summary = IndicatorSummary(scraper.db_path)
+        assert summary.search("super") == [url]
+
+        scraper.save_to_db(scraper.analyze_indicator({**data, 'name': 'Half trend'}))
+        scraper.flush()
+        assert summary.search("super") == []
+        assert summary.search("half tr") == [url]
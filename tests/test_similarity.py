@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Indicator
+from database.similarity import SimilarityIndex, similarity_dir
+from database.summary import IndicatorSummary
+from database.utils import IndicatorQueries
+from tradingview_analyzer import TradingViewScraper
+
+TEXTS = {
+    1: "RSI divergence finds bullish and bearish divergences between price and RSI",
+    2: "Hidden RSI divergence detector with alerts",
+    3: "Volume weighted average price bands for intraday trading",
+    4: "Anchored VWAP with standard deviation bands",
+}
+
+@pytest.fixture
+def index(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "similarity"), dimensions=256)
+    index.add_many(TEXTS.items())
+    return index
+
+def test_similar_ranks_related_texts_first(index):
+    assert [neighbour for neighbour, _ in index.similar(1, 1)] == [2]
+    assert [neighbour for neighbour, _ in index.similar(4, 1)] == [3]
+    assert [neighbour for neighbour, _ in index.query("vwap bands", 2)] == [4, 3]
+    assert index.similar(99) == []
+
+def test_updates_are_incremental_and_shared_through_the_files(index, tmp_path):
+    reader = SimilarityIndex(str(tmp_path / "similarity"), dimensions=256)
+    assert len(reader) == 4
+    vwap_score = dict(reader.similar(4, 3))[3]
+
+    index.add(5, "RSI divergence scanner for many symbols")
+    index.add(3, "Ichimoku cloud")  # Replaced in place
+    assert len(index) == 5
+    assert len(reader) == 5
+    assert reader.similar(5, 2)[0][0] in (1, 2)
+    assert dict(reader.similar(4, 4))[3] < vwap_score
+
+def test_replacing_a_vector_updates_document_frequencies(index, tmp_path):
+    fresh = SimilarityIndex(str(tmp_path / "fresh"), dimensions=256)
+    fresh.add_many({**TEXTS, 3: "Ichimoku cloud"}.items())
+
+    index.add_many([(3, "Ichimoku cloud"), (4, TEXTS[4])])
+
+    assert (index._df == fresh._df).all()
+    assert index.similar(4, 3) == fresh.similar(4, 3)
+
+def test_writers_sharing_the_files_keep_document_frequencies(index, tmp_path):
+    other = SimilarityIndex(str(tmp_path / "similarity"), dimensions=256)
+    index.add(3, "Ichimoku cloud")  # In place: the id file does not grow
+    other.add(5, "RSI divergence scanner for many symbols")
+    index.add(6, "Supertrend")
+
+    reader = SimilarityIndex(str(tmp_path / "similarity"), dimensions=256)
+    fresh = SimilarityIndex(str(tmp_path / "fresh"), dimensions=256)
+    fresh.add_many({**TEXTS, 3: "Ichimoku cloud", 5: "RSI divergence scanner for many symbols",
+                    6: "Supertrend"}.items())
+    assert sorted(reader._ids) == [1, 2, 3, 4, 5, 6]
+    assert (reader._df == fresh._df).all()
+
+def test_dimension_change_starts_a_new_index(index, tmp_path):
+    assert len(SimilarityIndex(str(tmp_path / "similarity"), dimensions=128)) == 0
+
+def test_get_similar_indicators_works_on_sqlite(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all(Indicator(id=i, url=f"u{i}", name=text[:20], description=text) for i, text in TEXTS.items())
+        session.commit()
+        queries = IndicatorQueries(session, SimilarityIndex(str(tmp_path / "similarity")))
+
+        assert [indicator.id for indicator in queries.get_similar_indicators(1, limit=1)] == [2]
+        assert queries.index_missing() == 0
+
+def test_scraper_indexes_rows_as_it_writes(tmp_path):
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        for i, text in TEXTS.items():
+            scraper.save_to_db(scraper.analyze_indicator(
+                {'url': f"https://www.tradingview.com/script/{i}/", 'name': text[:20], 'description': text,
+                 'comments': []}
+            ))
+        scraper.flush()
+        assert len(SimilarityIndex(similarity_dir(scraper.db_path))) == 4
+
+        summary = IndicatorSummary(scraper.db_path)
+        first, second = summary.rows(["https://www.tradingview.com/script/1/",
+                                      "https://www.tradingview.com/script/2/"])['id']
+        assert summary.similar(first, 1)[0][0] == second
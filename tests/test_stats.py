@@ -0,0 +1,89 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.connection import get_connection
+from database.models import Base, Indicator
+from database.stats import ensure_sqlite_stats
+from database.summary import IndicatorSummary
+from database.utils import IndicatorQueries
+from tradingview_analyzer import TradingViewScraper
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+def test_stats_table_follows_inserts_updates_and_deletes(session):
+    now = datetime.now()
+    session.add_all([
+        Indicator(url="u1", name="A", profitability_rating=8, reliability_rating=6, created_at=now),
+        Indicator(url="u2", name="B", profitability_rating=4, reliability_rating=None, created_at=now),
+        Indicator(url="u3", name="C", profitability_rating=6, reliability_rating=2, created_at=datetime(2020, 1, 1)),
+    ])
+    session.commit()
+    queries = IndicatorQueries(session)
+
+    stats = queries.get_statistics()
+    assert stats['total_indicators'] == 3
+    assert stats['avg_profitability'] == pytest.approx(6.0)
+    assert stats['avg_reliability'] == pytest.approx(4.0)  # The missing rating is left out, as AVG() does
+    assert stats['recent_additions'] == 2
+    assert stats['daily'] == {now.date().isoformat(): 2, '2020-01-01': 1}
+
+    session.query(Indicator).filter_by(url="u2").update({'reliability_rating': 10})
+    session.query(Indicator).filter_by(url="u3").delete()
+    session.commit()
+    exact = queries.get_statistics(exact=True)
+    stats = queries.get_statistics()
+    assert {key: stats[key] for key in exact} == pytest.approx(exact)
+    assert stats['daily'] == {now.date().isoformat(): 2}
+
+    queries.recompute_statistics()
+    assert queries.get_statistics()['avg_reliability'] == pytest.approx(8.0)
+
+def test_dashboard_statistics_count_additions_per_day(tmp_path):
+    def save(name, description=''):
+        scraper.save_to_db(scraper.analyze_indicator(
+            {'url': f"https://www.tradingview.com/script/{name}/", 'name': name, 'description': description,
+             'comments': []}
+        ))
+        scraper.flush()
+
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        for name in ("a", "b"):
+            save(name)
+        stats = IndicatorSummary(scraper.db_path).statistics()
+        assert stats['total_indicators'] == 2
+        assert stats['daily'] == {date.today().isoformat(): 2}
+
+        conn = get_connection(scraper.db_path)
+        with conn:
+            conn.execute("UPDATE indicators SET created_at = '2020-01-01 00:00:00' WHERE name = 'a'")
+        save("a", "Re-analyzed")  # Moves analyzed_date, not the day it was added
+        stats = IndicatorSummary(scraper.db_path).statistics()
+        assert stats['daily'] == {'2020-01-01': 1, date.today().isoformat(): 1}
+        assert stats['recent_additions'] == 1
+
+def test_stats_kept_on_analyzed_date_are_rebuilt(tmp_path):
+    db_path = str(tmp_path / "indicators.db")
+    with TradingViewScraper(db_path=db_path, html_cache=False) as scraper:
+        scraper.save_to_db(scraper.analyze_indicator(
+            {'url': "https://www.tradingview.com/script/a/", 'name': 'a', 'description': '', 'comments': []}
+        ))
+        scraper.flush()
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute("DROP TABLE indicator_daily_stats")
+            for name in ('insert', 'delete', 'update'):
+                conn.execute(f"DROP TRIGGER indicators_stats_{name}")
+            ensure_sqlite_stats(conn, 'analyzed_date')
+            conn.execute("UPDATE indicators SET created_at = '2020-01-01 00:00:00'")
+
+    TradingViewScraper._initialized_paths.discard(db_path)
+    with TradingViewScraper(db_path=db_path, html_cache=False) as scraper:
+        assert IndicatorSummary(db_path).statistics()['daily'] == {'2020-01-01': 1}
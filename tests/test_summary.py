@@ -0,0 +1,41 @@
+import pytest
+
+from database.summary import DETAIL_COLUMNS, IndicatorSummary
+from tradingview_analyzer import TradingViewScraper
+
+@pytest.fixture
+def scraper(tmp_path):
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        yield scraper
+
+def save(scraper, url, **data):
+    scraper.save_to_db(scraper.analyze_indicator(
+        {'url': url, 'name': url[-2], 'description': 'Test', 'comments': [], **data}
+    ))
+    scraper.flush()
+
+def test_details_loads_text_for_one_row(scraper):
+    save(scraper, "https://www.tradingview.com/script/a/", description="Long text")
+    details = IndicatorSummary(scraper.db_path).details("https://www.tradingview.com/script/a/")
+    assert set(details) == set(DETAIL_COLUMNS)
+    assert details['description'] == "Long text"
+    assert IndicatorSummary(scraper.db_path).details("https://www.tradingview.com/script/missing/") is None
+
+def test_targeted_lookups_and_rating_counts(scraper):
+    for name in "abc":
+        save(scraper, f"https://www.tradingview.com/script/{name}/")
+    summary = IndicatorSummary(scraper.db_path)
+
+    urls = ["https://www.tradingview.com/script/c/", "https://www.tradingview.com/script/missing/",
+            "https://www.tradingview.com/script/a/"]
+    rows = summary.rows(urls)
+    assert list(rows['url']) == [urls[0], urls[2]]
+    assert summary.names(list(rows['id'])) == dict(zip(rows['id'], rows['name']))
+
+    distribution = summary.rating_distribution()
+    assert list(distribution.index) == list(range(11))
+    assert distribution.sum().tolist() == [3, 3]
+
+    version = summary.version()
+    save(scraper, "https://www.tradingview.com/script/a/", description="Edited")
+    assert summary.version() != version
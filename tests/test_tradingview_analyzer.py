@@ -0,0 +1,282 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import pytest
+from scraper.analyzer import IndicatorAnalyzer
+from scraper.html_cache import HtmlCache
+from scraper.http_client import FetchResult, HttpClient
+from scraper.rate_limiter import HostRateLimiter
+from tradingview_analyzer import TradingViewScraper
+
+@pytest.fixture
+def scraper(tmp_path):
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False) as scraper:
+        yield scraper
+
+def make_analysis(scraper, url, **data):
+    return scraper.analyze_indicator({'url': url, 'name': 'Test', 'description': 'Test', 'comments': [], **data})
+
+def test_save_and_read_back(scraper):
+    scraper.save_to_db(make_analysis(scraper, "https://www.tradingview.com/script/a/", etag='"e1"'))
+    scraper.flush()
+
+    df = scraper.get_all_indicators_df()
+    assert list(df['url']) == ["https://www.tradingview.com/script/a/"]
+    assert scraper.get_validators("https://www.tradingview.com/script/a/") == ('"e1"', None)
+
+def test_upsert_keeps_id_and_skips_unchanged_rows(scraper):
+    url = "https://www.tradingview.com/script/a/"
+    scraper.save_to_db(make_analysis(scraper, url))
+    scraper.flush()
+    original_id = scraper.get_all_indicators_df()['id'][0]
+
+    scraper.save_to_db(make_analysis(scraper, url))
+    scraper.save_to_db(make_analysis(scraper, "https://www.tradingview.com/script/b/"))
+    scraper.flush()
+    assert scraper.writer.totals == {'inserted': 2, 'updated': 0, 'unchanged': 1}
+
+    scraper.save_to_db(make_analysis(scraper, url, description="Edited description"))
+    scraper.flush()
+    df = scraper.get_all_indicators_df().set_index('url')
+    assert scraper.writer.totals['updated'] == 1
+    assert df.loc[url, 'id'] == original_id
+    assert df.loc[url, 'description'] == "Edited description"
+
+def test_unchanged_row_still_refreshes_validators(scraper):
+    url = "https://www.tradingview.com/script/a/"
+    scraper.save_to_db(make_analysis(scraper, url, etag='"old"'))
+    scraper.flush()
+
+    scraper.save_to_db(make_analysis(scraper, url, etag='"new"'))
+    scraper.flush()
+
+    assert scraper.writer.totals['unchanged'] == 1
+    assert scraper.get_validators(url) == ('"new"', None)
+
+def test_needs_analysis_uses_stored_fingerprint(scraper):
+    data = {'url': "https://www.tradingview.com/script/a/", 'name': 'Test',
+            'description': 'Test', 'comments': ['Nice']}
+    assert scraper.needs_analysis(data)
+
+    scraper.save_to_db(scraper.analyze_indicator(data))
+    scraper.flush()
+    assert not scraper.needs_analysis(data)
+    assert scraper.needs_analysis({**data, 'comments': ['Nice', 'Repaints']})
+
+    scraper.force = True
+    assert scraper.needs_analysis(data)
+
+def test_placeholder_analysis_is_stale_for_real_analyzer(scraper):
+    data = {'url': "https://www.tradingview.com/script/a/", 'name': 'Test', 'description': 'Test', 'comments': []}
+    scraper.save_to_db(scraper.analyze_indicator(data))
+    scraper.flush()
+
+    scraper.analyzer = IndicatorAnalyzer(api_key="sk-dummy-key-for-testing", cache=None)
+    assert not scraper.needs_analysis(data)
+
+    scraper.analyzer = IndicatorAnalyzer(api_key="sk-real", cache=None)
+    assert scraper.needs_analysis(data)
+
+class RotatingEtagHandler(BaseHTTPRequestHandler):
+    """Serves the same page; the ETag changes whenever the test sets a new one"""
+    etag = '"v1"'
+    page = b"<html><h1 class='tv-chart-view__title-name'>Test Indicator</h1></html>"
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(self.page)))
+        self.end_headers()
+        self.wfile.write(self.page)
+
+    def log_message(self, *args):
+        pass
+
+def test_skipped_analysis_stores_rotated_validators(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RotatingEtagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/script/a/"
+    limiter = HostRateLimiter(default_calls_per_minute=60000, default_burst=10)
+    http = HttpClient(pool_size=1, timeout=5, limiter=limiter)
+    try:
+        with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), limiter=limiter, http_client=http,
+                                html_cache=False) as scraper:
+            data = scraper.scrape_indicator(url)
+            scraper.save_to_db(scraper.analyze_indicator(data))
+            scraper.flush()
+
+            RotatingEtagHandler.etag = '"v2"'
+            data = scraper.scrape_indicator(url)
+            assert not scraper.needs_analysis(data)
+            assert scraper.get_validators(url) == ('"v2"', None)
+
+            assert scraper.fetch_page(url).not_modified
+    finally:
+        server.shutdown()
+        RotatingEtagHandler.etag = '"v1"'
+
+class ConditionalStub:
+    """HTTP client answering 304 to any conditional GET and 200 otherwise"""
+    page = "<html><h1 class='title'>Test Indicator</h1></html>"
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, etag=None, last_modified=None):
+        self.calls.append(etag)
+        if etag:
+            return FetchResult(url=url, status_code=304)
+        return FetchResult(url=url, status_code=200, html=self.page, etag='"v1"')
+
+    def close(self):
+        pass
+
+def test_not_modified_pages_are_reanalyzed_when_forced_or_stale(tmp_path, monkeypatch):
+    url = "https://www.tradingview.com/script/a/"
+    http = ConditionalStub()
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), http_client=http, html_cache=False,
+                            limiter=HostRateLimiter(default_calls_per_minute=60000, default_burst=10)) as scraper:
+        scraper.save_to_db(scraper.analyze_indicator(scraper.scrape_indicator(url)))
+        scraper.flush()
+        # Unchanged page, current analysis: skipped on the 304
+        assert scraper.scrape_indicator(url) is None
+
+        scraper.force = True
+        assert scraper.scrape_indicator(url)['name'] == "Test Indicator"
+        assert http.calls[-1] is None
+        scraper.force = False
+
+        # A new prompt version makes the stored analysis stale: the 304 is followed by a full GET
+        monkeypatch.setattr("tradingview_analyzer.PROMPT_VERSION", "test")
+        data = scraper.scrape_indicator(url)
+        assert http.calls[-2:] == ['"v1"', None]
+        assert scraper.needs_analysis(data)
+
+def test_not_modified_page_is_read_from_html_cache(tmp_path, monkeypatch):
+    url = "https://www.tradingview.com/script/a/"
+    http = ConditionalStub()
+    cache = HtmlCache(cache_dir=str(tmp_path / "html"), ttl=0.001, compression='gzip')
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), http_client=http, html_cache=cache,
+                            limiter=HostRateLimiter(default_calls_per_minute=60000, default_burst=10)) as scraper:
+        scraper.save_to_db(scraper.analyze_indicator(scraper.scrape_indicator(url)))
+        scraper.flush()
+        time.sleep(0.01)
+
+        monkeypatch.setattr("tradingview_analyzer.PROMPT_VERSION", "test")
+        assert scraper.scrape_indicator(url)['name'] == "Test Indicator"
+        assert http.calls == [None, '"v1"']
+
+def test_llm_analyzer_results_are_saved(tmp_path):
+    analyzer = IndicatorAnalyzer(api_key="sk-dummy-key-for-testing", cache=None)
+    data = {'url': "https://www.tradingview.com/script/a/", 'name': 'Test',
+            'description': 'Test', 'comments': []}
+
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=False, analyzer=analyzer) as scraper:
+        scraper.save_to_db(scraper.analyze_indicator(data))
+        scraper.flush()
+
+        row = scraper.get_all_indicators_df().iloc[0]
+        assert row['functionality'] == "This is a mock analysis for testing purposes."
+        assert not scraper.needs_analysis(data)
+
+def test_export_then_import_round_trip(scraper, tmp_path):
+    for name in 'abc':
+        scraper.save_to_db(make_analysis(scraper, f"https://www.tradingview.com/script/{name}/"))
+    scraper.flush()
+    export_path = str(tmp_path / "export.csv")
+    assert scraper.export_to_csv(export_path)[0]
+
+    exported = pd.read_csv(export_path)
+    broken = exported.iloc[[0]].assign(url="not-a-url", profitability_rating=11)
+    pd.concat([exported, broken]).to_csv(export_path, index=False)
+    with TradingViewScraper(db_path=str(tmp_path / "copy.db"), html_cache=False) as copy:
+        ok, message = copy.import_from_csv(export_path)
+        assert ok, message
+        assert "skipped 1 invalid rows" in message
+        df = copy.get_all_indicators_df()
+
+    assert sorted(df['url']) == [f"https://www.tradingview.com/script/{name}/" for name in 'abc']
+    assert set(df['profitability_rating']) == {7}
+
+def test_crawl_resumes_with_unvisited_urls(tmp_path):
+    from scraper.html_cache import HtmlCache
+    cache = HtmlCache(cache_dir=str(tmp_path / "html"))
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(5)]
+    for url in urls[:4]:
+        cache.put(url, f"<h1 class='title'>{url}</h1>")
+
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=cache, offline=True) as scraper:
+        scraper.frontier.add_many(urls)
+        first = scraper.crawl(limit=2)
+        second = scraper.crawl()
+
+        assert (first['crawled'], first['inserted']) == (2, 2)
+        assert (second['crawled'], second['inserted']) == (3, 2)
+        assert scraper.frontier.counts() == {'done': 4, 'failed': 1}
+        assert scraper.crawl()['crawled'] == 1  # Only the failed URL is retried
+
+def test_recrawl_budget_does_not_cap_new_urls(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.settings.RECRAWL_ADAPTIVE", True)
+    monkeypatch.setattr("config.settings.RECRAWL_BUDGET", 2)
+    monkeypatch.setattr("config.settings.RECRAWL_MIN_EXPECTED_CHANGES", 0)
+    cache = HtmlCache(cache_dir=str(tmp_path / "html"))
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(8)]
+    for url in urls:
+        cache.put(url, f"<h1 class='title'>{url}</h1>")
+
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=cache, offline=True) as scraper:
+        scraper.frontier.add_many(urls[:5])
+        assert scraper.crawl()['crawled'] == 5
+
+        # Every fetched URL is due again, but only two of them get recrawled
+        scraper.frontier.add_many(urls[5:])
+        fetched = []
+        fetch_page = scraper.fetch_page
+        scraper.fetch_page = lambda url: fetched.append(url) or fetch_page(url)
+        assert scraper.crawl()['crawled'] == 5
+        assert fetched[:3] == urls[5:]
+        assert len(set(fetched[3:]) & set(urls[:5])) == 2
+
+def test_add_url_uses_frontier(scraper):
+    assert scraper.add_url("https://www.tradingview.com/script/a/") == (True, "URL added successfully")
+    assert scraper.add_url("https://www.tradingview.com/script/a") == (False, "This URL already exists in the list")
+    assert not scraper.add_url("https://example.com/")[0]
+
+def test_resume_continues_interrupted_job(tmp_path):
+    from scraper.html_cache import HtmlCache
+    cache = HtmlCache(cache_dir=str(tmp_path / "html"))
+    urls = [f"https://www.tradingview.com/script/{i}/" for i in range(5)]
+    for url in urls:
+        cache.put(url, f"<h1 class='title'>{url}</h1>")
+
+    with TradingViewScraper(db_path=str(tmp_path / "indicators.db"), html_cache=cache, offline=True) as scraper:
+        scraper.frontier.add_many(urls)
+        analyze = scraper.analyze_indicator
+
+        def crash_on_third(data):
+            if data['url'] == urls[2]:
+                raise KeyboardInterrupt
+            return analyze(data)
+
+        scraper.analyze_indicator = crash_on_third
+        with pytest.raises(KeyboardInterrupt):
+            scraper.crawl()
+        job_id = scraper.jobs.latest_unfinished()['id']
+        assert scraper.jobs.summary(job_id) == {'saved': 2, 'parsed': 1, 'pending': 2}
+
+        scraper.analyze_indicator = analyze
+        fetched = []
+        fetch_page = scraper.fetch_page
+        scraper.fetch_page = lambda url: fetched.append(url) or fetch_page(url)
+        stats = scraper.resume()
+
+        assert stats['job_id'] == job_id
+        assert fetched == urls[2:]
+        assert scraper.jobs.summary(job_id) == {'saved': 5}
+        assert scraper.jobs.get(job_id)['status'] == 'completed'
+        assert scraper.resume() is None
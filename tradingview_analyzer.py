@@ -1,26 +1,92 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import sqlite3
-from datetime import datetime
-import csv
+from datetime import datetime, timedelta
 import os
+import argparse
+import asyncio
+import json
+from collections import Counter
 from config import settings
+from database.connection import BatchWriter, add_missing_columns, get_connection
+from database.frontier import UrlFrontier
+from database.jobs import (
+    ANALYZED, COMPLETED, FAILED, FETCHED, INTERRUPTED, PARSED, RUNNING, SAVED, SKIPPED, CrawlJobStore
+)
+from database.search import ensure_sqlite_search
+from database.similarity import SimilarityIndex, index_rows, similarity_dir
+from database.stats import ensure_sqlite_stats
+from scraper.data_validator import frame_to_records, validate_analysis_columns
+from scraper.discovery import DiscoveryCrawler
+from scraper.extractors import get_extractor
+from scraper.analyzer import PROMPT_VERSION, IndicatorAnalyzer
+from scraper.fingerprint import PLACEHOLDER_MODEL, content_hash, fingerprint_for_content
+from scraper.html_cache import HtmlCache
+from scraper.http_client import FetchResult, HttpClient
+from scraper.pipeline import ScrapePipeline
+from scraper.rate_limiter import get_host_limiter
+from scraper.urls import is_script_url
+
+# Columns written by save_to_db, url first as the upsert key
+INDICATOR_COLUMNS = (
+    'url', 'name', 'description', 'functionality', 'usage_guidelines', 'user_feedback',
+    'additional_insights', 'profitability_rating', 'reliability_rating', 'analyzed_date',
+    'etag', 'last_modified', 'content_hash', 'analysis_fingerprint'
+)
+
+class FetchError(Exception):
+    """A page could not be fetched; the message says why"""
 
 class TradingViewScraper:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, limiter=None, http_client=None, html_cache=None, offline=None, force=False,
+                 analyzer=None):
         # Use the provided db_path or default to the one in settings
         self.db_path = db_path or os.path.join(settings.DATA_DIR, "indicators.db")
+        # Shared per-host limiter so every scraper instance spends one request budget
+        self.limiter = limiter or get_host_limiter()
+        self.http = http_client or HttpClient(limiter=self.limiter)
+        # Offline mode replays pages from the HTML cache and never touches the network
+        self.offline = settings.HTML_CACHE_OFFLINE if offline is None else offline
+        if html_cache is None and (settings.HTML_CACHE_ENABLED or self.offline):
+            html_cache = HtmlCache()
+        self.cache = html_cache
+        self.extractor = get_extractor(settings.EXTRACTOR_BACKEND)
+        # Re-analyze even when the stored fingerprint says nothing changed
+        self.force = force
+        # IndicatorAnalyzer for real LLM analysis; None keeps the placeholder analysis
+        self.analyzer = analyzer
+        self._writer = None
+        self._similarity = None
         self.setup_database()
+        # Which URLs to crawl, when they were last fetched and how they went
+        self.frontier = UrlFrontier(self.db_path)
+        # Crawl job whose per-URL states are being recorded, if any
+        self.jobs = CrawlJobStore(self.db_path)
+        self.job_id = None
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        pass
+        self.close()
+
+    def close(self):
+        """Write out buffered rows and release network and DB resources"""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        self.jobs.close()
+        self.http.close()
+        if self.analyzer:
+            self.analyzer.close()
+
+    # Database files whose schema is already set up in this process
+    _initialized_paths = set()
 
     def setup_database(self):
-        with sqlite3.connect(self.db_path) as conn:
+        if self.db_path in self._initialized_paths:
+            return
+        conn = get_connection(self.db_path)
+        with conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS indicators (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -36,128 +102,307 @@ class TradingViewScraper:
                     analyzed_date TIMESTAMP
                 )
             """)
+            add_missing_columns(conn, 'indicators', {
+                'etag': 'TEXT',
+                'last_modified': 'TEXT',
+                'content_hash': 'TEXT',
+                'analysis_fingerprint': 'TEXT',
+                'updated_at': 'TIMESTAMP',
+                'created_at': 'TIMESTAMP',
+            })
+            # Rows from before created_at: their first analysis is the best estimate left
+            conn.execute("UPDATE indicators SET created_at = COALESCE(analyzed_date, updated_at) "
+                         "WHERE created_at IS NULL")
+            # Lets the dashboard's version() find the newest write from the index
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_indicators_updated_at ON indicators (updated_at)")
+            ensure_sqlite_search(conn)
+            # Dashboard totals, kept per day added by triggers; unlike
+            # analyzed_date, created_at does not move when a row is re-analyzed
+            ensure_sqlite_stats(conn, 'created_at')
+        self._initialized_paths.add(self.db_path)
 
     def scrape_indicator(self, url):
-        # More realistic headers to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Referer': 'https://www.tradingview.com/',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'same-origin',
-            'Sec-Fetch-User': '?1',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
-        }
+        result = self.fetch_page(url)
+        # Unchanged pages whose analysis is current skip parsing and analysis entirely
+        if result is None or result.not_modified:
+            return None
+        data = self.parse_page(result.html, url)
+        if data:
+            data.update(result.validators)
+        return data
 
-        # Add a random delay to avoid rate limiting (between 1 and 3 seconds)
-        import random
-        import time
-        delay = random.uniform(1, 3)
-        time.sleep(delay)
+    def fetch_page(self, url):
+        """Fetch a script page from the HTML cache or with a conditional GET.
 
+        Returns a FetchResult (status 304 when the page is unchanged since the
+        stored ETag/Last-Modified and its stored analysis is current), or None
+        on failure. Only network requests wait on the rate limiter. The
+        outcome is recorded in the URL frontier.
+        """
         try:
-            # Make the request
-            response = requests.get(url, headers=headers, timeout=10)
-
-            # Check if the request was successful
-            if response.status_code != 200:
-                print(f"Error scraping {url}: HTTP status code {response.status_code}")
-                return None
-
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Extract relevant data with better error handling
-            try:
-                name_element = soup.find('h1', {'class': 'title'})
-                name = name_element.text.strip() if name_element else "Unknown Indicator"
-            except Exception as e:
-                print(f"Error extracting name from {url}: {str(e)}")
-                name = "Unknown Indicator"
-
-            try:
-                description_element = soup.find('div', {'class': 'description'})
-                description = description_element.text.strip() if description_element else "No description available"
-            except Exception as e:
-                print(f"Error extracting description from {url}: {str(e)}")
-                description = "No description available"
-
-            try:
-                comments = soup.find_all('div', {'class': 'comment'})
-                comment_texts = [c.text.strip() for c in comments] if comments else []
-            except Exception as e:
-                print(f"Error extracting comments from {url}: {str(e)}")
-                comment_texts = []
-
-            # Compile data for analysis
-            data = {
-                'name': name,
-                'description': description,
-                'comments': comment_texts,
-                'url': url
-            }
-
-            print(f"Successfully scraped: {name}")
-            return data
+            result = self._fetch_page(url)
+        except FetchError as e:
+            print(e)
+            self.frontier.mark_failed(url, str(e))
+            self.track(url, FAILED, str(e))
+            return None
+        self.frontier.mark_fetched(url)
+        self.track(url, SKIPPED if result.not_modified else FETCHED)
+        return result
 
+    def _fetch_page(self, url):
+        if self.cache:
+            cached = self.cache.get(url, allow_stale=self.offline)
+            if cached:
+                return FetchResult(
+                    url=url, status_code=200, html=cached.html,
+                    etag=cached.etag, last_modified=cached.last_modified
+                )
+            if self.offline:
+                raise FetchError(f"Not in HTML cache (offline mode): {url}")
+
+        # --force re-analyzes everything, so it needs every page's content
+        etag, last_modified = (None, None) if self.force else self.get_validators(url)
+        result = self._request(url, etag, last_modified)
+
+        if result.not_modified:
+            print(f"Not modified since last scrape: {url}")
+            if self.cache:
+                self.cache.touch(url)
+            if self.force or not self.analysis_current(url):
+                # Same page, but the prompt or model changed: it still needs analysis
+                return self._unchanged_page(url, result)
+            return result
+
+        # Check if the request was successful
+        if result.status_code != 200:
+            raise FetchError(f"Error scraping {url}: HTTP status code {result.status_code}")
+
+        if self.cache:
+            self.cache.put(url, result.html, result.etag, result.last_modified)
+        return result
+
+    def _request(self, url, etag=None, last_modified=None):
+        self.limiter.acquire(url)
+        try:
+            # Make the request
+            return self.http.get(url, etag=etag, last_modified=last_modified)
         except requests.exceptions.Timeout:
-            print(f"Timeout error scraping {url}")
-            return None
+            raise FetchError(f"Timeout error scraping {url}")
         except requests.exceptions.ConnectionError:
-            print(f"Connection error scraping {url}")
-            return None
+            raise FetchError(f"Connection error scraping {url}")
+        except Exception as e:
+            raise FetchError(f"Error scraping {url}: {str(e)}")
+
+    def _unchanged_page(self, url, not_modified):
+        """Content of a page that answered 304: the cached HTML, else one unconditional GET"""
+        cached = self.cache.get(url, allow_stale=True) if self.cache else None
+        if cached:
+            return FetchResult(url=url, status_code=200, html=cached.html,
+                               etag=not_modified.etag or cached.etag,
+                               last_modified=not_modified.last_modified or cached.last_modified)
+        result = self._request(url)
+        if result.not_modified:
+            return result
+        if result.status_code != 200:
+            raise FetchError(f"Error scraping {url}: HTTP status code {result.status_code}")
+        if self.cache:
+            self.cache.put(url, result.html, result.etag, result.last_modified)
+        return result
+
+    def get_validators(self, url):
+        """Stored ETag and Last-Modified for a URL, (None, None) if never saved"""
+        row = get_connection(self.db_path).execute(
+            "SELECT etag, last_modified FROM indicators WHERE url = ?", (url,)
+        ).fetchone()
+        return row if row else (None, None)
+
+    def parse_page(self, html, url):
+        """Extract name, description and comments from a script page"""
+        try:
+            data = self.extractor.extract(html, url)
+            print(f"Successfully scraped: {data['name']}")
+            self.observe(data)
+            return data
+
         except Exception as e:
             print(f"Error scraping {url}: {str(e)}")
+            self.track(url, FAILED, str(e))
             return None
 
-    def process_urls_from_csv(self, csv_path):
-        with open(csv_path, 'r') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header
-            for row in reader:
-                url = row[0]
-                data = self.scrape_indicator(url)
-                if data:
-                    analysis = self.analyze_indicator(data)
+    def process_urls_from_csv(self, csv_path, pipeline=False, **pipeline_options):
+        """Queue the CSV's URLs in the frontier, then crawl whatever is due.
+
+        URLs already in the frontier are not queued twice, and ones fetched
+        recently are not crawled again; see crawl() for the options.
+        """
+        queued = self.frontier.import_csv(csv_path)
+        stats = self.crawl(pipeline=pipeline, **pipeline_options)
+        stats['queued'] = queued
+        return stats
+
+    def crawl(self, pipeline=False, limit=None, stale_after=None, job_id=None, **pipeline_options):
+        """Scrape, analyze and save the frontier URLs that are due, highest priority first.
+
+        The run is recorded as a crawl job with the state of every URL in
+        it (see database/jobs.py). URLs are taken in batches and each is
+        visited at most once per job. Passing the job_id of an unfinished job
+        continues it: first the URLs it enrolled but never finished, then the
+        rest of the frontier. Stages those URLs had already passed are cheap
+        to redo, because pages and LLM responses are served from their caches.
+
+        The default path handles one URL at a time. With pipeline=True the
+        stages run concurrently through ScrapePipeline, which takes any
+        extra keyword options (worker counts, parse_processes, ...).
+        Returns run statistics including inserted/updated/unchanged rows.
+        """
+        if job_id is None:
+            job_id = self.jobs.create({
+                'pipeline': pipeline, 'limit': limit,
+                'stale_after_hours': stale_after.total_seconds() / 3600 if stale_after else None,
+                **pipeline_options
+            })
+        job = self.jobs.get(job_id)
+        self.jobs.set_status(job_id, RUNNING)
+        self.job_id = job_id
+
+        totals_before = dict(self.writer.totals)
+        tokens_saved_before = self.analyzer.budget_stats().get('tokens_saved', 0) if self.analyzer else 0
+        stats = Counter()
+        crawled = self.jobs.item_count(job_id)
+        status = INTERRUPTED
+        try:
+            # A resumed job first finishes what it had already enrolled
+            leftover = self.jobs.unfinished_urls(job_id)
+            for i in range(0, len(leftover), settings.FRONTIER_BATCH_SIZE):
+                stats.update(self._process_urls(leftover[i:i + settings.FRONTIER_BATCH_SIZE], pipeline,
+                                                **pipeline_options))
+
+            if limit is None and stale_after is None and settings.RECRAWL_ADAPTIVE and settings.RECRAWL_BUDGET:
+                # Adaptive recrawls spend a fixed fetch budget per run. URLs
+                # never fetched (or failed) don't count against it: they all
+                # go first, then up to RECRAWL_BUDGET fetched URLs are recrawled
+                crawled += self._crawl_batches(job, None, stale_after, stats, pipeline,
+                                               include_fetched=False, **pipeline_options)
+                crawled += self._crawl_batches(job, settings.RECRAWL_BUDGET, stale_after, stats, pipeline,
+                                               **pipeline_options)
+            else:
+                crawled += self._crawl_batches(job, None if limit is None else limit - crawled, stale_after,
+                                               stats, pipeline, **pipeline_options)
+            status = COMPLETED
+        finally:
+            self.flush()
+            self.job_id = None
+            stats = dict(stats, crawled=crawled, job_id=job_id)
+            for key in ('inserted', 'updated', 'unchanged'):
+                stats[key] = self.writer.totals[key] - totals_before.get(key, 0)
+            if self.analyzer:
+                stats['prompt_tokens_saved'] = (self.analyzer.budget_stats().get('tokens_saved', 0)
+                                                - tokens_saved_before)
+            self.jobs.set_status(job_id, status, stats)
+        return stats
+
+    def _crawl_batches(self, job, limit, stale_after, stats, pipeline, include_fetched=True, **pipeline_options):
+        """Enroll due frontier URLs in the job and process them batch by batch.
+
+        Stops after limit URLs (None for no limit) or when nothing is due;
+        returns how many were crawled. Results are added to stats.
+        """
+        crawled = 0
+        while limit is None or crawled < limit:
+            batch_size = settings.FRONTIER_BATCH_SIZE
+            if limit is not None:
+                batch_size = min(batch_size, limit - crawled)
+            urls = self.frontier.next_batch(batch_size, stale_after, not_attempted_since=job['started_at'],
+                                            include_fetched=include_fetched)
+            if not urls:
+                break
+            self.jobs.add_items(job['id'], urls)
+            self.frontier.claim(urls)
+            stats.update(self._process_urls(urls, pipeline, **pipeline_options))
+            crawled += len(urls)
+        return crawled
+
+    def resume(self, job_id=None, **pipeline_options):
+        """Continue a crawl job where it stopped; by default the latest unfinished one.
+
+        Returns None when there is no job to resume.
+        """
+        job = self.jobs.get(job_id) if job_id else self.jobs.latest_unfinished()
+        if job is None:
+            return None
+        params = dict(job['params'])
+        stale_hours = params.pop('stale_after_hours', None)
+        params.update(pipeline_options)
+        print(f"Resuming crawl job {job['id']}: {self.jobs.summary(job['id'])}")
+        return self.crawl(
+            stale_after=timedelta(hours=stale_hours) if stale_hours else None,
+            job_id=job['id'], **params
+        )
+
+    def _process_urls(self, urls, pipeline=False, **pipeline_options):
+        if pipeline:
+            return ScrapePipeline(self, **pipeline_options).run_sync(urls)
+        for url in urls:
+            data = self.scrape_indicator(url)
+            if data and self.needs_analysis(data):
+                analysis = self.analyze_indicator(data)
+                if analysis:
                     self.save_to_db(analysis)
+        return {}
 
-    def add_url_to_csv(self, url, csv_path='tradingview_urls.csv'):
-        """Add a new URL to the CSV file if it doesn't already exist"""
-        # Check if the URL is valid
-        if not url.startswith('https://www.tradingview.com/script/'):
+    def add_url(self, url, priority=0):
+        """Queue a script URL for crawling unless it is already in the frontier"""
+        if not is_script_url(url):
             return False, "URL must be a TradingView script URL (https://www.tradingview.com/script/...)"
-
-        # Check if the file exists
-        if not os.path.exists(csv_path):
-            # Create the file with a header
-            with open(csv_path, 'w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(['url'])
-
-        # Check if the URL already exists in the file
-        existing_urls = []
-        with open(csv_path, 'r') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header
-            for row in reader:
-                existing_urls.append(row[0])
-
-        if url in existing_urls:
+        if not self.frontier.add(url, priority):
             return False, "This URL already exists in the list"
+        return True, "URL added successfully"
 
-        # Add the URL to the file
-        with open(csv_path, 'a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([url])
+    def fingerprint(self, data):
+        return self._fingerprint_for_content(content_hash(data))
 
-        return True, "URL added successfully"
+    def _fingerprint_for_content(self, content_digest):
+        if self.analyzer and not self.analyzer.uses_mock:
+            return fingerprint_for_content(content_digest, self.analyzer.prompt_version, self.analyzer.model)
+        # Placeholder and mock analyses stay stale for a real analyzer
+        return fingerprint_for_content(content_digest, PROMPT_VERSION, PLACEHOLDER_MODEL)
+
+    def analysis_current(self, url):
+        """True when the stored analysis of url was made with this prompt and model from its stored content"""
+        row = get_connection(self.db_path).execute(
+            "SELECT content_hash, analysis_fingerprint FROM indicators WHERE url = ?", (url,)
+        ).fetchone()
+        return bool(row and row[0]) and row[1] == self._fingerprint_for_content(row[0])
+
+    def needs_analysis(self, data):
+        """False when the stored analysis was made from the same content, prompt and model"""
+        if self.force:
+            return True
+        conn = get_connection(self.db_path)
+        row = conn.execute(
+            "SELECT analysis_fingerprint, etag, last_modified FROM indicators WHERE url = ?", (data['url'],)
+        ).fetchone()
+        if row and row[0] == self.fingerprint(data):
+            print(f"Analysis up to date, skipping: {data['url']}")
+            # Same content under new validators: store them so the next
+            # conditional GET can come back 304
+            validators = (data.get('etag'), data.get('last_modified'))
+            if validators != row[1:]:
+                with conn:
+                    conn.execute(
+                        "UPDATE indicators SET etag = ?, last_modified = ? WHERE url = ?", validators + (data['url'],)
+                    )
+            self.track(data['url'], SKIPPED)
+            return False
+        return True
 
     def analyze_indicator(self, data):
+        """Analyze one scraped indicator, or return None if the analysis failed"""
+        if self.analyzer:
+            outcome = asyncio.run(self.analyzer.analyze_with_retry(data))
+            return self._analysis_from_outcome(outcome)
+
         # Here you would implement the analysis based on your prompt template
         # This is a placeholder structure
         analysis = {
@@ -171,48 +416,239 @@ class TradingViewScraper:
             'reliability_rating': 8,     # Example rating
             'analyzed_date': datetime.now()
         }
+        return self._finish_analysis(data, analysis)
+
+    async def analyze_indicator_async(self, data):
+        """Pipeline variant of analyze_indicator that awaits the LLM analyzer directly"""
+        if self.analyzer:
+            outcome = await self.analyzer.analyze_with_retry(data)
+            return self._analysis_from_outcome(outcome)
+        return await asyncio.to_thread(self.analyze_indicator, data)
+
+    async def analyze_batch_async(self, items):
+        """Analyze several indicators, packing short ones into shared LLM requests"""
+        if self.analyzer:
+            outcomes = await self.analyzer.analyze_packed(items)
+            return [self._analysis_from_outcome(outcome) for outcome in outcomes]
+        return [await asyncio.to_thread(self.analyze_indicator, data) for data in items]
+
+    def _analysis_from_outcome(self, outcome):
+        if not outcome.ok:
+            print(f"Analysis failed for {outcome.data['url']} after {outcome.attempts} attempts: {outcome.error}")
+            self.track(outcome.data['url'], FAILED, str(outcome.error))
+            return None
+        return self._finish_analysis(outcome.data, outcome.analysis)
+
+    def _finish_analysis(self, data, analysis):
+        """Attach the scraped fields that the upsert and skip checks rely on"""
+        analysis = dict(analysis)
+        analysis.setdefault('analyzed_date', datetime.now())
+        analysis.update({
+            'url': data['url'],
+            'name': data['name'],
+            'description': data.get('description'),
+            'etag': data.get('etag'),
+            'last_modified': data.get('last_modified'),
+            'content_hash': content_hash(data),
+            'analysis_fingerprint': self.fingerprint(data)
+        })
+        self.track(data['url'], ANALYZED)
         return analysis
 
+    @property
+    def writer(self):
+        if self._writer is None:
+            self._writer = BatchWriter(self.db_path, self._write_analyses, on_flushed=self._track_saved)
+        return self._writer
+
+    @property
+    def similarity(self):
+        """Text vectors of the stored indicators, for finding similar ones"""
+        if self._similarity is None:
+            self._similarity = SimilarityIndex(similarity_dir(self.db_path))
+        return self._similarity
+
+    def track(self, url, state, error=None):
+        """Record a URL's progress in the current crawl job"""
+        if self.job_id is not None:
+            self.jobs.record(self.job_id, url, state, error)
+
+    def observe(self, data):
+        """Record a parsed page: its job state and, for recrawl scheduling, whether it changed"""
+        self.track(data['url'], PARSED)
+        self.frontier.record_content(data['url'], content_hash(data), len(data.get('comments') or []))
+
+    def observe_many(self, parsed, failed_urls=()):
+        """observe() each parsed page and mark the URLs that failed to parse"""
+        for data in parsed:
+            self.observe(data)
+        for url in failed_urls:
+            self.track(url, FAILED)
+
+    def _track_saved(self, analyses):
+        for analysis in analyses:
+            self.track(analysis['url'], SAVED)
+
     def save_to_db(self, analysis):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO indicators
-                (url, name, functionality, usage_guidelines, user_feedback,
-                additional_insights, profitability_rating, reliability_rating, analyzed_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                analysis['url'], analysis['name'], analysis['functionality'],
-                analysis['usage_guidelines'], analysis['user_feedback'],
-                analysis['additional_insights'], analysis['profitability_rating'],
-                analysis['reliability_rating'], analysis['analyzed_date']
+        """Queue an analysis for the batch writer; call flush() to force it out"""
+        self.writer.add(analysis)
+
+    def flush(self):
+        if self._writer:
+            self._writer.flush()
+
+    def _write_analyses(self, conn, analyses):
+        """Upsert a batch of analyses, skipping rows whose content and analysis inputs are unchanged.
+
+        Rows keep their id on update. Returns inserted/updated/unchanged counts.
+        """
+        # Last analysis wins if a URL shows up twice in one batch
+        by_url = {analysis['url']: analysis for analysis in analyses}
+        existing = {}
+        urls = list(by_url)
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            existing.update({
+                row[0]: row[1:] for row in conn.execute(
+                    f"SELECT url, content_hash, analysis_fingerprint, etag, last_modified FROM indicators "
+                    f"WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                )
+            })
+
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        changed, revalidated = [], []
+        for url, analysis in by_url.items():
+            if url not in existing:
+                counts['inserted'] += 1
+                changed.append(analysis)
+                continue
+            stored_hash, stored_fingerprint, etag, last_modified = existing[url]
+            new_hash, new_fingerprint = analysis.get('content_hash'), analysis.get('analysis_fingerprint')
+            if self.force or new_hash is None or (new_hash, new_fingerprint) != (stored_hash, stored_fingerprint):
+                counts['updated'] += 1
+                changed.append(analysis)
+                continue
+            counts['unchanged'] += 1
+            # Same content under new validators: only refresh them so the next
+            # conditional GET can come back 304
+            if (analysis.get('etag'), analysis.get('last_modified')) != (etag, last_modified):
+                revalidated.append((analysis.get('etag'), analysis.get('last_modified'), url))
+
+        if changed:
+            columns = INDICATOR_COLUMNS + ('updated_at', 'created_at')
+            # created_at is only set on insert
+            updates = ', '.join(f"{column} = excluded.{column}" for column in columns[1:-1])
+            updated_at = datetime.now().isoformat(sep=' ')
+            conn.executemany(f"""
+                INSERT INTO indicators ({', '.join(columns)})
+                VALUES ({', '.join('?' * len(columns))})
+                ON CONFLICT(url) DO UPDATE SET {updates}
+            """, [tuple(self._column_value(analysis, column) for column in INDICATOR_COLUMNS)
+                  + (updated_at, updated_at) for analysis in changed])
+        if revalidated:
+            conn.executemany(
+                "UPDATE indicators SET etag = ?, last_modified = ? WHERE url = ?", revalidated
+            )
+        if changed:
+            self._index_similarity(conn, [analysis['url'] for analysis in changed])
+        return counts
+
+    def _index_similarity(self, conn, urls):
+        """Vectorize new and changed rows as they are written"""
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            index_rows(self.similarity, conn.execute(
+                f"SELECT id, name, description, functionality FROM indicators "
+                f"WHERE url IN ({','.join('?' * len(chunk))})", chunk
             ))
 
+    @staticmethod
+    def _column_value(analysis, column):
+        value = analysis.get(column)
+        # Structured LLM fields (e.g. user_feedback) are stored as JSON text
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
     def get_all_indicators_df(self):
-        with sqlite3.connect(self.db_path) as conn:
-            query = "SELECT * FROM indicators"
-            df = pd.read_sql_query(query, conn)
-            return df
+        query = "SELECT * FROM indicators"
+        return pd.read_sql_query(query, get_connection(self.db_path))
+
+    def iter_indicators_df(self, chunksize=5000):
+        """All indicators as DataFrames of at most chunksize rows, so memory stays bounded"""
+        return pd.read_sql_query("SELECT * FROM indicators ORDER BY id", get_connection(self.db_path),
+                                 chunksize=chunksize)
 
     def export_to_csv(self, output_path="indicators_export.csv"):
-        """Export all indicators to a CSV file"""
+        """Export all indicators to a CSV file, written chunk by chunk"""
         try:
-            df = self.get_all_indicators_df()
-            if df.empty:
+            exported = 0
+            for df in self.iter_indicators_df():
+                # Format the date column
+                if 'analyzed_date' in df.columns:
+                    df['analyzed_date'] = pd.to_datetime(df['analyzed_date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+                # Export to CSV
+                df.to_csv(output_path, index=False, mode='w' if exported == 0 else 'a', header=exported == 0)
+                exported += len(df)
+            if not exported:
                 return False, "No indicators to export"
+            return True, f"Successfully exported {exported} indicators to {output_path}"
+        except Exception as e:
+            return False, f"Error exporting indicators: {str(e)}"
 
-            # Format the date column
-            if 'analyzed_date' in df.columns:
-                df['analyzed_date'] = pd.to_datetime(df['analyzed_date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+    def import_from_csv(self, input_path):
+        """Bulk-load analyses from a CSV file, e.g. one written by export_to_csv.
 
-            # Export to CSV
-            df.to_csv(output_path, index=False)
-            return True, f"Successfully exported {len(df)} indicators to {output_path}"
+        Rows are checked column by column before anything is written; rows
+        that fail are skipped and counted in the message.
+        """
+        try:
+            checked = validate_analysis_columns(pd.read_csv(input_path))
+            totals_before = dict(self.writer.totals)
+            self.writer.add_many(frame_to_records(checked.valid))
+            self.flush()
+            written = {key: self.writer.totals[key] - totals_before.get(key, 0)
+                       for key in ('inserted', 'updated', 'unchanged')}
+            return True, (f"Imported {len(checked.valid)} indicators from {input_path} {written}, "
+                          f"skipped {len(checked.invalid)} invalid rows")
         except Exception as e:
-            return False, f"Error exporting indicators: {str(e)}"
+            return False, f"Error importing indicators: {str(e)}"
 
 def main():
-    scraper = TradingViewScraper()
-    scraper.process_urls_from_csv('tradingview_urls.csv')
+    parser = argparse.ArgumentParser(description="Scrape and analyze TradingView indicators")
+    parser.add_argument('--csv', default='tradingview_urls.csv', help="CSV file with a 'url' column")
+    parser.add_argument('--pipeline', action='store_true', help="Run fetch/parse/analyze/save as concurrent stages")
+    parser.add_argument('--parse-processes', type=int, default=None,
+                        help="Parse pages in a pool of this many processes (pipeline mode)")
+    parser.add_argument('--llm', action='store_true', help="Analyze with the OpenAI model instead of the placeholder")
+    parser.add_argument('--force', action='store_true', help="Re-analyze indicators even if their content is unchanged")
+    parser.add_argument('--offline', action='store_true', help="Replay pages from the HTML cache without network access")
+    parser.add_argument('--limit', type=int, default=None, help="Crawl at most this many URLs")
+    parser.add_argument('--resume', nargs='?', type=int, const=0, default=None, metavar='JOB_ID',
+                        help="Continue an interrupted crawl job (default: the latest one)")
+    parser.add_argument('--discover', nargs='?', type=int, const=0, default=None, metavar='MAX_PAGES',
+                        help="Crawl listing/tag/author pages for new script URLs before scraping")
+    parser.add_argument('--import', dest='import_path', help="Bulk-load analyses from an exported CSV and exit")
+    args = parser.parse_args()
+
+    if args.import_path:
+        with TradingViewScraper(force=args.force) as scraper:
+            print(scraper.import_from_csv(args.import_path)[1])
+        return
+
+    analyzer = IndicatorAnalyzer() if args.llm else None
+    with TradingViewScraper(offline=args.offline or None, force=args.force, analyzer=analyzer) as scraper:
+        if args.discover is not None:
+            print(f"Discovery: {DiscoveryCrawler(scraper).run(args.discover or None)}")
+        if args.resume is not None:
+            stats = scraper.resume(args.resume or None)
+        elif args.pipeline:
+            stats = scraper.process_urls_from_csv(args.csv, pipeline=True, limit=args.limit,
+                                                  parse_processes=args.parse_processes)
+        else:
+            stats = scraper.process_urls_from_csv(args.csv, limit=args.limit)
+    print(f"Finished: {stats}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file